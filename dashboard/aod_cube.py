@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Satellite AOD Space-Time Cube for VayuDrishti
+Memory-mapped (time x lat x lon) store built from the long-format AOD CSVs
+
+Usage:
+    python aod_cube.py ../data/satellite/*.csv
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+AOD_VARIABLES = ['aod_550', 'aod_470', 'angstrom_exponent']
+DEFAULT_CUBE_DIR = Path(__file__).parent.parent / "data" / "cubes" / "aod"
+DEFAULT_SATELLITE_DIR = Path(__file__).parent.parent / "data" / "satellite"
+
+# Grid of the satellite AOD products (0.5° cells over the India domain)
+AOD_GRID = {
+    'lat_min': 6.0,
+    'lat_max': 37.0,
+    'lon_min': 68.0,
+    'lon_max': 97.0,
+    'resolution': 0.5
+}
+
+
+def _to_epoch_seconds(timestamp):
+    return int(pd.Timestamp(timestamp).value // 10**9)
+
+
+class AODCube:
+    """Memory-mapped AOD cube with coordinate indexes
+
+    Each variable is a raw float32 file laid out C-order as
+    (time, lat, lon), so a new pass is appended by writing one slab at the
+    end of each file. ``meta.json`` records the grid and the committed number
+    of passes and is replaced atomically after the slabs are written, so
+    readers never observe a half-written pass. Missing cells (cloud gaps)
+    are NaN.
+    """
+
+    def __init__(self, store_dir=DEFAULT_CUBE_DIR, writable=False):
+        self.store_dir = Path(store_dir)
+        self.writable = writable
+        self.refresh()
+
+    @classmethod
+    def create(cls, store_dir=DEFAULT_CUBE_DIR, grid=None, variables=None):
+        """Initialise an empty store, or open the existing one"""
+        store_dir = Path(store_dir)
+        if (store_dir / "meta.json").exists():
+            return cls(store_dir, writable=True)
+
+        grid = dict(AOD_GRID if grid is None else grid)
+        res = grid['resolution']
+        meta = {
+            'lat_min': grid['lat_min'],
+            'lon_min': grid['lon_min'],
+            'resolution': res,
+            'n_lat': int(round((grid['lat_max'] - grid['lat_min']) / res)) + 1,
+            'n_lon': int(round((grid['lon_max'] - grid['lon_min']) / res)) + 1,
+            'variables': list(variables or AOD_VARIABLES),
+            'n_times': 0
+        }
+        store_dir.mkdir(parents=True, exist_ok=True)
+        for name in meta['variables']:
+            (store_dir / f"{name}.f32").touch()
+        (store_dir / "times.i8").touch()
+        cls._write_meta(store_dir, meta)
+        return cls(store_dir, writable=True)
+
+    @staticmethod
+    def _write_meta(store_dir, meta):
+        tmp_path = store_dir / "meta.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, store_dir / "meta.json")
+
+    def refresh(self):
+        """(Re)map the store, picking up passes appended by other processes"""
+        with open(self.store_dir / "meta.json") as f:
+            self.meta = json.load(f)
+
+        res = self.meta['resolution']
+        self.variables = self.meta['variables']
+        self.n_times = self.meta['n_times']
+        self.shape = (self.n_times, self.meta['n_lat'], self.meta['n_lon'])
+        self.latitudes = self.meta['lat_min'] + res * np.arange(self.meta['n_lat'])
+        self.longitudes = self.meta['lon_min'] + res * np.arange(self.meta['n_lon'])
+
+        if self.n_times:
+            self.times = np.memmap(self.store_dir / "times.i8", dtype=np.int64, mode='r',
+                                   shape=(self.n_times,))
+            self.arrays = {
+                name: np.memmap(self.store_dir / f"{name}.f32", dtype=np.float32, mode='r',
+                                shape=self.shape)
+                for name in self.variables
+            }
+        else:
+            self.times = np.empty(0, dtype=np.int64)
+            self.arrays = {name: np.empty(self.shape, dtype=np.float32) for name in self.variables}
+
+    # Coordinate indexes -------------------------------------------------
+
+    def lat_index(self, latitude):
+        """Row index of the cell containing ``latitude`` (scalar or array)"""
+        index = np.rint((np.asarray(latitude) - self.meta['lat_min']) / self.meta['resolution'])
+        return np.clip(index, 0, self.meta['n_lat'] - 1).astype(np.intp)
+
+    def lon_index(self, longitude):
+        """Column index of the cell containing ``longitude`` (scalar or array)"""
+        index = np.rint((np.asarray(longitude) - self.meta['lon_min']) / self.meta['resolution'])
+        return np.clip(index, 0, self.meta['n_lon'] - 1).astype(np.intp)
+
+    def time_index(self, timestamp):
+        """Index of the latest pass at or before ``timestamp``"""
+        position = np.searchsorted(self.times, _to_epoch_seconds(timestamp), side='right') - 1
+        if position < 0:
+            raise KeyError(f"No AOD pass at or before {timestamp}")
+        return int(position)
+
+    def _time_slice(self, start=None, end=None):
+        t0 = 0 if start is None else int(np.searchsorted(self.times, _to_epoch_seconds(start), side='left'))
+        t1 = self.n_times if end is None else int(np.searchsorted(self.times, _to_epoch_seconds(end), side='right'))
+        return slice(t0, t1)
+
+    def timestamps(self, time_slice=slice(None)):
+        """Pass times as pandas timestamps"""
+        return pd.to_datetime(self.times[time_slice], unit='s')
+
+    # Lookups (all views into the memory map, no copies) -----------------
+
+    def point(self, variable, latitude, longitude, timestamp=None):
+        """Value of one cell at one pass (latest pass if ``timestamp`` is None)"""
+        t = self.n_times - 1 if timestamp is None else self.time_index(timestamp)
+        return float(self.arrays[variable][t, self.lat_index(latitude), self.lon_index(longitude)])
+
+    def series(self, variable, latitude, longitude, start=None, end=None):
+        """History of one cell as a strided view over the time axis"""
+        time_slice = self._time_slice(start, end)
+        return self.arrays[variable][time_slice, self.lat_index(latitude), self.lon_index(longitude)]
+
+    def region(self, variable, lat_range, lon_range, start=None, end=None):
+        """(time, lat, lon) view of a box and time window"""
+        i0, i1 = self.lat_index(lat_range[0]), self.lat_index(lat_range[1]) + 1
+        j0, j1 = self.lon_index(lon_range[0]), self.lon_index(lon_range[1]) + 1
+        return self.arrays[variable][self._time_slice(start, end), i0:i1, j0:j1]
+
+    def latest(self, variable):
+        """2-D view of the most recent pass"""
+        if not self.n_times:
+            raise KeyError("AOD cube is empty")
+        return self.arrays[variable][self.n_times - 1]
+
+    # Ingest ---------------------------------------------------------------
+
+    def append_pass(self, timestamp, latitude, longitude, values):
+        """Append one pass of long-format rows; returns False if already stored
+
+        ``values`` maps variable name to an array aligned with
+        ``latitude``/``longitude``. Passes must arrive in time order.
+        """
+        if not self.writable:
+            raise PermissionError("AOD cube opened read-only")
+        epoch = _to_epoch_seconds(timestamp)
+        if self.n_times and epoch <= self.times[-1]:
+            if epoch in self.times:
+                return False
+            raise ValueError(f"Pass {timestamp} is older than the latest stored pass")
+
+        n_lat, n_lon = self.meta['n_lat'], self.meta['n_lon']
+        rows = self.lat_index(latitude)
+        cols = self.lon_index(longitude)
+        slab_bytes = n_lat * n_lon * np.dtype(np.float32).itemsize
+
+        # Write slabs past the committed end (truncating any partial write
+        # left by a crash), then commit by bumping n_times in meta.json
+        for name in self.variables:
+            slab = np.full((n_lat, n_lon), np.nan, dtype=np.float32)
+            if name in values:
+                slab[rows, cols] = values[name]
+            with open(self.store_dir / f"{name}.f32", 'r+b') as f:
+                f.seek(self.n_times * slab_bytes)
+                f.write(slab.tobytes())
+                f.truncate()
+        with open(self.store_dir / "times.i8", 'r+b') as f:
+            f.seek(self.n_times * 8)
+            f.write(np.int64(epoch).tobytes())
+            f.truncate()
+
+        meta = dict(self.meta, n_times=self.n_times + 1)
+        self._write_meta(self.store_dir, meta)
+        self.refresh()
+        return True
+
+    def ingest_frame(self, df):
+        """Append every pass in a long-format AOD DataFrame; returns passes added"""
+        added = 0
+        df = df.assign(_epoch=pd.to_datetime(df['datetime']).astype('int64') // 10**9)
+        for epoch, rows in df.sort_values('_epoch').groupby('_epoch', sort=True):
+            values = {name: rows[name].to_numpy() for name in self.variables if name in rows}
+            if self.append_pass(pd.Timestamp(epoch, unit='s'), rows['latitude'].to_numpy(),
+                                rows['longitude'].to_numpy(), values):
+                added += 1
+        return added
+
+    def ingest_csv(self, paths):
+        """Ingest AOD CSV files in pass order; returns passes added"""
+        frames = [pd.read_csv(path) for path in paths]
+        if not frames:
+            return 0
+        df = pd.concat(frames, ignore_index=True)
+        if self.n_times:
+            # Only passes newer than the store can be appended
+            df = df[pd.to_datetime(df['datetime']).astype('int64') // 10**9 > self.times[-1]]
+        return self.ingest_frame(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build/append the memory-mapped AOD cube")
+    parser.add_argument("csv", nargs="*", help="AOD CSV files (default: data/satellite/*.csv)")
+    parser.add_argument("--store", default=str(DEFAULT_CUBE_DIR), help="Cube directory")
+    args = parser.parse_args()
+
+    paths = args.csv or sorted(str(p) for p in DEFAULT_SATELLITE_DIR.glob("*aod*.csv"))
+    print(f"🛰️ Ingesting {len(paths)} AOD file(s) into {args.store}")
+
+    started = datetime.now()
+    cube = AODCube.create(args.store)
+    added = cube.ingest_csv(paths)
+
+    print(f"✅ Added {added} pass(es) in {(datetime.now() - started).total_seconds():.2f}s")
+    print(f"📦 Cube shape: {cube.shape} (time x lat x lon), variables: {', '.join(cube.variables)}")
+
+
+if __name__ == "__main__":
+    main()
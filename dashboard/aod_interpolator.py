@@ -0,0 +1,261 @@
+"""
+Satellite AOD Interpolation for VayuDrishti
+Vectorized lookup of observed AOD at arbitrary coordinates from the latest grid
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aod_cube import AOD_GRID, DEFAULT_CUBE_DIR, DEFAULT_SATELLITE_DIR, AODCube
+
+# Oldest pass (in days before the newest) used in the composite, and the largest gap between
+# the newest pass and the date being predicted for which the composite still counts as observed
+MAX_AGE_DAYS = 3
+
+
+class AODInterpolator:
+    """Resident composite of the latest AOD passes with vectorized interpolation
+
+    The composite holds, per 0.5° cell, the most recent non-missing value
+    across the passes of the last ``max_age_days`` before the newest one, so
+    a cloud gap in the newest pass is filled by a recent observation of that
+    cell. Points queried for a date more than ``max_age_days`` away from the
+    newest pass use the cell's mean AOD for that calendar month over every
+    stored pass instead. Remaining gaps are handled at query time: bilinear
+    weights of missing corners are dropped and the rest renormalised, points
+    with no valid corner fall back to inverse-distance weighting over a
+    wider window, and finally to the domain mean.
+    """
+
+    def __init__(self, cube_dir=DEFAULT_CUBE_DIR, satellite_dir=DEFAULT_SATELLITE_DIR,
+                 variable='aod_550', idw_radius=2, idw_power=2.0, max_age_days=MAX_AGE_DAYS):
+        self.variable = variable
+        self.idw_radius = idw_radius
+        self.idw_power = idw_power
+        self.max_age_days = max_age_days
+        self.grid = None
+        self.timestamp = None
+        self.source = None
+        self.load(cube_dir, satellite_dir)
+
+    @property
+    def available(self):
+        return self.grid is not None
+
+    def load(self, cube_dir=DEFAULT_CUBE_DIR, satellite_dir=DEFAULT_SATELLITE_DIR):
+        """Load the composite from the AOD cube, or from the raw CSVs if no cube exists"""
+        try:
+            if (Path(cube_dir) / "meta.json").exists():
+                self._load_cube(AODCube(cube_dir))
+            else:
+                self._load_csv(sorted(Path(satellite_dir).glob("*aod*.csv")))
+        except Exception as e:
+            print(f"⚠️ Satellite AOD not available: {e}")
+            self.grid = None
+        if self.grid is not None:
+            self._finalise()
+
+    def _load_cube(self, cube):
+        if not cube.n_times:
+            return
+        self.lat0 = cube.meta['lat_min']
+        self.lon0 = cube.meta['lon_min']
+        self.resolution = cube.meta['resolution']
+
+        # Walk back from the newest pass until every cell has a value or the passes get too old
+        data = cube.arrays[self.variable]
+        timestamps = cube.timestamps()
+        oldest = timestamps[-1] - pd.Timedelta(days=self.max_age_days)
+        grid = np.array(data[-1], dtype=np.float32)
+        for t in range(cube.n_times - 2, -1, -1):
+            gaps = np.isnan(grid)
+            if not gaps.any() or timestamps[t] < oldest:
+                break
+            grid[gaps] = data[t][gaps]
+
+        # Per-month means over every pass, for dates the composite is too far from
+        sums = np.zeros((12,) + grid.shape)
+        counts = np.zeros((12,) + grid.shape)
+        for t, month in enumerate(timestamps.month):
+            values = np.asarray(data[t], dtype=np.float64)
+            observed = ~np.isnan(values)
+            sums[month - 1][observed] += values[observed]
+            counts[month - 1] += observed
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.monthly = (sums / counts).astype(np.float32)
+
+        self.grid = grid
+        self.timestamp = timestamps[-1]
+        self.source = str(cube.store_dir)
+
+    def _load_csv(self, paths):
+        if not paths:
+            return
+        df = pd.concat(
+            [pd.read_csv(path, usecols=['datetime', 'latitude', 'longitude', self.variable]) for path in paths],
+            ignore_index=True
+        )
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        df = df.dropna(subset=[self.variable]).sort_values('datetime', kind='stable')
+        if df.empty:
+            return
+        recent = df[df['datetime'] >= df['datetime'].iloc[-1] - pd.Timedelta(days=self.max_age_days)]
+        latest = recent.drop_duplicates(subset=['latitude', 'longitude'], keep='last')
+
+        self.lat0 = AOD_GRID['lat_min']
+        self.lon0 = AOD_GRID['lon_min']
+        self.resolution = AOD_GRID['resolution']
+        n_lat = int(round((AOD_GRID['lat_max'] - self.lat0) / self.resolution)) + 1
+        n_lon = int(round((AOD_GRID['lon_max'] - self.lon0) / self.resolution)) + 1
+
+        def cells(frame):
+            rows = np.rint((frame['latitude'].to_numpy() - self.lat0) / self.resolution).astype(np.intp)
+            cols = np.rint((frame['longitude'].to_numpy() - self.lon0) / self.resolution).astype(np.intp)
+            inside = (rows >= 0) & (rows < n_lat) & (cols >= 0) & (cols < n_lon)
+            return rows, cols, inside
+
+        grid = np.full((n_lat, n_lon), np.nan, dtype=np.float32)
+        rows, cols, inside = cells(latest)
+        grid[rows[inside], cols[inside]] = latest[self.variable].to_numpy()[inside]
+
+        # Per-month means over every row, for dates the composite is too far from
+        rows, cols, inside = cells(df)
+        slot = ((df['datetime'].dt.month.to_numpy() - 1) * n_lat + rows) * n_lon + cols
+        sums = np.bincount(slot[inside], weights=df[self.variable].to_numpy()[inside], minlength=12 * n_lat * n_lon)
+        counts = np.bincount(slot[inside], minlength=12 * n_lat * n_lon)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.monthly = (sums / counts).astype(np.float32).reshape(12, n_lat, n_lon)
+
+        self.grid = grid
+        self.timestamp = df['datetime'].iloc[-1]
+        self.source = ", ".join(Path(path).name for path in paths)
+
+    def _finalise(self):
+        valid = ~np.isnan(self.grid)
+        if not valid.any():
+            self.grid = None
+            return
+        self.n_lat, self.n_lon = self.grid.shape
+        self.valid = valid
+        self.fill_value = float(self.grid[valid].mean())
+
+        # Layer 0 is the composite, layers 1-12 the monthly means; a month
+        # that was never observed falls back to the composite's domain mean
+        self.layers = np.concatenate([self.grid[None], self.monthly])
+        observed = ~np.isnan(self.layers)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.nansum(self.layers, axis=(1, 2)) / observed.sum(axis=(1, 2))
+        self.fill_values = np.where(observed.any(axis=(1, 2)), means, self.fill_value)
+
+        # Window offsets for the inverse-distance fallback
+        offsets = np.arange(-self.idw_radius, self.idw_radius + 1)
+        self._di, self._dj = (axis.ravel() for axis in np.meshgrid(offsets, offsets, indexing='ij'))
+
+    def _fractional_index(self, latitude, longitude):
+        fi = (np.asarray(latitude, dtype=np.float64) - self.lat0) / self.resolution
+        fj = (np.asarray(longitude, dtype=np.float64) - self.lon0) / self.resolution
+        # Points outside the domain take the value at the nearest edge
+        return np.clip(fi, 0, self.n_lat - 1), np.clip(fj, 0, self.n_lon - 1)
+
+    def _bilinear(self, fi, fj, layer):
+        i0 = np.minimum(fi.astype(np.intp), self.n_lat - 2)
+        j0 = np.minimum(fj.astype(np.intp), self.n_lon - 2)
+        ti = fi - i0
+        tj = fj - j0
+
+        grid = self.layers
+        corners = np.stack([
+            grid[layer, i0, j0], grid[layer, i0, j0 + 1],
+            grid[layer, i0 + 1, j0], grid[layer, i0 + 1, j0 + 1]
+        ], axis=-1).astype(np.float64)
+        weights = np.stack([
+            (1 - ti) * (1 - tj), (1 - ti) * tj,
+            ti * (1 - tj), ti * tj
+        ], axis=-1)
+
+        # Drop missing corners and renormalise over the observed ones
+        missing = np.isnan(corners)
+        weights[missing] = 0.0
+        corners[missing] = 0.0
+        total = weights.sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (weights * corners).sum(axis=-1) / total
+
+    def _idw(self, fi, fj, layer):
+        rows = np.rint(fi).astype(np.intp)[:, None] + self._di
+        cols = np.rint(fj).astype(np.intp)[:, None] + self._dj
+        inside = (rows >= 0) & (rows < self.n_lat) & (cols >= 0) & (cols < self.n_lon)
+        rows = np.clip(rows, 0, self.n_lat - 1)
+        cols = np.clip(cols, 0, self.n_lon - 1)
+
+        values = self.layers[layer[:, None], rows, cols].astype(np.float64)
+        distance = np.hypot(rows - fi[:, None], cols - fj[:, None])
+        weights = 1.0 / np.maximum(distance, 1e-6) ** self.idw_power
+        usable = inside & ~np.isnan(values)
+        weights[~usable] = 0.0
+        values[~usable] = 0.0
+        total = weights.sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (weights * values).sum(axis=-1) / total
+
+    def age_days(self, when):
+        """Days from the newest pass in the composite to ``when`` (a datetime or array of them)"""
+        return (pd.to_datetime(np.ravel(when)) - self.timestamp).total_seconds().to_numpy() / 86400.0
+
+    def layer_index(self, when, shape):
+        """Composite (0) or monthly-mean layer (month) for query points at ``when``"""
+        if when is None:
+            return np.zeros(shape, dtype=np.intp)
+        when = np.broadcast_to(np.asarray(when, dtype='datetime64[s]'), shape)
+        stale = np.abs(self.age_days(when)) > self.max_age_days
+        months = pd.to_datetime(when.ravel()).month.to_numpy()
+        return np.where(stale, months, 0).astype(np.intp).reshape(shape)
+
+    def interpolate(self, latitude, longitude, method='bilinear', when=None):
+        """AOD at arrays of query points ('bilinear' or 'idw'); NaN if unavailable
+
+        With ``when`` (the date(s) being predicted), points more than
+        ``max_age_days`` from the newest pass use the monthly means.
+        """
+        shape = np.broadcast(np.atleast_1d(latitude), np.atleast_1d(longitude)).shape
+        if when is not None:
+            shape = np.broadcast_shapes(shape, np.shape(when))
+        if not self.available:
+            return np.full(shape, np.nan)
+
+        fi, fj = self._fractional_index(
+            np.broadcast_to(latitude, shape).ravel(), np.broadcast_to(longitude, shape).ravel()
+        )
+        layer = self.layer_index(when, shape).ravel()
+        if method == 'bilinear':
+            result = self._bilinear(fi, fj, layer)
+        elif method == 'idw':
+            result = self._idw(fi, fj, layer)
+        else:
+            raise ValueError(f"Unknown interpolation method: {method}")
+
+        # Cloud-gap fallbacks: wider IDW window, then the domain mean
+        gaps = np.isnan(result)
+        if gaps.any() and method != 'idw':
+            result[gaps] = self._idw(fi[gaps], fj[gaps], layer[gaps])
+            gaps = np.isnan(result)
+        result[gaps] = self.fill_values[layer[gaps]]
+        return result.reshape(shape)
+
+    def source_for(self, when):
+        """Where AOD for dates ``when`` comes from: 'satellite', 'climatology' or 'domain mean'"""
+        layer = self.layer_index(when, np.shape(when))
+        observed = ~np.isnan(self.layers).all(axis=(1, 2))
+        return np.where(layer == 0, 'satellite', np.where(observed[layer], 'climatology', 'domain mean'))
+
+    def at(self, latitude, longitude, method='bilinear', when=None):
+        """Scalar AOD at one location, or None if no satellite data is loaded"""
+        if not self.available:
+            return None
+        return float(self.interpolate(latitude, longitude, method, when).ravel()[0])
+
+
+# Shared instance; the composite grid stays resident for the process lifetime
+aod_interpolator = AODInterpolator()
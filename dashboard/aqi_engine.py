@@ -0,0 +1,107 @@
+"""
+CPCB AQI Engine for VayuDrishti
+Vectorized sub-indices, overall AQI and dominant pollutant from the CPCB breakpoint tables
+"""
+
+import numpy as np
+import pandas as pd
+
+CPCB_CATEGORIES = ["Good", "Satisfactory", "Moderate", "Poor", "Very Poor", "Severe"]
+CPCB_AQI_UPPER = np.array([50, 100, 200, 300, 400])
+_CPCB_AQI_POINTS = [0, 50, 100, 200, 300, 400, 500]
+
+# Upper concentration of Good..Very Poor for each pollutant over its CPCB
+# averaging period (μg/m³; CO in mg/m³); anything above is Severe
+CPCB_BREAKPOINTS = {
+    'pm2_5': [30, 60, 90, 120, 250],
+    'pm10': [50, 100, 250, 350, 430],
+    'no2': [40, 80, 180, 280, 400],
+    'so2': [40, 80, 380, 800, 1600],
+    'o3': [50, 100, 168, 208, 748],
+    'co': [1.0, 2.0, 10.0, 17.0, 34.0],
+    'nh3': [200, 400, 800, 1200, 1800]
+}
+POLLUTANTS = list(CPCB_BREAKPOINTS)
+
+# CPCB reports an overall AQI only from 3+ sub-indices including PM2.5 or PM10
+MIN_POLLUTANTS = 3
+PARTICULATES = ('pm2_5', 'pm10')
+
+
+def _concentration_points(pollutant):
+    upper = CPCB_BREAKPOINTS[pollutant]
+    # The Severe band spans the width of Very Poor and saturates at AQI 500
+    return [0] + upper + [upper[-1] + (upper[-1] - upper[-2])]
+
+
+def sub_index(pollutant, concentration):
+    """CPCB sub-index of one pollutant for an array of concentrations (NaN stays NaN)"""
+    concentration = np.asarray(concentration, dtype=np.float64)
+    return np.interp(concentration, _concentration_points(pollutant), _CPCB_AQI_POINTS)
+
+
+def category_codes(aqi):
+    """Codes into CPCB_CATEGORIES for AQI values (-1 where the AQI is NaN)"""
+    aqi = np.asarray(aqi, dtype=np.float64)
+    codes = np.searchsorted(CPCB_AQI_UPPER, aqi, side='left').astype(np.int8)
+    codes[np.isnan(aqi)] = -1
+    return codes
+
+
+def pm25_to_cpcb_aqi_array(pm25):
+    """PM2.5-only AQI: (AQI values, codes into CPCB_CATEGORIES)"""
+    pm25 = np.asarray(pm25, dtype=np.float64)
+    codes = np.searchsorted(CPCB_BREAKPOINTS['pm2_5'], pm25, side='left').astype(np.int8)
+    return sub_index('pm2_5', pm25), codes
+
+
+def compute_aqi(concentrations, official=True):
+    """Overall AQI, category and dominant pollutant for arrays of concentrations
+
+    ``concentrations`` maps pollutant names to equally long arrays. With
+    ``official`` the AQI is NaN wherever fewer than MIN_POLLUTANTS sub-indices
+    (or no particulate sub-index) are available, as CPCB requires.
+
+    Returns a dict with ``aqi``, ``category`` (codes into CPCB_CATEGORIES),
+    ``dominant`` (codes into ``pollutants``, -1 if none), ``pollutants`` and
+    ``sub_indices`` ({pollutant: array}).
+    """
+    pollutants = [name for name in POLLUTANTS if name in concentrations]
+    if not pollutants:
+        raise ValueError(f"No CPCB pollutants given; expected some of {', '.join(POLLUTANTS)}")
+    sub_indices = np.stack([sub_index(name, concentrations[name]) for name in pollutants])
+
+    valid = ~np.isnan(sub_indices)
+    ranked = np.where(valid, sub_indices, -1.0)
+    dominant = ranked.argmax(axis=0)
+    aqi = np.take_along_axis(ranked, dominant[np.newaxis], axis=0)[0]
+
+    reported = valid.any(axis=0)
+    if official:
+        particulate = [pollutants.index(name) for name in PARTICULATES if name in pollutants]
+        reported &= valid.sum(axis=0) >= MIN_POLLUTANTS
+        reported &= valid[particulate].any(axis=0) if particulate else False
+    aqi = np.where(reported, aqi, np.nan)
+
+    return {
+        'aqi': aqi,
+        'category': category_codes(aqi),
+        'dominant': np.where(reported, dominant, -1).astype(np.int8),
+        'pollutants': pollutants,
+        'sub_indices': dict(zip(pollutants, sub_indices))
+    }
+
+
+def aqi_frame(df, columns=None, official=True):
+    """Append ``aqi``, ``aqi_category`` and ``dominant_pollutant`` columns to a frame
+
+    ``columns`` maps pollutants to the frame's column names (e.g. rolling
+    averages); by default every pollutant column present is used.
+    """
+    columns = columns or {name: name for name in POLLUTANTS if name in df.columns}
+    result = compute_aqi({name: df[column].to_numpy() for name, column in columns.items()}, official)
+    return df.assign(
+        aqi=result['aqi'],
+        aqi_category=pd.Categorical.from_codes(result['category'], CPCB_CATEGORIES),
+        dominant_pollutant=pd.Categorical.from_codes(result['dominant'], result['pollutants'])
+    )
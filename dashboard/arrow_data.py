@@ -0,0 +1,133 @@
+"""
+Arrow Data Path for VayuDrishti
+Reads CSV/Parquet into Arrow and writes model inputs straight from the Arrow buffers
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from feature_builder import FEATURE_BUILDER, FEATURE_COLUMNS
+
+# Columns the feature builder can read or derive features from
+SOURCE_COLUMNS = FEATURE_COLUMNS + ['latitude', 'longitude']
+
+
+def is_parquet(path):
+    return Path(path).suffix.lower() in ('.parquet', '.pq')
+
+
+def csv_column_types(path):
+    """Fixed Arrow types for every column of a CSV, so no later block can change them
+
+    Arrow otherwise infers types from the first block only: a column of whole
+    numbers that turns into ``25.5`` a few hundred thousand rows later would
+    fail to convert mid-stream. Numeric (or still empty) feature sources are
+    float64; other columns keep the first block's type, widened from integer
+    to float64 and from all-null to text. A feature source that is already
+    text stays text, so schema validation can name it.
+    """
+    types = {}
+    for field in pa_csv.open_csv(path).schema:
+        numeric = pa.types.is_floating(field.type) or pa.types.is_null(field.type)
+        if pa.types.is_integer(field.type) or (field.name in SOURCE_COLUMNS and numeric):
+            types[field.name] = pa.float64()
+        elif pa.types.is_null(field.type):
+            types[field.name] = pa.string()
+        else:
+            types[field.name] = field.type
+    return types
+
+
+def open_csv(path, include_columns=None):
+    """Streaming CSV reader with the fixed column types of ``csv_column_types``"""
+    convert_options = pa_csv.ConvertOptions(column_types=csv_column_types(path), include_columns=include_columns)
+    return pa_csv.open_csv(path, convert_options=convert_options)
+
+
+def read_schema(path):
+    """Column names and types of a CSV or Parquet file, without reading its rows"""
+    if is_parquet(path):
+        return pq.read_schema(path)
+    # The same types the streaming reader will produce for every chunk
+    return open_csv(path).schema
+
+
+def read_table(path, columns=None):
+    """Read (a subset of the columns of) a CSV or Parquet file as an Arrow table"""
+    if is_parquet(path):
+        available = pq.read_schema(path).names
+        wanted = None if columns is None else [name for name in columns if name in available]
+        return pq.read_table(path, columns=wanted)
+
+    include = None
+    if columns is not None:
+        with open(path, newline='') as f:
+            header = f.readline().strip().split(',')
+        include = [name for name in columns if name in header]
+    # The streaming reader parses one block at a time, so raw CSV text never
+    # accumulates next to the typed columns
+    return open_csv(path, include).read_all()
+
+
+def iter_tables(path, chunk_size, columns=None):
+    """Stream (a subset of the columns of) a CSV or Parquet file as Arrow tables of ``chunk_size`` rows"""
+    if is_parquet(path):
+        reader = pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+    else:
+        reader = open_csv(path, columns)
+
+    pending, pending_rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_size:
+            # Re-slice the accumulated batches into exact chunks (zero-copy)
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size)
+            rest = table.slice(chunk_size)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield pa.Table.from_batches(pending)
+
+
+def column_view(array):
+    """NumPy view of an Arrow array's buffer; copies only when nulls must become NaN"""
+    if array.null_count == 0:
+        return array.to_numpy(zero_copy_only=True)
+    return array.to_numpy(zero_copy_only=False).astype(np.float64)
+
+
+def source_columns(table):
+    """Feature source columns present in ``table``"""
+    return [name for name in SOURCE_COLUMNS if name in table.column_names]
+
+
+def build_features(table, out=None):
+    """Fill the model feature matrix directly from the table's Arrow buffers
+
+    Each record batch is viewed in place and written into its row range of
+    the C-contiguous float32 matrix, so the matrix is the only copy made.
+    """
+    if out is None:
+        out = FEATURE_BUILDER.allocate(table.num_rows)
+    names = source_columns(table)
+    offset = 0
+    for batch in table.select(names).to_batches():
+        views = {name: column_view(batch.column(i)) for i, name in enumerate(names)}
+        FEATURE_BUILDER.build(views, out=out[offset:offset + batch.num_rows])
+        offset += batch.num_rows
+    return out
+
+
+def column_array(table, name, dtype=np.float32):
+    """One column as a contiguous NumPy array (nulls become NaN)"""
+    out = np.empty(table.num_rows, dtype=dtype)
+    offset = 0
+    for chunk in table.column(name).chunks:
+        out[offset:offset + len(chunk)] = column_view(chunk)
+        offset += len(chunk)
+    return out
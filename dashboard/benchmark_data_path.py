@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Data Path Benchmark for VayuDrishti
+Compares the pandas and Arrow input paths by peak memory and full-data copies
+
+Usage:
+    python benchmark_data_path.py [--rows 1000000]
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from feature_builder import FEATURE_COLUMNS
+
+TARGET = 'pm2_5'
+
+
+def _memory_ranges(obj):
+    """(address, nbytes) of the buffers backing an array, DataFrame or Arrow table"""
+    import pandas as pd
+    import pyarrow as pa
+
+    if isinstance(obj, np.ndarray):
+        return [(obj.__array_interface__['data'][0], obj.nbytes)]
+    if isinstance(obj, pd.DataFrame):
+        return [range_ for block in obj._mgr.blocks for range_ in _memory_ranges(np.asarray(block.values))]
+    if isinstance(obj, pa.Table):
+        return [
+            (buffer.address, buffer.size)
+            for column in obj.columns for chunk in column.chunks
+            for buffer in chunk.buffers() if buffer is not None
+        ]
+    return []
+
+
+class CopyCounter:
+    """Counts stages whose output does not share memory with their input"""
+
+    def __init__(self):
+        self.stages = []
+
+    def step(self, name, source, result):
+        produced = _memory_ranges(result)
+        shared = any(
+            start < other + other_size and other < start + size
+            for start, size in produced for other, other_size in _memory_ranges(source)
+        )
+        self.stages.append((name, not shared))
+        return result
+
+    def model_input(self, matrix):
+        # XGBoost converts anything that is not C-contiguous float32 before use
+        ready = isinstance(matrix, np.ndarray) and matrix.dtype == np.float32 and matrix.flags.c_contiguous
+        self.stages.append(("xgboost input conversion", not ready))
+        return matrix
+
+    @property
+    def copies(self):
+        return sum(copied for _, copied in self.stages)
+
+
+def pandas_path(path, counter):
+    """CSV -> pandas float64 -> column copy -> np.array (the previous data path)"""
+    import pandas as pd
+
+    df = counter.step("read_csv", None, pd.read_csv(path))
+    selected = counter.step("df[features].copy()", df, df[FEATURE_COLUMNS].copy())
+    X = counter.model_input(counter.step("np.array", selected, np.array(selected)))
+    return X, df[TARGET].to_numpy()
+
+
+def arrow_path(path, counter):
+    """CSV -> Arrow buffers -> float32 feature matrix"""
+    from arrow_data import SOURCE_COLUMNS, build_features, column_array, read_table
+
+    table = counter.step("read_table", None, read_table(path, SOURCE_COLUMNS + [TARGET]))
+    X = counter.model_input(counter.step("build_features", table, build_features(table)))
+    return X, column_array(table, TARGET)
+
+
+def run_scenario(args):
+    """Run one (path, task) combination in this process; returns its measurements"""
+    path_name, task, csv_path = args
+    import pandas  # noqa: F401 - imported up front so import costs are not measured
+    import pyarrow as pa
+    import xgboost as xgb
+    import arrow_data  # noqa: F401
+    from offline_forecast import offline_forecast
+
+    loader = pandas_path if path_name == 'pandas' else arrow_path
+    counter = CopyCounter()
+
+    # NumPy/pandas buffers are traced by tracemalloc, Arrow buffers by its memory pool
+    tracemalloc.start()
+    arrow_pool = pa.default_memory_pool()
+    arrow_baseline = arrow_pool.bytes_allocated()
+    started = time.perf_counter()
+
+    X, y = loader(csv_path, counter)
+    if task == 'scoring':
+        offline_forecast.predict_matrix(X)
+    else:
+        xgb.XGBRegressor(n_estimators=20, max_depth=4, tree_method='hist', n_jobs=-1).fit(X, y)
+
+    elapsed = time.perf_counter() - started
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'path': path_name,
+        'task': task,
+        'seconds': elapsed,
+        'peak_mb': (python_peak + arrow_pool.max_memory() - arrow_baseline) / 2**20,
+        'copies': counter.copies,
+        'stages': counter.stages
+    }
+
+
+def write_sample(path, rows):
+    """Synthetic observations with the 12 model features and a target"""
+    import pandas as pd
+
+    rng = np.random.default_rng(42)
+    columns = {name: rng.uniform(0, 1, rows) for name in FEATURE_COLUMNS}
+    columns.update({
+        'hour': rng.integers(0, 24, rows),
+        'month': rng.integers(1, 13, rows),
+        'season': rng.integers(1, 5, rows),
+        TARGET: rng.uniform(5, 300, rows)
+    })
+    pd.DataFrame(columns).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pandas vs Arrow data paths")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic input")
+    args = parser.parse_args()
+
+    print("⏱️ VayuDrishti Data Path Benchmark")
+    print("=" * 72)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = str(Path(tmp) / "observations.csv")
+        write_sample(csv_path, args.rows)
+        print(f"Input: {args.rows:,} rows, {Path(csv_path).stat().st_size / 1e6:.0f} MB CSV")
+        print("-" * 72)
+
+        # A fresh process per scenario so each peak is measured in isolation
+        context = multiprocessing.get_context('spawn')
+        scenarios = [(path, task, csv_path) for task in ('scoring', 'training') for path in ('pandas', 'arrow')]
+        print(f"{'Task':<10}{'Path':<8}{'time (s)':>10}{'peak (MB)':>12}{'copies':>8}  stages copied")
+        for scenario in scenarios:
+            with context.Pool(1) as pool:
+                result = pool.apply(run_scenario, (scenario,))
+            copied = ", ".join(name for name, was_copied in result['stages'] if was_copied)
+            print(f"{result['task']:<10}{result['path']:<8}{result['seconds']:>10.2f}"
+                  f"{result['peak_mb']:>12.0f}{result['copies']:>8}  {copied}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Rerun Latency Benchmark for VayuDrishti Dashboard
+Times a widget change as a full script rerun against the render time of the tab fragment holding it
+
+Usage:
+    python benchmark_reruns.py [--runs 5]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+DASHBOARD_FILE = Path(__file__).parent / "dashboard.py"
+
+# A widget inside each tab fragment and two values to alternate it between:
+# (tab label, element type, widget label or key, values). Tabs without widgets never rerun alone.
+TAB_WIDGETS = {
+    'render_live_prediction_tab': ("🔮 Live Prediction", 'slider', "Aerosol Optical Depth", (0.4, 1.2)),
+    'render_forecast_tab': ("📆 Forecast", 'number_input', "forecast_lat", (28.61, 19.08))
+}
+
+
+def find_widget(app, kind, name):
+    for element in getattr(app, kind):
+        if name in (element.key, element.label):
+            return element
+    raise LookupError(f"No {kind} '{name}' in the dashboard")
+
+
+def run(app):
+    """One timed full script run (ms)"""
+    started = time.perf_counter()
+    app.run()
+    elapsed = (time.perf_counter() - started) * 1000
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return elapsed
+
+
+def benchmark(runs):
+    """{tab: (full rerun times, tab fragment render times)} in milliseconds for the same widget changes
+
+    Only the public AppTest API is used. AppTest always reruns the whole
+    script, so the fragment side is the tab's own render time, which
+    ``tab_fragment`` records in ``st.session_state['render_timings']``
+    during that same rerun. That time is what a browser's fragment-scoped
+    rerun executes, not counting Streamlit's per-run overhead.
+    """
+    app = AppTest.from_file(str(DASHBOARD_FILE), default_timeout=300)
+    run(app)  # Warm-up: model load, data load, grid index build
+
+    results = {}
+    for name, (_, kind, widget, values) in TAB_WIDGETS.items():
+        full, fragment = [], []
+        for index in range(runs):
+            find_widget(app, kind, widget).set_value(values[index % 2])
+            app.session_state['render_timings'] = {}
+            full.append(run(app))
+            timings = app.session_state['render_timings']
+            if name not in timings:
+                raise RuntimeError(f"{name} is not rendered through tab_fragment")
+            fragment.append(timings[name])
+        results[name] = (full, fragment)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard rerun latency")
+    parser.add_argument("--runs", type=int, default=5, help="Measured widget changes per tab")
+    args = parser.parse_args()
+
+    print("⏱️ VayuDrishti Rerun Latency Benchmark")
+    print("=" * 72)
+
+    results = benchmark(args.runs)
+    print(f"{'Widget changed in':<22}{'Widget':<24}{'full (ms)':>10}{'fragment (ms)':>14}{'speedup':>9}")
+    for name, (full, fragment) in results.items():
+        label, _, widget, _ = TAB_WIDGETS[name]
+        full_ms, fragment_ms = statistics.median(full), statistics.median(fragment)
+        print(f"{label:<22}{widget:<24}{full_ms:>10.1f}{fragment_ms:>14.1f}{full_ms / max(fragment_ms, 1e-3):>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
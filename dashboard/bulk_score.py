@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Bulk PM2.5 Scoring for VayuDrishti
+Streams a CSV/Parquet file through the model on a pool of worker processes
+using Arrow record batches end to end
+
+Usage:
+    python bulk_score.py observations.csv predictions.csv [--chunk-size 100000] [--workers 4] [--land-only]
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from arrow_data import SOURCE_COLUMNS, build_features, column_array, is_parquet, iter_tables, read_schema
+from feature_builder import FEATURE_BUILDER
+
+_worker_forecaster = None
+
+
+def _init_worker():
+    """Load the model once per worker process"""
+    global _worker_forecaster
+    from offline_forecast import offline_forecast
+    if not offline_forecast.model_loaded:
+        raise RuntimeError("Model not loaded in worker")
+    _worker_forecaster = offline_forecast
+
+
+def score_chunk(table, land_only=False):
+    """Predict PM2.5 for one Arrow chunk; returns (predictions, rows with NaN features, rows skipped)
+
+    With ``land_only`` rows outside India's land mask never reach the model
+    and get NaN predictions.
+    """
+    if land_only:
+        from land_mask import land_mask
+        land = land_mask.contains(column_array(table, 'latitude', np.float64),
+                                  column_array(table, 'longitude', np.float64))
+        predictions = np.full(table.num_rows, np.nan, dtype=np.float32)
+        if land.any():
+            land_predictions, nan_rows, _ = score_chunk(table.filter(pa.array(land)))
+            predictions[land] = land_predictions
+        else:
+            nan_rows = 0
+        return predictions, nan_rows, int((~land).sum())
+
+    matrix = build_features(table)
+    predictions = np.clip(_worker_forecaster.predict_matrix(matrix), 5, 500).astype(np.float32)
+    return predictions, int(np.isnan(matrix).any(axis=1).sum()), 0
+
+
+def validate_schema(schema, land_only=False, keep_columns=None):
+    """Raise ValueError unless every model feature can be read or derived as a number
+
+    ``keep_columns`` must all be input columns, so a typo fails before any
+    chunk is scored or written.
+    """
+    unknown = [name for name in keep_columns or [] if name not in schema.names]
+    if unknown:
+        raise ValueError(f"--keep columns not in the input: {', '.join(unknown)} "
+                         f"(available: {', '.join(schema.names)})")
+    if land_only and not {'latitude', 'longitude'} <= set(schema.names):
+        raise ValueError("--land-only needs latitude and longitude columns")
+    missing = FEATURE_BUILDER.missing_columns({name: True for name in schema.names})
+    if missing:
+        raise ValueError(f"Input is missing required features: {', '.join(missing)}")
+    non_numeric = [
+        name for name in SOURCE_COLUMNS
+        if name in schema.names and not (
+            pa.types.is_integer(schema.field(name).type) or pa.types.is_floating(schema.field(name).type)
+        )
+    ]
+    if non_numeric:
+        raise ValueError(f"Non-numeric feature columns: {', '.join(non_numeric)}")
+
+
+class ChunkWriter:
+    """Appends scored Arrow chunks to a CSV or Parquet output in arrival order
+
+    Chunks go to a temporary file next to ``path``, which replaces ``path``
+    only when every chunk was written, so a failed run never leaves a partial
+    file that looks like a finished result. An input with no rows still gets
+    a header-only output.
+    """
+
+    def __init__(self, path, schema):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self.schema = schema
+        writer_class = pq.ParquetWriter if is_parquet(self.path) else pa_csv.CSVWriter
+        self.writer = writer_class(str(self.tmp_path), schema)
+        self.rows = 0
+
+    def write(self, table):
+        self.writer.write_table(table.cast(self.schema))
+        self.rows += table.num_rows
+
+    def close(self, success=True):
+        """Publish the output if ``success``, otherwise discard it"""
+        self.writer.close()
+        if success:
+            os.replace(self.tmp_path, self.path)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def output_schema(input_schema, keep_columns=None):
+    """Schema of the scored output: the kept input columns plus the prediction"""
+    schema = input_schema.remove_metadata()
+    if keep_columns:
+        schema = pa.schema([schema.field(name) for name in keep_columns])
+    return schema.append(pa.field('predicted_pm2_5', pa.float32()))
+
+
+def bulk_score(input_path, output_path, chunk_size=100_000, workers=None, keep_columns=None, land_only=False):
+    """Score ``input_path`` into ``output_path``; returns (rows, seconds)"""
+    workers = workers or os.cpu_count()
+    max_in_flight = 2 * workers  # Bounds memory to a few chunks regardless of file size
+    pending = deque()
+    nan_rows = 0
+    skipped_rows = 0
+    started = time.perf_counter()
+
+    def drain(limit):
+        nonlocal nan_rows, skipped_rows
+        # Futures complete in any order but are written in submission order
+        while len(pending) > limit:
+            chunk, future = pending.popleft()
+            predictions, chunk_nan_rows, chunk_skipped_rows = future.result()
+            nan_rows += chunk_nan_rows
+            skipped_rows += chunk_skipped_rows
+            # Skipped (non-land) rows are written as nulls
+            writer.write(chunk.append_column('predicted_pm2_5', pa.array(predictions, from_pandas=True)))
+            elapsed = time.perf_counter() - started
+            print(f"   ✍️ {writer.rows:,} rows written ({writer.rows / elapsed:,.0f} rows/sec)")
+
+    # The whole schema is checked before the workers start or the output is created
+    input_schema = read_schema(input_path)
+    validate_schema(input_schema, land_only, keep_columns)
+    writer = ChunkWriter(output_path, output_schema(input_schema, keep_columns))
+    feature_sources = [name for name in SOURCE_COLUMNS if name in input_schema.names]
+    # Columns that are neither kept nor features are never parsed
+    read_columns = list(dict.fromkeys(keep_columns + feature_sources)) if keep_columns else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for chunk in iter_tables(input_path, chunk_size, read_columns):
+                # Arrow selects are zero-copy; only the feature columns go to the worker
+                output = chunk.select(keep_columns) if keep_columns else chunk
+                pending.append((output, pool.submit(score_chunk, chunk.select(feature_sources), land_only)))
+                drain(max_in_flight)
+            drain(0)
+    except BaseException:
+        writer.close(success=False)
+        raise
+    writer.close()
+
+    if nan_rows:
+        print(f"⚠️ {nan_rows:,} rows had missing feature values (scored with XGBoost's missing-value handling)")
+    if skipped_rows:
+        print(f"🌊 {skipped_rows:,} rows outside India's land mask were skipped (null predictions)")
+    return writer.rows, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file with the PM2.5 model")
+    parser.add_argument("input", help="Input CSV or Parquet file")
+    parser.add_argument("output", help="Output CSV or Parquet file")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--keep", default=None,
+                        help="Comma-separated input columns to copy to the output (default: all)")
+    parser.add_argument("--land-only", action="store_true",
+                        help="Skip rows outside India's land mask before inference")
+    args = parser.parse_args()
+
+    print(f"📦 Scoring {args.input} -> {args.output}")
+    keep_columns = [name.strip() for name in args.keep.split(",")] if args.keep else None
+    try:
+        rows, seconds = bulk_score(args.input, args.output, args.chunk_size, args.workers, keep_columns,
+                                   args.land_only)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    print(f"✅ Scored {rows:,} rows in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -74,16 +74,82 @@ from datetime import datetime, timedelta, date
 import math
 from pathlib import Path
 import logging
+import functools
+import time
 
 # Import offline forecast capability
 try:
-    from offline_forecast import OfflineForecast
-    offline_forecast = OfflineForecast()
+    from offline_forecast import offline_forecast
+    # Pick up retrained models without restarting the dashboard
+    offline_forecast.start_watching()
     OFFLINE_FORECAST_AVAILABLE = True
 except ImportError:
     OFFLINE_FORECAST_AVAILABLE = False
     print("⚠️ Offline forecast module not available")
 
+from aod_interpolator import aod_interpolator
+from feature_builder import FEATURE_BUILDER
+from grid_index import GridIndex
+from land_mask import approximate_mask, land_mask
+from prediction_grid import PredictionGrid
+
+# Precomputed national forecast cubes (sliced instead of running inference)
+try:
+    from forecast_cube import ForecastCube
+except Exception as e:
+    ForecastCube = None
+    print(f"⚠️ Forecast cube not available: {e}")
+
+# Batched TreeSHAP explanations, cached per model version and input
+try:
+    from explanations import (GROUP_NAMES, describe_drivers, explanation_cache,
+                              group_contributions, top_drivers)
+    if OFFLINE_FORECAST_AVAILABLE:
+        offline_forecast.add_reload_listener(
+            'explanations', lambda old_version, new_version: explanation_cache.invalidate_model(old_version)
+        )
+except Exception as e:
+    explanation_cache = None
+    print(f"⚠️ Prediction explanations not available: {e}")
+
+# Truncated-ensemble estimates for interactive sliders
+try:
+    from progressive import ProgressivePredictor
+    progressive_predictor = ProgressivePredictor(offline_forecast) if OFFLINE_FORECAST_AVAILABLE else None
+except Exception as e:
+    progressive_predictor = None
+    print(f"⚠️ Progressive prediction not available: {e}")
+
+# Cached what-if response surfaces for the Live Prediction tab
+try:
+    from sensitivity import SENSITIVITY_AXES, sensitivity_cache
+    if OFFLINE_FORECAST_AVAILABLE:
+        offline_forecast.add_reload_listener(
+            'sensitivity', lambda old_version, new_version: sensitivity_cache.invalidate_model(old_version)
+        )
+except Exception as e:
+    sensitivity_cache = None
+    print(f"⚠️ Sensitivity surfaces not available: {e}")
+
+# Persistent forecast cache shared across sessions and processes
+try:
+    from forecast_cache import forecast_cache
+    if OFFLINE_FORECAST_AVAILABLE:
+        # Forecasts cached for a replaced model are never served again
+        offline_forecast.add_reload_listener(
+            'forecast_cache', lambda old_version, new_version: forecast_cache.invalidate_model(old_version)
+        )
+except Exception as e:
+    forecast_cache = None
+    print(f"⚠️ Forecast cache not available: {e}")
+
+# Live per-station nowcast published incrementally by src/station_nowcast.py
+try:
+    from nowcast_store import nowcast_store
+except Exception as e:
+    nowcast_store = None
+    print(f"⚠️ Station nowcast not available: {e}")
+
 # Configure page
 st.set_page_config(
     page_title="🌍 VayuDrishti",
@@ -287,6 +353,22 @@ st.markdown("""
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fragments (Streamlit >= 1.37) let a widget change rerun only the tab it lives in
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def tab_fragment(func):
+    """Make a tab independently rerunnable and record its render time in milliseconds"""
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings = st.session_state.setdefault('render_timings', {})
+            timings[func.__name__] = (time.perf_counter() - started) * 1000
+    
+    return _fragment(timed) if _fragment is not None else timed
+
 class VayuDrishtiDashboard:
     """Main dashboard class"""
     
@@ -300,8 +382,10 @@ class VayuDrishtiDashboard:
             st.session_state.predictions_data = None
         if 'last_update' not in st.session_state:
             st.session_state.last_update = None
+        if 'grid_index' not in st.session_state:
+            st.session_state.grid_index = None
     
-    def load_prediction_data(self) -> pd.DataFrame:
+    def load_prediction_data(self) -> PredictionGrid:
         """Load prediction data from CSV files"""
         try:
             # Look for prediction files
@@ -327,7 +411,11 @@ class VayuDrishtiDashboard:
             latest_file = max(prediction_files, key=lambda p: p.stat().st_mtime)
             st.info(f"📁 Loading data from: {latest_file.name}")
             
-            df = pd.read_csv(latest_file)
+            df = pd.read_csv(
+                latest_file,
+                usecols=lambda col: col in ('latitude', 'longitude', 'predicted_pm2_5',
+                                            'health_category', 'prediction_timestamp')
+            )
             
             # Ensure required columns exist
             required_cols = ['latitude', 'longitude', 'predicted_pm2_5']
@@ -337,21 +425,19 @@ class VayuDrishtiDashboard:
                 st.error(f"Missing columns in data: {missing_cols}")
                 return self.create_sample_data()
             
-            # Add health categories if not present
-            if 'health_category' not in df.columns:
-                df['health_category'] = df['predicted_pm2_5'].apply(self.get_health_category)
-            
-            # Add timestamp if not present
+            # Keep only typed columns; categories are derived in bulk if not present
+            # and the timestamp is stored once per grid rather than per row
+            timestamp = None
             if 'prediction_timestamp' not in df.columns:
-                df['prediction_timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
-            return df
+            return PredictionGrid.from_frame(df, timestamp=timestamp)
             
         except Exception as e:
             st.error(f"Error loading prediction data: {e}")
             return self.create_sample_data()
     
-    def create_sample_data(self) -> pd.DataFrame:
+    def create_sample_data(self) -> PredictionGrid:
         """Create sample data for demonstration"""
         st.info("📊 Creating sample data for demonstration")
         
@@ -369,27 +455,17 @@ class VayuDrishtiDashboard:
         lons = np.random.uniform(lon_min, lon_max, n_points)
         
         # Generate realistic PM2.5 values with regional variation
-        pm25_values = []
-        health_categories = []
-        
-        for lat, lon in zip(lats, lons):
-            # Add regional variation (Delhi NCR tends to be higher)
-            delhi_distance = ((lat - 28.6)**2 + (lon - 77.2)**2)**0.5
-            base_pm25 = 30 + 40 * np.exp(-delhi_distance/5) + np.random.normal(0, 15)
-            base_pm25 = max(5, min(200, base_pm25))  # Clamp values
-            
-            pm25_values.append(base_pm25)
-            health_categories.append(self.get_health_category(base_pm25))
-        
-        df = pd.DataFrame({
-            'latitude': lats,
-            'longitude': lons,
-            'predicted_pm2_5': pm25_values,
-            'health_category': health_categories,
-            'prediction_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        })
-        
-        return df
+        # (Delhi NCR tends to be higher)
+        delhi_distance = np.sqrt((lats - 28.6)**2 + (lons - 77.2)**2)
+        pm25_values = 30 + 40 * np.exp(-delhi_distance/5) + np.random.normal(0, 15, n_points)
+        pm25_values = np.clip(pm25_values, 5, 200)  # Clamp values
+        
+        return PredictionGrid(
+            lats,
+            lons,
+            pm25_values,
+            timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
     
     def get_health_category(self, pm25_value: float) -> str:
         """Get health category for PM2.5 value"""
@@ -423,12 +499,28 @@ class VayuDrishtiDashboard:
         }
         return color_map.get(category, "#gray")
     
-    def create_india_map(self, df: pd.DataFrame) -> folium.Map:
+    def explain_map_points(self, lats: np.ndarray, lons: np.ndarray, timestamp):
+        """Top feature contributions for every map point from one cached TreeSHAP batch"""
+        if not (OFFLINE_FORECAST_AVAILABLE and offline_forecast.model_loaded and explanation_cache is not None):
+            return None
+        if len(lats) == 0:
+            return []
+        try:
+            when = pd.Timestamp(timestamp).to_pydatetime() if timestamp else datetime.now()
+            # Inputs are rebuilt from the same satellite AOD and climatology the forecasts use
+            columns = offline_forecast.generate_baseline_batch(lats, lons, [when])
+            _, contributions = explanation_cache.explain(offline_forecast, FEATURE_BUILDER.build(columns))
+            return top_drivers(contributions, k=3)
+        except Exception as e:
+            print(f"⚠️ Map explanations failed: {e}")
+            return None
+    
+    def create_india_map(self, grid: PredictionGrid, rows: np.ndarray) -> folium.Map:
         """Create interactive India map with PM2.5 data"""
         # Center on India
         center_lat, center_lon = 20.5937, 78.9629
         
-        # Filter data to include only Indian territory (approximate boundaries)
+        # Map viewport (membership itself comes from the land mask)
         india_bounds = {
             'lat_min': 8.0,   # Southernmost point (Kanyakumari area)
             'lat_max': 37.0,  # Northernmost point (Kashmir)
@@ -436,34 +528,20 @@ class VayuDrishtiDashboard:
             'lon_max': 97.0   # Easternmost point (Arunachal Pradesh)
         }
         
-        # Filter out points over ocean/foreign areas
-        filtered_df = df[
-            (df['latitude'] >= india_bounds['lat_min']) &
-            (df['latitude'] <= india_bounds['lat_max']) &
-            (df['longitude'] >= india_bounds['lon_min']) &
-            (df['longitude'] <= india_bounds['lon_max'])
-        ].copy()
-        
-        # Additional filtering for specific water bodies and foreign areas
-        # Remove points in Arabian Sea (west of 70°E and south of 20°N)
-        filtered_df = filtered_df[~(
-            (filtered_df['longitude'] < 70.0) & (filtered_df['latitude'] < 20.0)
-        )]
-        
-        # Remove points in Bay of Bengal (east of 90°E and south of 15°N)
-        filtered_df = filtered_df[~(
-            (filtered_df['longitude'] > 90.0) & (filtered_df['latitude'] < 15.0)
-        )]
-        
-        # Remove points in Pakistan region (west of 74°E and north of 28°N)
-        filtered_df = filtered_df[~(
-            (filtered_df['longitude'] < 74.0) & (filtered_df['latitude'] > 28.0)
-        )]
-        
-        # Remove points in China region (east of 95°E and north of 28°N)
-        filtered_df = filtered_df[~(
-            (filtered_df['longitude'] > 95.0) & (filtered_df['latitude'] > 28.0)
-        )]
+        lats = grid.latitude[rows]
+        lons = grid.longitude[rows]
+        
+        # Filter out points over ocean/foreign areas with one gather from the land mask
+        states = None
+        if land_mask.available:
+            region_codes = land_mask.lookup(lats, lons)
+            inside = region_codes > 0
+            if land_mask.meta['source'] != 'approximate':
+                states = land_mask.region_names(region_codes[inside])
+        else:
+            inside = approximate_mask(lats, lons)
+        map_rows = rows[inside]
+        drivers = self.explain_map_points(lats[inside], lons[inside], grid.timestamp)
         
         # Create base map with dark theme
         m = folium.Map(
@@ -478,20 +556,29 @@ class VayuDrishtiDashboard:
         )
         
         # Add PM2.5 data points only for filtered locations
-        for _, row in filtered_df.iterrows():
-            lat, lon = row['latitude'], row['longitude']
-            pm25 = row['predicted_pm2_5']
-            category = row['health_category']
+        for index, (lat, lon, pm25, category) in enumerate(zip(
+            lats[inside].tolist(),
+            lons[inside].tolist(),
+            grid.pm25[map_rows].tolist(),
+            grid.category_names(map_rows)
+        )):
             color = self.get_health_color(category)
+            state_html = f"<p><strong>State:</strong> {states[index]}</p>" if states is not None else ""
+            drivers_html = ""
+            if drivers is not None:
+                items = "".join(f"<li>{name}: {value:+.1f} μg/m³</li>" for name, value in drivers[index])
+                drivers_html = f"<p><strong>Main drivers:</strong></p><ul style='margin: 0; padding-left: 16px;'>{items}</ul>"
             
             # Create popup with information
             popup_html = f"""
             <div style="font-family: Arial; width: 200px; color: black;">
                 <h4>📍 PM2.5 Level</h4>
                 <p><strong>Location:</strong> {lat:.2f}°N, {lon:.2f}°E</p>
+                {state_html}
                 <p><strong>PM2.5:</strong> {pm25:.1f} μg/m³</p>
                 <p><strong>Category:</strong> {category}</p>
-                <p><strong>Time:</strong> {row.get('prediction_timestamp', 'N/A')}</p>
+                <p><strong>Time:</strong> {grid.timestamp or 'N/A'}</p>
+                {drivers_html}
             </div>
             """
             
@@ -546,25 +633,35 @@ class VayuDrishtiDashboard:
         
         return m
     
-    def create_pm25_histogram(self, df: pd.DataFrame) -> go.Figure:
-        """Create PM2.5 distribution histogram"""
-        fig = px.histogram(
-            df, 
-            x='predicted_pm2_5',
-            color='health_category',
-            title="📊 PM2.5 Distribution Across India",
-            labels={'predicted_pm2_5': 'PM2.5 (μg/m³)', 'count': 'Number of Locations'},
-            color_discrete_map={
-                "Good": "#00e400",
-                "Moderate": "#ffff00",
-                "Unhealthy for Sensitive Groups": "#ff7e00",
-                "Unhealthy": "#ff0000",
-                "Very Unhealthy": "#8f3f97",
-                "Hazardous": "#7e0023"
-            }
-        )
+    def create_pm25_histogram(self, aggregates: dict) -> go.Figure:
+        """Create PM2.5 distribution histogram from pre-binned counts"""
+        color_map = {
+            "Good": "#00e400",
+            "Moderate": "#ffff00",
+            "Unhealthy for Sensitive Groups": "#ff7e00",
+            "Unhealthy": "#ff0000",
+            "Very Unhealthy": "#8f3f97",
+            "Hazardous": "#7e0023"
+        }
+        
+        # Only the bin counts are sent to the browser, never the grid points
+        edges = aggregates['bin_edges']
+        centers = (edges[:-1] + edges[1:]) / 2
+        fig = go.Figure()
+        for category, counts in zip(aggregates['categories'], aggregates['bin_counts']):
+            if counts.any():
+                fig.add_trace(go.Bar(
+                    x=centers,
+                    y=counts,
+                    width=edges[1] - edges[0],
+                    name=category,
+                    marker_color=color_map.get(category)
+                ))
         
         fig.update_layout(
+            title="📊 PM2.5 Distribution Across India",
+            barmode='stack',
+            bargap=0,
             xaxis_title="PM2.5 Level (μg/m³)",
             yaxis_title="Number of Locations",
             showlegend=True,
@@ -590,36 +687,37 @@ class VayuDrishtiDashboard:
             "🌊 Kochi": {"lat": 9.9312, "lon": 76.2673, "population": "2M"}
         }
         
-        # Generate offline predictions for each city
+        # Score and explain every city in one batched TreeSHAP pass
         cities_data = []
+        names = list(major_cities)
+        lats = np.array([major_cities[name]["lat"] for name in names])
+        lons = np.array([major_cities[name]["lon"] for name in names])
         
-        for city_name, info in major_cities.items():
-            try:
-                if OFFLINE_FORECAST_AVAILABLE and offline_forecast.model_loaded:
-                    # Generate baseline features for the city
-                    features = offline_forecast.generate_baseline_features(
-                        info["lat"], info["lon"], datetime.now()
-                    )
-                    
-                    # Add latitude and longitude to features for the model
-                    features['latitude'] = info["lat"]
-                    features['longitude'] = info["lon"]
-                    
-                    # Use the new prediction function
-                    result = offline_forecast.predict_pm25_offline(features)
-                    
+        try:
+            if OFFLINE_FORECAST_AVAILABLE and offline_forecast.model_loaded and explanation_cache is not None:
+                columns = offline_forecast.generate_baseline_batch(lats, lons, [datetime.now()])
+                predictions, contributions = explanation_cache.explain(
+                    offline_forecast, FEATURE_BUILDER.build(columns)
+                )
+                pm25_values = np.clip(predictions, 5, 500)
+                drivers = top_drivers(contributions, k=2)
+                
+                for city_name, info, pm25, city_drivers in zip(names, major_cities.values(), pm25_values, drivers):
+                    aqi, category = offline_forecast.pm25_to_cpcb_aqi(float(pm25))
                     cities_data.append({
                         "City": city_name,
                         "Population": info["population"],
-                        "PM2.5": result["pm25"],
-                        "AQI": result["aqi"],
-                        "Category": result["health_category"],
+                        "PM2.5": round(float(pm25), 1),
+                        "AQI": int(aqi),
+                        "Category": category,
+                        "Main Drivers": describe_drivers(city_drivers),
                         "Coordinates": f"{info['lat']:.2f}°N, {info['lon']:.2f}°E"
                     })
-                else:
+            else:
+                for city_name, info in major_cities.items():
                     # Fallback demo data if model not available
                     demo_pm25 = np.random.uniform(20, 150)  # Random demo value
-                    aqi, category = offline_forecast.pm25_to_cpcb_aqi(demo_pm25) if offline_forecast else (0, "Unknown")
+                    aqi, category = offline_forecast.pm25_to_cpcb_aqi(demo_pm25) if OFFLINE_FORECAST_AVAILABLE else (0, "Unknown")
                     
                     cities_data.append({
                         "City": city_name,
@@ -627,19 +725,22 @@ class VayuDrishtiDashboard:
                         "PM2.5": round(demo_pm25, 1),
                         "AQI": int(aqi),
                         "Category": category,
+                        "Main Drivers": "N/A",
                         "Coordinates": f"{info['lat']:.2f}°N, {info['lon']:.2f}°E"
                     })
                     
-            except Exception as e:
-                # Error fallback
-                cities_data.append({
-                    "City": city_name,
-                    "Population": info["population"],
-                    "PM2.5": 0.0,
-                    "AQI": 0,
-                    "Category": "Error",
-                    "Coordinates": f"{info['lat']:.2f}°N, {info['lon']:.2f}°E"
-                })
+        except Exception as e:
+            # Error fallback
+            print(f"⚠️ City predictions failed: {e}")
+            cities_data = [{
+                "City": city_name,
+                "Population": info["population"],
+                "PM2.5": 0.0,
+                "AQI": 0,
+                "Category": "Error",
+                "Main Drivers": "N/A",
+                "Coordinates": f"{info['lat']:.2f}°N, {info['lon']:.2f}°E"
+            } for city_name, info in major_cities.items()]
         
         return pd.DataFrame(cities_data)
         
@@ -759,14 +860,15 @@ class VayuDrishtiDashboard:
         
         return regional_stats.reset_index()
     
-    def render_health_advisory_cards(self, df: pd.DataFrame):
+    def render_health_advisory_cards(self, grid: PredictionGrid, rows: np.ndarray):
         """Render health advisory cards"""
         st.subheader("🏥 Health Advisory")
         
         # Calculate overall statistics
-        avg_pm25 = df['predicted_pm2_5'].mean()
-        max_pm25 = df['predicted_pm2_5'].max()
-        dominant_category = df['health_category'].mode().iloc[0]
+        pm25 = grid.pm25[rows]
+        total_locations = len(rows)
+        avg_pm25 = float(pm25.mean()) if total_locations else 0.0
+        max_pm25 = float(pm25.max()) if total_locations else 0.0
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -785,9 +887,9 @@ class VayuDrishtiDashboard:
             )
         
         with col3:
-            locations_good = len(df[df['health_category'] == 'Good'])
-            total_locations = len(df)
-            good_percentage = (locations_good / total_locations) * 100
+            good_code = grid.categories.index('Good') if 'Good' in grid.categories else -1
+            locations_good = int(np.count_nonzero(grid.codes[rows] == good_code))
+            good_percentage = (locations_good / max(total_locations, 1)) * 100
             
             st.metric(
                 label="✅ Good Air Quality",
@@ -796,8 +898,8 @@ class VayuDrishtiDashboard:
             )
         
         with col4:
-            unhealthy_count = len(df[df['predicted_pm2_5'] > 55.4])
-            unhealthy_percentage = (unhealthy_count / total_locations) * 100
+            unhealthy_count = int(np.count_nonzero(pm25 > 55.4))
+            unhealthy_percentage = (unhealthy_count / max(total_locations, 1)) * 100
             
             st.metric(
                 label="⚠️ Unhealthy Levels",
@@ -828,6 +930,37 @@ class VayuDrishtiDashboard:
         for rec in recommendations:
             st.markdown(f"- {rec}")
     
+    def find_forecast_cube(self, start_date: date, days: int):
+        """National forecast cube for this start date and the loaded model, if one was built"""
+        if ForecastCube is None or not OFFLINE_FORECAST_AVAILABLE or not offline_forecast.model_loaded:
+            return None
+        return ForecastCube.find(start_date, days, offline_forecast.model_version)
+    
+    def create_forecast_animation(self, forecast_cube, days: int):
+        """Animated national PM2.5 forecast, one frame per day"""
+        dates = pd.date_range(forecast_cube.start_date, periods=days).strftime('%Y-%m-%d')
+        fig = px.imshow(
+            forecast_cube.stack('pm2_5', days),
+            x=forecast_cube.longitudes,
+            y=forecast_cube.latitudes,
+            origin='lower',
+            animation_frame=0,
+            color_continuous_scale='RdYlGn_r',
+            range_color=(0, 250),
+            labels={'x': 'Longitude', 'y': 'Latitude', 'color': 'PM2.5 (μg/m³)', 'animation_frame': 'Day'},
+            title="🗺️ National PM2.5 Forecast"
+        )
+        for step, day in zip(fig.layout.sliders[0].steps, dates):
+            step.label = day
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='white',
+            title_font_color='white',
+            height=550
+        )
+        return fig
+    
     def generate_forecast_display(self, lat: float, lon: float, days: int, start_date: date, display_col):
         """Generate and display forecast results"""
         with display_col:
@@ -843,18 +976,43 @@ class VayuDrishtiDashboard:
                     
                     # Generate offline forecast using local model
                     if OFFLINE_FORECAST_AVAILABLE:
-                        forecast_data = offline_forecast.generate_forecast(
-                            latitude=lat,
-                            longitude=lon,
-                            start_date=start_date,
-                            forecast_days=days
-                        )
+                        forecast_data = None
+                        forecast_cube = self.find_forecast_cube(start_date, days)
+                        if forecast_cube is not None:
+                            # None when the cube skipped this cell as ocean/outside India
+                            forecast_data = forecast_cube.cell_forecast(lat, lon, days)
+                        if forecast_data is None and forecast_cache is not None:
+                            forecast_data = forecast_cache.get_forecast(
+                                offline_forecast, lat, lon, start_date, days
+                            )
+                        elif forecast_data is None:
+                            forecast_data = offline_forecast.generate_forecast(
+                                latitude=lat,
+                                longitude=lon,
+                                start_date=start_date,
+                                forecast_days=days
+                            )
                         
                         st.session_state.forecast_data = forecast_data
                         
                         # Display results
                         st.markdown("### 📊 Forecast Results (Offline Mode)")
-                        st.info("📝 **Note**: Generated using local ML model with meteorological patterns.")
+                        if forecast_data['model_info']['type'] == 'forecast_cube':
+                            cell = forecast_data['location']
+                            st.info(f"📝 **Note**: Sliced from the precomputed national forecast cube "
+                                    f"(cell {cell['latitude']:.1f}°N, {cell['longitude']:.1f}°E).")
+                        else:
+                            st.info("📝 **Note**: Generated using local ML model with meteorological patterns.")
+                        model_info = forecast_data['model_info']
+                        aod_fallback_days = sum(
+                            item.get('aod_source') in ('climatology', 'domain mean') for item in forecast_data['forecast']
+                        )
+                        if aod_fallback_days and model_info.get('aod_timestamp'):
+                            st.caption(
+                                f"🛰️ {aod_fallback_days} of {len(forecast_data['forecast'])} days are more than "
+                                f"{model_info['aod_max_age_days']} days from the latest AOD pass "
+                                f"({model_info['aod_timestamp'][:10]}) and use the month's mean AOD instead"
+                            )
                         
                         # Prepare data for visualization
                         forecast_df = pd.DataFrame(forecast_data['forecast'])
@@ -1014,6 +1172,574 @@ class VayuDrishtiDashboard:
                         st.warning("⚠️ **Offline forecast model not available**")
                         st.info("📝 **Note**: Please ensure best_model.pkl is in the models/ directory.")
     
+    @tab_fragment
+    def render_map_tab(self, grid: PredictionGrid, rows: np.ndarray):
+        """Render the India map tab for the filtered grid"""
+        st.markdown("<br>", unsafe_allow_html=True)  # Add top spacing
+        st.subheader("🗺️ PM2.5 Levels Across India")
+        
+        # Create and display map with proper spacing
+        india_map = self.create_india_map(grid, rows)
+        st.markdown("<div style='margin: 1.5rem 0;'>", unsafe_allow_html=True)
+        map_data = st_folium(india_map, width=1200, height=600)
+        st.markdown("</div>", unsafe_allow_html=True)
+        
+        st.markdown("<br>", unsafe_allow_html=True)  # Add spacing before health cards
+        
+        # Health advisory cards
+        self.render_health_advisory_cards(grid, rows)
+    
+    @tab_fragment
+    def render_analytics_tab(self, grid_index: GridIndex, rows: np.ndarray):
+        """Render the analytics tab for the filtered grid rows"""
+        st.markdown("<br>", unsafe_allow_html=True)  # Add top spacing
+        st.subheader("📊 Air Quality Analytics")
+        
+        st.markdown("<br>", unsafe_allow_html=True)  # Add spacing after subheader
+        
+        # Bins, category counts and statistics in one pass over the indexed arrays
+        aggregates = grid_index.aggregate(rows)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # PM2.5 distribution
+            hist_fig = self.create_pm25_histogram(aggregates)
+            st.plotly_chart(hist_fig, use_container_width=True)
+        
+        with col2:
+            # Health category pie chart
+            present = aggregates['category_counts'] > 0
+            category_names = [name for name, keep in zip(aggregates['categories'], present) if keep]
+            pie_fig = px.pie(
+                values=aggregates['category_counts'][present],
+                names=category_names,
+                title="🏥 Health Category Distribution",
+                color=category_names,
+                color_discrete_map={
+                    "Good": "#00e400",
+                    "Moderate": "#ffff00",
+                    "Unhealthy for Sensitive Groups": "#ff7e00",
+                    "Unhealthy": "#ff0000",
+                    "Very Unhealthy": "#8f3f97",
+                    "Hazardous": "#7e0023"
+                }
+            )
+            st.plotly_chart(pie_fig, use_container_width=True)
+        
+        st.markdown("<br>", unsafe_allow_html=True)  # Add spacing before statistics
+        
+        # Statistics table
+        st.subheader("📈 Summary Statistics")
+        stats_df = pd.DataFrame({
+            'Metric': ['Mean PM2.5', 'Median PM2.5', 'Std Dev', 'Min PM2.5', 'Max PM2.5', 'Total Locations'],
+            'Value': [
+                f"{aggregates['mean']:.1f} μg/m³",
+                f"{aggregates['median']:.1f} μg/m³",
+                f"{aggregates['std']:.1f} μg/m³",
+                f"{aggregates['min']:.1f} μg/m³",
+                f"{aggregates['max']:.1f} μg/m³",
+                f"{aggregates['count']} locations"
+            ]
+        })
+        st.dataframe(stats_df, use_container_width=True)
+    
+    @tab_fragment
+    def render_cities_tab(self):
+        """Render the major cities tab (independent of the sidebar filters)"""
+        st.subheader("🏙️ Major Indian Cities - Air Quality Status")
+        st.markdown("**Live predictions for India's top metropolitan areas**")
+        
+        # Generate major cities data
+        cities_df = self.create_major_cities_summary()
+        
+        # Display as enhanced dataframe
+        st.dataframe(
+            cities_df,
+            use_container_width=True,
+            column_config={
+                "City": st.column_config.TextColumn("🏙️ City", width="medium"),
+                "Population": st.column_config.TextColumn("👥 Population", width="small"),
+                "PM2.5": st.column_config.NumberColumn("🌬️ PM2.5 (μg/m³)", format="%.1f"),
+                "AQI": st.column_config.NumberColumn("📊 AQI", format="%d"),
+                "Category": st.column_config.TextColumn("🏥 Health Category", width="medium"),
+                "Main Drivers": st.column_config.TextColumn("🔍 Main Drivers (μg/m³)", width="medium"),
+                "Coordinates": st.column_config.TextColumn("📍 Location", width="medium")
+            }
+        )
+        
+        # City comparison chart
+        fig = px.bar(
+            cities_df,
+            x='City',
+            y='PM2.5',
+            title="🏙️ PM2.5 Levels Across Major Indian Cities",
+            color='Category',
+            color_discrete_map={
+                'Good': '#10b981',
+                'Satisfactory': '#f59e0b', 
+                'Moderate': '#f97316',
+                'Poor': '#ef4444',
+                'Very Poor': '#8b5cf6',
+                'Severe': '#dc2626'
+            },
+            hover_data=['AQI', 'Population']
+        )
+        fig.update_layout(
+            xaxis_title="Major Cities",
+            yaxis_title="PM2.5 Concentration (μg/m³)",
+            showlegend=True,
+            height=500
+        )
+        fig.update_xaxes(tickangle=45)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Health summary
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            good_cities = len(cities_df[cities_df['Category'] == 'Good'])
+            st.metric("🟢 Good Air Quality", f"{good_cities} cities")
+        with col2:
+            moderate_cities = len(cities_df[cities_df['Category'].isin(['Satisfactory', 'Moderate'])])
+            st.metric("🟡 Moderate Air Quality", f"{moderate_cities} cities")
+        with col3:
+            poor_cities = len(cities_df[cities_df['Category'].isin(['Poor', 'Very Poor', 'Severe'])])
+            st.metric("🔴 Poor Air Quality", f"{poor_cities} cities")
+
+        self.render_station_nowcast()
+
+    def render_station_nowcast(self):
+        """Latest CPCB station readings, rolling averages and model residuals from the nowcast store"""
+        if nowcast_store is None:
+            return
+        stations = nowcast_store.latest()
+        if stations.empty:
+            return
+
+        st.subheader("📡 CPCB Stations - Live Nowcast")
+        st.caption(f"{len(stations)} stations, latest reading {stations['datetime'].max():%d %b %Y %H:%M}")
+        columns = ['station_name', 'city', 'datetime', 'pm2_5', 'pm2_5_24h', 'aqi', 'aqi_category',
+                   'predicted_pm2_5', 'residual_mean']
+        st.dataframe(
+            stations.sort_values('aqi', ascending=False)[columns],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "station_name": st.column_config.TextColumn("📍 Station", width="medium"),
+                "city": st.column_config.TextColumn("🏙️ City"),
+                "datetime": st.column_config.DatetimeColumn("🕒 Reading", format="DD MMM HH:mm"),
+                "pm2_5": st.column_config.NumberColumn("🌬️ PM2.5 (μg/m³)", format="%.1f"),
+                "pm2_5_24h": st.column_config.NumberColumn("📈 PM2.5 24h avg", format="%.1f"),
+                "aqi": st.column_config.NumberColumn("📊 AQI (24h)", format="%d"),
+                "aqi_category": st.column_config.TextColumn("🏥 Category"),
+                "predicted_pm2_5": st.column_config.NumberColumn("🤖 Model PM2.5", format="%.1f"),
+                "residual_mean": st.column_config.NumberColumn("⚖️ Model bias", format="%+.1f",
+                                                               help="Recent observed minus predicted PM2.5")
+            }
+        )
+    
+    def create_contribution_chart(self, contributions: np.ndarray) -> go.Figure:
+        """Waterfall from the model's base value to the prediction, one step per input"""
+        grouped, bias = group_contributions(contributions[np.newaxis, :])
+        fig = go.Figure(go.Waterfall(
+            orientation='h',
+            measure=['absolute'] + ['relative'] * len(GROUP_NAMES) + ['total'],
+            y=['Base value'] + GROUP_NAMES + ['Prediction'],
+            x=[float(bias[0])] + grouped[0].tolist() + [0],
+            increasing={'marker': {'color': '#ef4444'}},
+            decreasing={'marker': {'color': '#10b981'}},
+            totals={'marker': {'color': '#3b82f6'}}
+        ))
+        fig.update_layout(
+            title="🔍 Why this prediction? (feature contributions, μg/m³)",
+            yaxis={'autorange': 'reversed'},
+            height=400,
+            showlegend=False
+        )
+        return fig
+    
+    def render_progressive_prediction(self, features: dict):
+        """Show the truncated-ensemble estimate first, then replace it with the full prediction"""
+        report = progressive_predictor.calibrate()
+        matrix = FEATURE_BUILDER.build(features)
+        placeholder = st.empty()
+        
+        def show(label, predictions, approximate):
+            pm25 = float(np.clip(predictions[0], 5, 500))
+            aqi, category = offline_forecast.pm25_to_cpcb_aqi(pm25)
+            value = f"≈ {pm25:.1f} μg/m³" if approximate else f"{pm25:.1f} μg/m³"
+            placeholder.metric(label, value, f"AQI {int(aqi)} ({category})", delta_color="off")
+        
+        if report['error'] is not None:
+            # The estimate is on screen before the full ensemble starts scoring
+            show("PM2.5 (estimate)", progressive_predictor.approximate(matrix), approximate=True)
+        show("PM2.5", progressive_predictor.refine(matrix), approximate=False)
+        
+        if report['error'] is not None:
+            st.caption(
+                f"⚡ Estimate uses the first {report['trees']} of {report['n_trees']} trees: "
+                f"mean deviation {report['error']['mae']:.1f} μg/m³ (p95 {report['error']['p95']:.1f}) "
+                f"from the full model on {report['validation_rows']:,} sampled grid inputs "
+                f"(tree count chosen on another {report['calibration_rows']:,})"
+            )
+        else:
+            st.caption(f"⚡ No truncated ensemble met the {report['tolerance']:.0f} μg/m³ tolerance; using all trees")
+    
+    @tab_fragment
+    def render_live_prediction_tab(self):
+        """Render the live prediction tab (depends only on its own inputs)"""
+        st.subheader("🔮 Offline PM2.5 Prediction")
+        st.markdown("Get local ML predictions for any location in India using the trained XGBoost model")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            pred_lat = st.number_input("Latitude", value=28.6, min_value=8.0, max_value=37.0, step=0.1)
+            pred_lon = st.number_input("Longitude", value=77.2, min_value=68.0, max_value=97.0, step=0.1)
+            
+            # Environmental inputs (simplified); AOD defaults to the latest satellite observation,
+            # or to the month's mean once that is too old to count as current
+            now = datetime.now()
+            observed_aod = aod_interpolator.at(pred_lat, pred_lon, when=now)
+            aod_default = 0.65 if observed_aod is None else round(min(2.0, max(0.0, observed_aod)), 2)
+            aod = st.slider("Aerosol Optical Depth", 0.0, 2.0, aod_default, 0.01)
+            if observed_aod is not None:
+                age = float(aod_interpolator.age_days(now)[0])
+                source = aod_interpolator.source_for(now)
+                if source == 'satellite':
+                    st.caption(f"🛰️ Satellite AOD here: {observed_aod:.2f} "
+                               f"(pass {aod_interpolator.timestamp:%Y-%m-%d %H:%M}, {age:.1f} days old)")
+                else:
+                    st.caption(f"🛰️ AOD here: {observed_aod:.2f} ({now:%B} {source}; the latest pass, "
+                               f"{aod_interpolator.timestamp:%Y-%m-%d}, is {age:.0f} days old)")
+            temp = st.slider("Temperature (°C)", -10.0, 50.0, 25.0, 0.5)
+            wind = st.slider("Wind Speed (m/s)", 0.0, 20.0, 4.0, 0.1)
+            humidity = st.slider("Humidity (%)", 0.0, 100.0, 65.0, 1.0)
+            
+        with col2:
+            blh = st.slider("Boundary Layer Height (m)", 0.0, 3000.0, 850.0, 10.0)
+            hour = st.slider("Hour", 0, 23, 12)
+            month = st.slider("Month", 1, 12, 3)
+            season = st.selectbox("Season", [1, 2, 3, 4], index=1, format_func=lambda x: {1: "Winter", 2: "Spring", 3: "Summer", 4: "Monsoon"}[x])
+            
+            # Prepare prediction request (coordinates are encoded by the shared feature builder)
+            features = {
+                "aod_550": aod,
+                "t2m_celsius": temp,
+                "wind_speed_10m": wind,
+                "r2m": humidity,
+                "blh": blh,
+                "latitude": pred_lat,
+                "longitude": pred_lon,
+                "hour": hour,
+                "month": month,
+                "season": season
+            }
+            
+            if progressive_predictor is not None and offline_forecast.model_loaded and st.toggle(
+                "⚡ Interactive mode",
+                help="Score on every slider change: an instant estimate from the first trees, then the full model"
+            ):
+                self.render_progressive_prediction(features)
+            
+            if st.button("🔮 Predict PM2.5", type="primary"):
+                try:
+                    # Use offline prediction
+                    if OFFLINE_FORECAST_AVAILABLE and offline_forecast.model_loaded:
+                        # Scored through TreeSHAP so the explanation comes from the same pass
+                        result = offline_forecast.predict_pm25_offline(features, explain=explanation_cache is not None)
+                        
+                        # Display result
+                        st.success(f"**PM2.5 Prediction: {result['pm25']} μg/m³**")
+                        st.info(f"**AQI: {result['aqi']} ({result['health_category']})**")
+                        if 'contributions' in result:
+                            st.plotly_chart(self.create_contribution_chart(result['contributions'][0]),
+                                            use_container_width=True)
+                        
+                        # Display health message
+                        st.markdown(f"**Health Impact:** {result['health_message']}")
+                        
+                        # Health recommendations based on category
+                        health_cat = result['health_category']
+                        if health_cat == "Good":
+                            recommendations = ["Perfect for outdoor exercise", "All groups can enjoy outdoor activities"]
+                        elif health_cat == "Satisfactory":
+                            recommendations = ["Generally safe for outdoor activities", "Sensitive individuals should monitor symptoms"]
+                        elif health_cat == "Moderate":
+                            recommendations = ["Limit prolonged outdoor exertion", "Consider indoor activities for sensitive groups"]
+                        elif health_cat == "Poor":
+                            recommendations = ["Reduce outdoor activities", "Use air purifiers indoors", "Wear masks when outdoors"]
+                        elif health_cat == "Very Poor":
+                            recommendations = ["Avoid outdoor activities", "Keep windows closed", "Use N95 masks if going out"]
+                        else:  # Severe
+                            recommendations = ["Stay indoors", "Emergency health measures required", "Seek medical attention if experiencing symptoms"]
+                            recommendations = ["Stay indoors", "Use air purifiers", "Seek medical advice if experiencing symptoms"]
+                        
+                        st.markdown("**Recommendations:**")
+                        for rec in recommendations:
+                            st.markdown(f"- {rec}")
+                    else:
+                        st.error("❌ Offline prediction model not available")
+                        st.info("Please ensure best_model.pkl is in the project directory")
+                        
+                except Exception as e:
+                    st.error(f"� **Prediction Error**")
+                    st.error(f"Error: {e}")
+                    
+                    st.markdown("### 🛠️ **Model Status:**")
+                    st.markdown("""
+                    **Offline Mode Requirements:**
+                    - Ensure `best_model.pkl` exists in the project directory
+                    - Model file should be trained XGBoost model
+                    - Check console for loading errors
+                    """)
+                    
+                    st.info("💡 This dashboard now runs fully offline using local ML models!")
+        
+        if sensitivity_cache is not None and OFFLINE_FORECAST_AVAILABLE and offline_forecast.model_loaded:
+            self.render_sensitivity_mode(features)
+    
+    def create_sensitivity_chart(self, surface, point: dict) -> go.Figure:
+        """Heatmap (2-D) or response curve (1-D) with the current inputs marked"""
+        labels = [SENSITIVITY_AXES[name][0] for name in surface.axes]
+        if len(surface.axes) == 1:
+            fig = px.line(x=surface.coordinates[0], y=surface.values, labels={'x': labels[0], 'y': 'PM2.5 (μg/m³)'})
+            fig.add_scatter(x=[point[surface.axes[0]]], y=[surface.at(point)], mode='markers',
+                            marker={'size': 12, 'color': 'white', 'line': {'width': 2, 'color': 'black'}},
+                            name='Current inputs')
+        else:
+            fig = px.imshow(
+                surface.values,
+                x=surface.coordinates[1],
+                y=surface.coordinates[0],
+                origin='lower',
+                aspect='auto',
+                color_continuous_scale='RdYlGn_r',
+                labels={'x': labels[1], 'y': labels[0], 'color': 'PM2.5 (μg/m³)'}
+            )
+            fig.add_scatter(x=[point[surface.axes[1]]], y=[point[surface.axes[0]]], mode='markers',
+                            marker={'size': 12, 'color': 'white', 'line': {'width': 2, 'color': 'black'}},
+                            name='Current inputs')
+        fig.update_layout(title="🧭 PM2.5 response surface", height=500, showlegend=False)
+        return fig
+    
+    def render_sensitivity_mode(self, features: dict):
+        """Score a dense grid over one or two inputs once, then answer slider moves by lookup"""
+        st.markdown("---")
+        if not st.toggle("🧭 Sensitivity mode",
+                         help="Score a dense grid over the chosen inputs once; moving their sliders is then a lookup"):
+            return
+        
+        names = list(SENSITIVITY_AXES)
+        col1, col2 = st.columns(2)
+        with col1:
+            x_axis = st.selectbox("Sweep (x-axis)", names, index=names.index('aod_550'),
+                                  format_func=lambda name: SENSITIVITY_AXES[name][0])
+        with col2:
+            y_options = [None] + [name for name in names if name != x_axis]
+            y_axis = st.selectbox("Against (y-axis)", y_options,
+                                  index=y_options.index('blh') if 'blh' in y_options else 0,
+                                  format_func=lambda name: "None (1-D curve)" if name is None else SENSITIVITY_AXES[name][0])
+        
+        axes = [x_axis] if y_axis is None else [y_axis, x_axis]
+        surface = sensitivity_cache.surface(offline_forecast, axes, features)
+        pm25 = surface.at(features)
+        aqi, category = offline_forecast.pm25_to_cpcb_aqi(pm25)
+        st.metric("PM2.5 at current inputs (from surface)", f"{pm25:.1f} μg/m³", f"AQI {int(aqi)} ({category})",
+                  delta_color="off")
+        st.plotly_chart(self.create_sensitivity_chart(surface, features), use_container_width=True)
+        st.caption(f"{surface.values.size:,} input combinations scored in one batch "
+                   f"({surface.elapsed * 1000:.0f} ms, model {surface.model_version}); other inputs held at their current values")
+    
+    @tab_fragment
+    def render_forecast_tab(self):
+        """Render the multi-day forecast tab (depends only on its own inputs)"""
+        st.markdown("### 📆 Offline PM2.5 & AQI Forecast (3/7 Days)")
+        st.markdown("**Generate multi-day air quality forecasts using local ML model**")
+        
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            st.markdown("#### 📍 Location & Settings")
+            
+            # Quick city selector
+            city_options = {
+                "Custom Location": None,
+                "🏛️ Delhi": (28.6139, 77.2090),
+                "🏙️ Mumbai": (19.0760, 72.8777),
+                "🌆 Bangalore": (12.9716, 77.5946),
+                "🏘️ Kolkata": (22.5726, 88.3639),
+                "🌴 Chennai": (13.0827, 80.2707),
+                "💻 Hyderabad": (17.3850, 78.4867),
+                "🕌 Ahmedabad": (23.0225, 72.5714),
+                "🎓 Pune": (18.5204, 73.8567),
+                "🏰 Jaipur": (26.9124, 75.7873),
+                "🏛️ Lucknow": (26.8467, 80.9462)
+            }
+            
+            selected_city = st.selectbox(
+                "🏙️ Quick City Select",
+                options=list(city_options.keys()),
+                help="Select a major city or choose 'Custom Location' to enter coordinates"
+            )
+            
+            # Set coordinates based on selection
+            if city_options[selected_city] is not None:
+                default_lat, default_lon = city_options[selected_city]
+            else:
+                default_lat, default_lon = 28.6139, 77.2090
+            
+            # Location inputs with validation
+            forecast_lat = st.number_input(
+                "🌐 Latitude", 
+                value=default_lat, 
+                min_value=8.0, 
+                max_value=37.0, 
+                step=0.001,
+                format="%.3f",
+                key="forecast_lat",
+                help="Latitude coordinate (8° to 37°N for India)"
+            )
+            forecast_lon = st.number_input(
+                "🌐 Longitude", 
+                value=default_lon, 
+                min_value=68.0, 
+                max_value=97.25, 
+                step=0.001,
+                format="%.3f",
+                key="forecast_lon",
+                help="Longitude coordinate (68° to 97.25°E for India)"
+            )
+            
+            # Validate location
+            if forecast_lat and forecast_lon:
+                # Basic validation for Indian territory
+                is_valid_location = (8.0 <= forecast_lat <= 37.0 and 
+                                   68.0 <= forecast_lon <= 97.25)
+                
+                # Check for obvious water bodies
+                is_likely_ocean = ((forecast_lon < 70.0 and forecast_lat < 20.0) or
+                                 (forecast_lon > 90.0 and forecast_lat < 15.0))
+                
+                if not is_valid_location:
+                    st.error("⚠️ Location outside Indian territory bounds")
+                elif is_likely_ocean:
+                    st.warning("🌊 Location may be in ocean - please verify")
+                else:
+                    st.success("✅ Valid Indian location")
+            
+            st.markdown("---")
+            
+            # Forecast settings
+            st.markdown("#### ⚙️ Forecast Configuration")
+            
+            forecast_days = st.selectbox(
+                "📅 Forecast Period",
+                options=[3, 7],
+                format_func=lambda x: f"{x} Days Forecast",
+                key="forecast_days",
+                help="Choose between 3-day or 7-day forecast"
+            )
+            
+            start_date = st.date_input(
+                "📅 Start Date",
+                value=date.today(),
+                min_value=date.today(),
+                max_value=date.today() + timedelta(days=7),
+                key="forecast_start_date",
+                help="Forecast start date (today or future)"
+            )
+            
+            st.markdown("---")
+            
+            # Enhanced forecast button
+            st.markdown("#### 🔮 Generate Forecast")
+            
+            if st.button("� Generate Enhanced Forecast", 
+                       type="primary", 
+                       use_container_width=True,
+                       key="generate_forecast",
+                       help="Click to generate multi-day PM2.5 and AQI forecast"):
+                
+                # Validate inputs before making request
+                if not is_valid_location:
+                    st.error("❌ Please enter valid coordinates within India")
+                elif is_likely_ocean:
+                    st.error("❌ Location appears to be in water. Please select a land location.")
+                else:
+                    self.generate_forecast_display(forecast_lat, forecast_lon, forecast_days, start_date, col2)
+            
+            # Info section
+            st.markdown("---")
+            st.markdown("#### 📖 Information")
+            
+            with st.expander("ℹ️ How it works", expanded=False):
+                st.markdown("""
+                **🔬 Forecast Method:**
+                - Uses trained XGBoost ML model
+                - Incorporates seasonal patterns
+                - Applies location-specific adjustments
+                - Accounts for weekly trends
+                - Includes realistic daily variation
+                
+                **📊 Output:**
+                - Daily PM2.5 concentrations (μg/m³)
+                - CPCB AQI values and categories
+                - Health recommendations
+                - Interactive visualizations
+                """)
+            
+            with st.expander("🎯 Accuracy Notes", expanded=False):
+                st.markdown("""
+                **✅ High Accuracy Locations:**
+                - Delhi NCR, Mumbai, Bangalore
+                - Kolkata, Chennai, Hyderabad
+                - Other major metropolitan areas
+                
+                **⚠️ Limitations:**
+                - Weather dependent variations
+                - Sudden policy/event impacts
+                - Remote area predictions
+                
+                **💡 Best Practices:**
+                - Use for planning purposes
+                - Check daily for updates
+                - Consider local conditions
+                """)
+                
+        # Display area for results
+        with col2:
+                st.markdown("### 📊 Forecast Results")
+                st.info("👆 Configure location and click 'Generate Forecast' to see results")
+                
+                forecast_cube = self.find_forecast_cube(start_date, forecast_days)
+                if forecast_cube is not None:
+                    st.plotly_chart(self.create_forecast_animation(forecast_cube, forecast_days), use_container_width=True)
+                    return
+                
+                # Placeholder chart
+                placeholder_data = pd.DataFrame({
+                    'Date': pd.date_range(start=date.today(), periods=3),
+                    'PM2.5': [50, 60, 45],
+                    'AQI': [100, 120, 90]
+                })
+                
+                fig = px.line(
+                    placeholder_data, 
+                    x='Date', 
+                    y='PM2.5',
+                    title="📈 Sample PM2.5 Forecast",
+                    markers=True
+                )
+                fig.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    font_color='white',
+                    title_font_color='white',
+                    showlegend=False
+                )
+                st.plotly_chart(fig, use_container_width=True)
+    
     def run_dashboard(self):
         """Main dashboard function"""
         # Header with improved spacing
@@ -1043,6 +1769,7 @@ class VayuDrishtiDashboard:
             # Data refresh
             if st.button("🔄 Refresh Data", type="primary"):
                 st.session_state.predictions_data = None
+                st.session_state.grid_index = None
                 st.rerun()
             
             # Data source info
@@ -1057,25 +1784,29 @@ class VayuDrishtiDashboard:
         if st.session_state.predictions_data is None:
             with st.spinner("Loading prediction data..."):
                 st.session_state.predictions_data = self.load_prediction_data()
+                st.session_state.grid_index = None
                 st.session_state.last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        df = st.session_state.predictions_data
+        grid = st.session_state.predictions_data
         
-        if df is None or len(df) == 0:
+        if grid is None or len(grid) == 0:
             st.error("No data available. Please run the daily prediction job first.")
             return
         
+        # Index the loaded grid once; filter changes then reuse it
+        if st.session_state.grid_index is None:
+            st.session_state.grid_index = GridIndex.from_grid(grid)
+        grid_index = st.session_state.grid_index
+        
         # Apply filters
         with st.sidebar:
             # Health category filter
-            health_categories = ["All"] + sorted(df['health_category'].unique().tolist())
+            health_categories = ["All"] + grid_index.present_categories
             selected_category = st.selectbox("Health Category", health_categories)
-            
-            if selected_category != "All":
-                df = df[df['health_category'] == selected_category]
+            category_filter = None if selected_category == "All" else selected_category
             
             # PM2.5 range filter
-            min_pm25, max_pm25 = float(df['predicted_pm2_5'].min()), float(df['predicted_pm2_5'].max())
+            min_pm25, max_pm25 = grid_index.value_bounds(category_filter)
             pm25_range = st.slider(
                 "PM2.5 Range (μg/m³)",
                 min_value=min_pm25,
@@ -1084,414 +1815,28 @@ class VayuDrishtiDashboard:
                 step=1.0
             )
             
-            df = df[
-                (df['predicted_pm2_5'] >= pm25_range[0]) & 
-                (df['predicted_pm2_5'] <= pm25_range[1])
-            ]
+            filtered_rows = grid_index.select(category_filter, pm25_range)
             
             # Show filtered stats
-            st.markdown(f"**Showing {len(df)} locations**")
+            st.markdown(f"**Showing {len(filtered_rows)} locations**")
         
         # Main content
         tab1, tab2, tab3, tab4, tab5 = st.tabs(["🗺️ India Map", "📊 Analytics", "🏙️ Major Cities", "🔮 Live Prediction", "📆 Forecast"])
         
         with tab1:
-            st.markdown("<br>", unsafe_allow_html=True)  # Add top spacing
-            st.subheader("🗺️ PM2.5 Levels Across India")
-            
-            # Create and display map with proper spacing
-            india_map = self.create_india_map(df)
-            st.markdown("<div style='margin: 1.5rem 0;'>", unsafe_allow_html=True)
-            map_data = st_folium(india_map, width=1200, height=600)
-            st.markdown("</div>", unsafe_allow_html=True)
-            
-            st.markdown("<br>", unsafe_allow_html=True)  # Add spacing before health cards
-            
-            # Health advisory cards
-            self.render_health_advisory_cards(df)
+            self.render_map_tab(grid, filtered_rows)
         
         with tab2:
-            st.markdown("<br>", unsafe_allow_html=True)  # Add top spacing
-            st.subheader("📊 Air Quality Analytics")
-            
-            st.markdown("<br>", unsafe_allow_html=True)  # Add spacing after subheader
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # PM2.5 distribution
-                hist_fig = self.create_pm25_histogram(df)
-                st.plotly_chart(hist_fig, use_container_width=True)
-            
-            with col2:
-                # Health category pie chart
-                category_counts = df['health_category'].value_counts()
-                pie_fig = px.pie(
-                    values=category_counts.values,
-                    names=category_counts.index,
-                    title="🏥 Health Category Distribution",
-                    color=category_counts.index,
-                    color_discrete_map={
-                        "Good": "#00e400",
-                        "Moderate": "#ffff00",
-                        "Unhealthy for Sensitive Groups": "#ff7e00",
-                        "Unhealthy": "#ff0000",
-                        "Very Unhealthy": "#8f3f97",
-                        "Hazardous": "#7e0023"
-                    }
-                )
-                st.plotly_chart(pie_fig, use_container_width=True)
-            
-            st.markdown("<br>", unsafe_allow_html=True)  # Add spacing before statistics
-            
-            # Statistics table
-            st.subheader("📈 Summary Statistics")
-            stats_df = pd.DataFrame({
-                'Metric': ['Mean PM2.5', 'Median PM2.5', 'Std Dev', 'Min PM2.5', 'Max PM2.5', 'Total Locations'],
-                'Value': [
-                    f"{df['predicted_pm2_5'].mean():.1f} μg/m³",
-                    f"{df['predicted_pm2_5'].median():.1f} μg/m³",
-                    f"{df['predicted_pm2_5'].std():.1f} μg/m³",
-                    f"{df['predicted_pm2_5'].min():.1f} μg/m³",
-                    f"{df['predicted_pm2_5'].max():.1f} μg/m³",
-                    f"{len(df)} locations"
-                ]
-            })
-            st.dataframe(stats_df, use_container_width=True)
+            self.render_analytics_tab(grid_index, filtered_rows)
         
         with tab3:
-            st.subheader("🏙️ Major Indian Cities - Air Quality Status")
-            st.markdown("**Live predictions for India's top metropolitan areas**")
-            
-            # Generate major cities data
-            cities_df = self.create_major_cities_summary()
-            
-            # Display as enhanced dataframe
-            st.dataframe(
-                cities_df,
-                use_container_width=True,
-                column_config={
-                    "City": st.column_config.TextColumn("🏙️ City", width="medium"),
-                    "Population": st.column_config.TextColumn("👥 Population", width="small"),
-                    "PM2.5": st.column_config.NumberColumn("🌬️ PM2.5 (μg/m³)", format="%.1f"),
-                    "AQI": st.column_config.NumberColumn("📊 AQI", format="%d"),
-                    "Category": st.column_config.TextColumn("🏥 Health Category", width="medium"),
-                    "Coordinates": st.column_config.TextColumn("📍 Location", width="medium")
-                }
-            )
-            
-            # City comparison chart
-            fig = px.bar(
-                cities_df,
-                x='City',
-                y='PM2.5',
-                title="🏙️ PM2.5 Levels Across Major Indian Cities",
-                color='Category',
-                color_discrete_map={
-                    'Good': '#10b981',
-                    'Satisfactory': '#f59e0b', 
-                    'Moderate': '#f97316',
-                    'Poor': '#ef4444',
-                    'Very Poor': '#8b5cf6',
-                    'Severe': '#dc2626'
-                },
-                hover_data=['AQI', 'Population']
-            )
-            fig.update_layout(
-                xaxis_title="Major Cities",
-                yaxis_title="PM2.5 Concentration (μg/m³)",
-                showlegend=True,
-                height=500
-            )
-            fig.update_xaxes(tickangle=45)
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Health summary
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                good_cities = len(cities_df[cities_df['Category'] == 'Good'])
-                st.metric("🟢 Good Air Quality", f"{good_cities} cities")
-            with col2:
-                moderate_cities = len(cities_df[cities_df['Category'].isin(['Satisfactory', 'Moderate'])])
-                st.metric("🟡 Moderate Air Quality", f"{moderate_cities} cities")
-            with col3:
-                poor_cities = len(cities_df[cities_df['Category'].isin(['Poor', 'Very Poor', 'Severe'])])
-                st.metric("🔴 Poor Air Quality", f"{poor_cities} cities")
+            self.render_cities_tab()
         
         with tab4:
-            st.subheader("🔮 Offline PM2.5 Prediction")
-            st.markdown("Get local ML predictions for any location in India using the trained XGBoost model")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                pred_lat = st.number_input("Latitude", value=28.6, min_value=8.0, max_value=37.0, step=0.1)
-                pred_lon = st.number_input("Longitude", value=77.2, min_value=68.0, max_value=97.0, step=0.1)
-                
-                # Environmental inputs (simplified)
-                aod = st.slider("Aerosol Optical Depth", 0.0, 2.0, 0.65, 0.01)
-                temp = st.slider("Temperature (°C)", -10.0, 50.0, 25.0, 0.5)
-                wind = st.slider("Wind Speed (m/s)", 0.0, 20.0, 4.0, 0.1)
-                humidity = st.slider("Humidity (%)", 0.0, 100.0, 65.0, 1.0)
-                
-            with col2:
-                blh = st.slider("Boundary Layer Height (m)", 0.0, 3000.0, 850.0, 10.0)
-                hour = st.slider("Hour", 0, 23, 12)
-                month = st.slider("Month", 1, 12, 3)
-                season = st.selectbox("Season", [1, 2, 3, 4], index=1, format_func=lambda x: {1: "Winter", 2: "Spring", 3: "Summer", 4: "Monsoon"}[x])
-                
-                if st.button("🔮 Predict PM2.5", type="primary"):
-                    # Prepare prediction request
-                    features = {
-                        "aod_550": aod,
-                        "t2m_celsius": temp,
-                        "wind_speed_10m": wind,
-                        "r2m": humidity,
-                        "blh": blh,
-                        "lat_cos": math.cos(math.radians(pred_lat)),
-                        "lat_sin": math.sin(math.radians(pred_lat)),
-                        "lon_cos": math.cos(math.radians(pred_lon)),
-                        "lon_sin": math.sin(math.radians(pred_lon)),
-                        "hour": hour,
-                        "month": month,
-                        "season": season
-                    }
-                    
-                    try:
-                        # Use offline prediction
-                        if OFFLINE_FORECAST_AVAILABLE and offline_forecast.model_loaded:
-                            # Add latitude and longitude to features
-                            features["latitude"] = pred_lat
-                            features["longitude"] = pred_lon
-                            
-                            # Use the corrected prediction function
-                            result = offline_forecast.predict_pm25_offline(features)
-                            
-                            # Display result
-                            st.success(f"**PM2.5 Prediction: {result['pm25']} μg/m³**")
-                            st.info(f"**AQI: {result['aqi']} ({result['health_category']})**")
-                            
-                            # Display health message
-                            st.markdown(f"**Health Impact:** {result['health_message']}")
-                            
-                            # Health recommendations based on category
-                            health_cat = result['health_category']
-                            if health_cat == "Good":
-                                recommendations = ["Perfect for outdoor exercise", "All groups can enjoy outdoor activities"]
-                            elif health_cat == "Satisfactory":
-                                recommendations = ["Generally safe for outdoor activities", "Sensitive individuals should monitor symptoms"]
-                            elif health_cat == "Moderate":
-                                recommendations = ["Limit prolonged outdoor exertion", "Consider indoor activities for sensitive groups"]
-                            elif health_cat == "Poor":
-                                recommendations = ["Reduce outdoor activities", "Use air purifiers indoors", "Wear masks when outdoors"]
-                            elif health_cat == "Very Poor":
-                                recommendations = ["Avoid outdoor activities", "Keep windows closed", "Use N95 masks if going out"]
-                            else:  # Severe
-                                recommendations = ["Stay indoors", "Emergency health measures required", "Seek medical attention if experiencing symptoms"]
-                                recommendations = ["Stay indoors", "Use air purifiers", "Seek medical advice if experiencing symptoms"]
-                            
-                            st.markdown("**Recommendations:**")
-                            for rec in recommendations:
-                                st.markdown(f"- {rec}")
-                        else:
-                            st.error("❌ Offline prediction model not available")
-                            st.info("Please ensure best_model.pkl is in the project directory")
-                            
-                    except Exception as e:
-                        st.error(f"� **Prediction Error**")
-                        st.error(f"Error: {e}")
-                        
-                        st.markdown("### 🛠️ **Model Status:**")
-                        st.markdown("""
-                        **Offline Mode Requirements:**
-                        - Ensure `best_model.pkl` exists in the project directory
-                        - Model file should be trained XGBoost model
-                        - Check console for loading errors
-                        """)
-                        
-                        st.info("💡 This dashboard now runs fully offline using local ML models!")
+            self.render_live_prediction_tab()
         
         with tab5:
-            st.markdown("### 📆 Offline PM2.5 & AQI Forecast (3/7 Days)")
-            st.markdown("**Generate multi-day air quality forecasts using local ML model**")
-            
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                st.markdown("#### 📍 Location & Settings")
-                
-                # Quick city selector
-                city_options = {
-                    "Custom Location": None,
-                    "🏛️ Delhi": (28.6139, 77.2090),
-                    "🏙️ Mumbai": (19.0760, 72.8777),
-                    "🌆 Bangalore": (12.9716, 77.5946),
-                    "🏘️ Kolkata": (22.5726, 88.3639),
-                    "🌴 Chennai": (13.0827, 80.2707),
-                    "💻 Hyderabad": (17.3850, 78.4867),
-                    "🕌 Ahmedabad": (23.0225, 72.5714),
-                    "🎓 Pune": (18.5204, 73.8567),
-                    "🏰 Jaipur": (26.9124, 75.7873),
-                    "🏛️ Lucknow": (26.8467, 80.9462)
-                }
-                
-                selected_city = st.selectbox(
-                    "🏙️ Quick City Select",
-                    options=list(city_options.keys()),
-                    help="Select a major city or choose 'Custom Location' to enter coordinates"
-                )
-                
-                # Set coordinates based on selection
-                if city_options[selected_city] is not None:
-                    default_lat, default_lon = city_options[selected_city]
-                else:
-                    default_lat, default_lon = 28.6139, 77.2090
-                
-                # Location inputs with validation
-                forecast_lat = st.number_input(
-                    "🌐 Latitude", 
-                    value=default_lat, 
-                    min_value=8.0, 
-                    max_value=37.0, 
-                    step=0.001,
-                    format="%.3f",
-                    key="forecast_lat",
-                    help="Latitude coordinate (8° to 37°N for India)"
-                )
-                forecast_lon = st.number_input(
-                    "🌐 Longitude", 
-                    value=default_lon, 
-                    min_value=68.0, 
-                    max_value=97.25, 
-                    step=0.001,
-                    format="%.3f",
-                    key="forecast_lon",
-                    help="Longitude coordinate (68° to 97.25°E for India)"
-                )
-                
-                # Validate location
-                if forecast_lat and forecast_lon:
-                    # Basic validation for Indian territory
-                    is_valid_location = (8.0 <= forecast_lat <= 37.0 and 
-                                       68.0 <= forecast_lon <= 97.25)
-                    
-                    # Check for obvious water bodies
-                    is_likely_ocean = ((forecast_lon < 70.0 and forecast_lat < 20.0) or
-                                     (forecast_lon > 90.0 and forecast_lat < 15.0))
-                    
-                    if not is_valid_location:
-                        st.error("⚠️ Location outside Indian territory bounds")
-                    elif is_likely_ocean:
-                        st.warning("🌊 Location may be in ocean - please verify")
-                    else:
-                        st.success("✅ Valid Indian location")
-                
-                st.markdown("---")
-                
-                # Forecast settings
-                st.markdown("#### ⚙️ Forecast Configuration")
-                
-                forecast_days = st.selectbox(
-                    "📅 Forecast Period",
-                    options=[3, 7],
-                    format_func=lambda x: f"{x} Days Forecast",
-                    key="forecast_days",
-                    help="Choose between 3-day or 7-day forecast"
-                )
-                
-                start_date = st.date_input(
-                    "📅 Start Date",
-                    value=date.today(),
-                    min_value=date.today(),
-                    max_value=date.today() + timedelta(days=7),
-                    key="forecast_start_date",
-                    help="Forecast start date (today or future)"
-                )
-                
-                st.markdown("---")
-                
-                # Enhanced forecast button
-                st.markdown("#### 🔮 Generate Forecast")
-                
-                if st.button("� Generate Enhanced Forecast", 
-                           type="primary", 
-                           use_container_width=True,
-                           key="generate_forecast",
-                           help="Click to generate multi-day PM2.5 and AQI forecast"):
-                    
-                    # Validate inputs before making request
-                    if not is_valid_location:
-                        st.error("❌ Please enter valid coordinates within India")
-                    elif is_likely_ocean:
-                        st.error("❌ Location appears to be in water. Please select a land location.")
-                    else:
-                        self.generate_forecast_display(forecast_lat, forecast_lon, forecast_days, start_date, col2)
-                
-                # Info section
-                st.markdown("---")
-                st.markdown("#### 📖 Information")
-                
-                with st.expander("ℹ️ How it works", expanded=False):
-                    st.markdown("""
-                    **🔬 Forecast Method:**
-                    - Uses trained XGBoost ML model
-                    - Incorporates seasonal patterns
-                    - Applies location-specific adjustments
-                    - Accounts for weekly trends
-                    - Includes realistic daily variation
-                    
-                    **📊 Output:**
-                    - Daily PM2.5 concentrations (μg/m³)
-                    - CPCB AQI values and categories
-                    - Health recommendations
-                    - Interactive visualizations
-                    """)
-                
-                with st.expander("🎯 Accuracy Notes", expanded=False):
-                    st.markdown("""
-                    **✅ High Accuracy Locations:**
-                    - Delhi NCR, Mumbai, Bangalore
-                    - Kolkata, Chennai, Hyderabad
-                    - Other major metropolitan areas
-                    
-                    **⚠️ Limitations:**
-                    - Weather dependent variations
-                    - Sudden policy/event impacts
-                    - Remote area predictions
-                    
-                    **💡 Best Practices:**
-                    - Use for planning purposes
-                    - Check daily for updates
-                    - Consider local conditions
-                    """)
-                    
-            # Display area for results
-            with col2:
-                    st.markdown("### 📊 Forecast Results")
-                    st.info("👆 Configure location and click 'Generate Forecast' to see results")
-                    
-                    # Placeholder chart
-                    placeholder_data = pd.DataFrame({
-                        'Date': pd.date_range(start=date.today(), periods=3),
-                        'PM2.5': [50, 60, 45],
-                        'AQI': [100, 120, 90]
-                    })
-                    
-                    fig = px.line(
-                        placeholder_data, 
-                        x='Date', 
-                        y='PM2.5',
-                        title="📈 Sample PM2.5 Forecast",
-                        markers=True
-                    )
-                    fig.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        font_color='white',
-                        title_font_color='white',
-                        showlegend=False
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+            self.render_forecast_tab()
         
         # Enhanced Footer
         st.markdown("---")
@@ -0,0 +1,101 @@
+"""
+Prediction Explanations for VayuDrishti
+Batched TreeSHAP feature contributions from the booster, cached per model version and input
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from feature_builder import FEATURE_COLUMNS
+
+# Encoded features are reported under the input they were derived from
+CONTRIBUTION_GROUPS = {
+    'AOD': ['aod_550'],
+    'Temperature': ['t2m_celsius'],
+    'Wind speed': ['wind_speed_10m'],
+    'Humidity': ['r2m'],
+    'Boundary layer': ['blh'],
+    'Location': ['lat_cos', 'lat_sin', 'lon_cos', 'lon_sin'],
+    'Hour': ['hour'],
+    'Seasonality': ['month', 'season']
+}
+GROUP_NAMES = list(CONTRIBUTION_GROUPS)
+_GROUP_INDEX = [[FEATURE_COLUMNS.index(name) for name in columns] for columns in CONTRIBUTION_GROUPS.values()]
+
+
+def group_contributions(contributions):
+    """(rows, len(GROUP_NAMES)) contributions and the (rows,) bias from raw TreeSHAP output"""
+    contributions = np.asarray(contributions)
+    grouped = np.stack([contributions[:, index].sum(axis=1) for index in _GROUP_INDEX], axis=1)
+    return grouped, contributions[:, -1]
+
+
+def top_drivers(contributions, k=3):
+    """The ``k`` largest grouped contributions of each row as [(group, μg/m³), ...]"""
+    grouped, _ = group_contributions(contributions)
+    order = np.argsort(-np.abs(grouped), axis=1)[:, :k]
+    return [
+        [(GROUP_NAMES[j], float(grouped[row, j])) for j in order[row]]
+        for row in range(len(grouped))
+    ]
+
+
+def describe_drivers(drivers):
+    """One row of top_drivers() as display text, e.g. 'AOD +35.2, Hour -4.1'"""
+    return ", ".join(f"{name} {value:+.1f}" for name, value in drivers)
+
+
+class ExplanationCache:
+    """LRU of (predictions, contributions) keyed by model version and feature-matrix digest
+
+    Predictions are the row sums of the contributions, so an explained batch
+    never needs a second, plain prediction pass.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(feature_matrix, model_version):
+        matrix = np.ascontiguousarray(feature_matrix, dtype=np.float32)
+        digest = hashlib.sha1(matrix.tobytes()).hexdigest()[:16]
+        return f"{digest}|{matrix.shape[0]}|{model_version}"
+
+    def explain(self, forecaster, feature_matrix):
+        """(predictions, contributions) for every row, from the cache or one TreeSHAP pass"""
+        key = self.make_key(feature_matrix, forecaster.model_version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        contributions = forecaster.explain_matrix(feature_matrix)
+        result = (contributions.sum(axis=1), contributions)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def invalidate_model(self, model_version):
+        """Drop every entry computed with ``model_version``"""
+        with self._lock:
+            for key in [key for key in self._entries if key.endswith(f"|{model_version}")]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared instance used by the dashboard
+explanation_cache = ExplanationCache()
@@ -0,0 +1,149 @@
+"""
+Feature Builder for VayuDrishti PM2.5 Model
+Single definition of the 12-feature schema shared by training and serving
+"""
+
+import numpy as np
+import pandas as pd
+
+# Column order expected by models/best_model.pkl
+FEATURE_COLUMNS = [
+    'aod_550', 't2m_celsius', 'wind_speed_10m', 'r2m', 'blh',
+    'lat_cos', 'lat_sin', 'lon_cos', 'lon_sin', 'hour', 'month', 'season'
+]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+# Values used when an input does not provide a feature
+FEATURE_DEFAULTS = {
+    'aod_550': 0.6,
+    't2m_celsius': 25.0,
+    'wind_speed_10m': 4.0,
+    'r2m': 65.0,
+    'blh': 800.0,
+    'latitude': 28.6,
+    'longitude': 77.2,
+    'hour': 12,
+    'month': 6,
+    'season': 2
+}
+
+# Season code by month (index 0 unused): 1=Winter, 2=Spring, 3=Monsoon, 4=Post-monsoon
+# (September is Monsoon here; the training notebook's original cell put it in season 4)
+SEASON_BY_MONTH = np.array([0, 1, 1, 2, 2, 2, 3, 3, 3, 3, 4, 4, 1], dtype=np.int8)
+
+# Cyclic encodings: feature -> (coordinate column, numpy function)
+_ENCODINGS = {
+    'lat_cos': ('latitude', np.cos),
+    'lat_sin': ('latitude', np.sin),
+    'lon_cos': ('longitude', np.cos),
+    'lon_sin': ('longitude', np.sin)
+}
+
+
+def season_for_month(month):
+    """Season code for a month number or array of month numbers (NaN stays NaN)"""
+    month = np.asarray(month, dtype=np.float64)
+    missing = np.isnan(month)
+    season = SEASON_BY_MONTH[np.where(missing, 0, month).astype(np.intp)]
+    return np.where(missing, np.nan, season)
+
+
+class FeatureBuilder:
+    """Write model inputs into a preallocated C-contiguous matrix
+
+    ``columns`` may be a DataFrame, a dict of arrays or a dict of scalars
+    (one row). Each feature is taken from the column of the same name,
+    derived from its source (``latitude``/``longitude`` for the sin/cos
+    encodings, ``month`` for ``season``) or filled from the defaults, and is
+    written straight into its column of the output matrix.
+    """
+
+    def __init__(self, dtype=np.float32, defaults=None):
+        self.dtype = np.dtype(dtype)
+        self.defaults = dict(FEATURE_DEFAULTS)
+        if defaults:
+            self.defaults.update(defaults)
+
+    def allocate(self, n_rows):
+        """Empty feature matrix for ``n_rows`` rows"""
+        return np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=self.dtype, order='C')
+
+    @staticmethod
+    def _has(columns, name):
+        return name in columns and columns[name] is not None
+
+    @staticmethod
+    def _values(column):
+        # Series -> ndarray view, scalars pass through unchanged
+        return column.to_numpy() if isinstance(column, pd.Series) else column
+
+    @staticmethod
+    def n_rows(columns):
+        """Row count implied by the input columns (1 for all-scalar input)"""
+        if isinstance(columns, pd.DataFrame):
+            return len(columns)
+        for value in columns.values():
+            if np.ndim(value) > 0:
+                return len(value)
+        return 1
+
+    def missing_columns(self, columns):
+        """Features that the input can neither supply nor derive"""
+        missing = []
+        for name in FEATURE_COLUMNS:
+            if self._has(columns, name):
+                continue
+            if name in _ENCODINGS and self._has(columns, _ENCODINGS[name][0]):
+                continue
+            if name == 'season' and self._has(columns, 'month'):
+                continue
+            missing.append(name)
+        return missing
+
+    def build(self, columns, out=None):
+        """Fill (or allocate) the feature matrix for ``columns``"""
+        n = self.n_rows(columns)
+        if out is None:
+            out = self.allocate(n)
+        elif out.shape != (n, len(FEATURE_COLUMNS)) or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous ({n}, {len(FEATURE_COLUMNS)}) array")
+
+        # One float64 scratch buffer is reused for every radian conversion so
+        # encodings are computed at full precision before the final cast
+        scratch = None
+        for j, name in enumerate(FEATURE_COLUMNS):
+            target = out[:, j]
+            if name in _ENCODINGS:
+                source, func = _ENCODINGS[name]
+                if self._has(columns, source):
+                    if scratch is None:
+                        scratch = np.empty(n, dtype=np.float64)
+                    np.radians(self._values(columns[source]), out=scratch)
+                    func(scratch, out=target, casting='same_kind')
+                    continue
+                if not self._has(columns, name):
+                    target[:] = func(np.radians(self.defaults[source]))
+                    continue
+            elif name == 'season' and not self._has(columns, 'season') and self._has(columns, 'month'):
+                target[:] = season_for_month(self._values(columns['month']))
+                continue
+
+            if self._has(columns, name):
+                target[:] = self._values(columns[name])
+            else:
+                target[:] = self.defaults[name]
+        return out
+
+    def build_row(self, out, row, columns):
+        """Fill a single row of an existing matrix in place"""
+        self.build(columns, out=out[row:row + 1])
+        return out
+
+    @staticmethod
+    def frame(matrix):
+        """Zero-copy DataFrame view with the schema's column names"""
+        return pd.DataFrame(matrix, columns=FEATURE_COLUMNS, copy=False)
+
+
+# Shared instance used by every scoring path
+FEATURE_BUILDER = FeatureBuilder()
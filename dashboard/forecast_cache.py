@@ -0,0 +1,232 @@
+"""
+Forecast Result Cache for VayuDrishti Dashboard
+Persistent SQLite cache shared by every dashboard session and process
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "forecast_cache.sqlite"
+
+
+class ForecastCache:
+    """Cache forecasts keyed by (grid cell, start date, horizon, model version)
+
+    Entries expire after ``ttl_seconds``. Identical concurrent requests are
+    deduplicated (single-flight): within a process through a per-key event,
+    across processes through a lease row in the same database, so only one
+    caller runs the model while the others wait for its result. Expired
+    entries and stale leases are deleted when the cache opens and every
+    ``evict_every`` writes after that.
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, ttl_seconds=3 * 3600,
+                 cell_size=0.01, lease_seconds=60.0, poll_interval=0.05, evict_every=200):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.cell_size = cell_size
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.evict_every = evict_every
+        self._writes = 0
+        self.owner_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS forecasts (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS inflight (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    started_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_forecasts_expires ON forecasts(expires_at)")
+        self.evict_expired()
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps the cache safe to use from
+        # Streamlit's per-session script threads
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def snap(self, latitude, longitude):
+        """Snap a coordinate to the centre of its cache cell"""
+        lat = (int(latitude // self.cell_size) + 0.5) * self.cell_size
+        lon = (int(longitude // self.cell_size) + 0.5) * self.cell_size
+        return round(lat, 6), round(lon, 6)
+
+    def make_key(self, latitude, longitude, start_date, forecast_days, model_version):
+        """Build the cache key for a forecast request"""
+        lat, lon = self.snap(latitude, longitude)
+        if isinstance(start_date, (date, datetime)):
+            start_date = start_date.isoformat()
+        return f"{lat:.6f}|{lon:.6f}|{start_date}|{int(forecast_days)}|{model_version}"
+
+    def get(self, key):
+        """Return the cached payload for ``key`` or None if missing/expired"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM forecasts WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, payload):
+        """Store ``payload`` under ``key`` for ``ttl_seconds``"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO forecasts (key, payload, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(payload, default=float), now, now + self.ttl_seconds)
+            )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.evict_every == 0
+        if evict:
+            self.evict_expired()
+
+    def evict_expired(self):
+        """Delete expired entries and stale leases, returning the number removed"""
+        now = time.time()
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM forecasts WHERE expires_at <= ?", (now,)).rowcount
+            conn.execute("DELETE FROM inflight WHERE started_at <= ?", (now - self.lease_seconds,))
+        return removed
+
+    def invalidate_model(self, model_version):
+        """Drop every entry computed with ``model_version``"""
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM forecasts WHERE key LIKE ?", (f"%|{model_version}",)
+            ).rowcount
+
+    def clear(self):
+        """Remove every cached forecast"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM forecasts")
+            conn.execute("DELETE FROM inflight")
+
+    def _acquire_lease(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM inflight WHERE key = ? AND started_at <= ?",
+                (key, now - self.lease_seconds)
+            )
+            acquired = conn.execute(
+                "INSERT OR IGNORE INTO inflight (key, owner, started_at) VALUES (?, ?, ?)",
+                (key, self.owner_id, now)
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        return acquired
+
+    def _release_lease(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM inflight WHERE key = ? AND owner = ?", (key, self.owner_id))
+
+    def _lease_held(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT started_at FROM inflight WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and row[0] > time.time() - self.lease_seconds
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing it at most once
+
+        ``compute`` is called without arguments and must return a
+        JSON-serializable payload.
+        """
+        payload = self.get(key)
+        if payload is not None:
+            return payload
+
+        # In-process single-flight: the first thread computes, the rest wait
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = threading.Event()
+                self._inflight[key] = event
+
+        if not leader:
+            event.wait(self.lease_seconds)
+            payload = self.get(key)
+            return payload if payload is not None else self.get_or_compute(key, compute)
+
+        try:
+            return self._compute_across_processes(key, compute)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def _compute_across_processes(self, key, compute):
+        while True:
+            if self._acquire_lease(key):
+                try:
+                    payload = self.get(key)
+                    if payload is None:
+                        started = time.perf_counter()
+                        payload = compute()
+                        self.set(key, payload)
+                        logger.info("Forecast cache miss for %s computed in %.1f ms",
+                                    key, (time.perf_counter() - started) * 1000)
+                    return payload
+                finally:
+                    self._release_lease(key)
+
+            # Another process owns the lease: wait for its result to land
+            while self._lease_held(key):
+                time.sleep(self.poll_interval)
+            payload = self.get(key)
+            if payload is not None:
+                return payload
+
+    def get_forecast(self, forecaster, latitude, longitude, start_date, forecast_days):
+        """Cached wrapper around ``OfflineForecast.generate_forecast``
+
+        The forecast is computed at the snapped cell centre so every request
+        that maps to the same cell sees the same result. Without a loaded
+        model the forecast is a fallback and is not cached, so it cannot be
+        served once a model is available.
+        """
+        if forecaster.model_version is None:
+            return forecaster.generate_forecast(latitude, longitude, start_date, forecast_days)
+        key = self.make_key(latitude, longitude, start_date, forecast_days, forecaster.model_version)
+        cell_lat, cell_lon = self.snap(latitude, longitude)
+        return self.get_or_compute(
+            key,
+            lambda: forecaster.generate_forecast(cell_lat, cell_lon, start_date, forecast_days)
+        )
+
+
+# Create global instance
+forecast_cache = ForecastCache()
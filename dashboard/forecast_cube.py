@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+National Forecast Cube for VayuDrishti
+Precomputed (days x lat x lon) PM2.5/AQI forecast for India, scored in parallel
+
+Usage:
+    python forecast_cube.py [--start 2025-07-22] [--days 7] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from aod_cube import AOD_GRID
+from feature_builder import FEATURE_BUILDER, FEATURE_COLUMNS
+
+DEFAULT_FORECAST_DIR = Path(__file__).parent.parent / "data" / "cubes" / "forecast"
+FORECAST_HOUR = 12  # generate_forecast scores each day at noon
+
+# Variables written to every day chunk
+CHUNK_VARIABLES = ['pm2_5', 'aqi', 'category', 'temperature', 'humidity', 'wind_speed']
+
+_worker_forecaster = None
+
+
+def _init_worker():
+    """Load the model (and feature sources) once per worker process"""
+    global _worker_forecaster
+    from offline_forecast import offline_forecast
+    _worker_forecaster = offline_forecast
+
+
+def score_day(cube_dir, day_index, day_date, latitude, longitude, model_version):
+    """Score one day slice of the national grid and write it as a compressed chunk"""
+    from aqi_engine import pm25_to_cpcb_aqi_array
+    from land_mask import land_mask
+
+    started = time.perf_counter()
+    forecaster = _worker_forecaster
+    if forecaster.model_version != model_version:
+        raise RuntimeError(f"Worker loaded model {forecaster.model_version}, expected {model_version}")
+
+    # Only land cells reach the model; ocean/foreign cells stay NaN (category -1)
+    latitude_flat, longitude_flat = np.ravel(latitude), np.ravel(longitude)
+    land = land_mask.contains(latitude_flat, longitude_flat) if land_mask.available else np.ones(latitude_flat.shape, bool)
+
+    columns = forecaster.generate_baseline_batch(latitude_flat[land], longitude_flat[land], [day_date])
+    columns['aod_550'] = forecaster.apply_pollution_trend(columns['aod_550'], day_index)
+    matrix = FEATURE_BUILDER.build(columns)
+    pm25 = np.clip(forecaster.predict_matrix(matrix), 5, 500).astype(np.float32)
+    aqi, codes = pm25_to_cpcb_aqi_array(pm25)
+
+    def scatter(values, fill, dtype):
+        out = np.full(latitude_flat.shape, fill, dtype=dtype)
+        out[land] = values
+        return out.reshape(np.shape(latitude))
+
+    chunk = {
+        'pm2_5': scatter(pm25, np.nan, np.float32),
+        'aqi': scatter(aqi, 0, np.uint16),
+        'category': scatter(codes, -1, np.int8),
+        'temperature': scatter(matrix[:, FEATURE_COLUMNS.index('t2m_celsius')], np.nan, np.float32),
+        'humidity': scatter(matrix[:, FEATURE_COLUMNS.index('r2m')], np.nan, np.float32),
+        'wind_speed': scatter(matrix[:, FEATURE_COLUMNS.index('wind_speed_10m')], np.nan, np.float32)
+    }
+
+    path = Path(cube_dir) / f"day_{day_index:03d}.npz"
+    tmp_path = path.with_suffix(".tmp.npz")
+    np.savez_compressed(tmp_path, **chunk)
+    os.replace(tmp_path, path)
+    return day_index, path.name, time.perf_counter() - started
+
+
+def build_forecast_cube(start_date, days, workers=None, out_dir=DEFAULT_FORECAST_DIR, grid=AOD_GRID):
+    """Score every day of the horizon over the national grid; returns the cube directory"""
+    from aqi_engine import CPCB_CATEGORIES
+    from offline_forecast import offline_forecast
+    from aod_interpolator import aod_interpolator
+    from met_climatology import met_climatology
+    from land_mask import land_mask
+
+    if not offline_forecast.model_loaded:
+        raise RuntimeError("Model not loaded. Cannot build forecast cube.")
+
+    res = grid['resolution']
+    lat_axis = np.arange(grid['lat_min'], grid['lat_max'] + res / 2, res)
+    lon_axis = np.arange(grid['lon_min'], grid['lon_max'] + res / 2, res)
+    latitude, longitude = np.meshgrid(lat_axis, lon_axis, indexing='ij')
+
+    model_version = offline_forecast.model_version
+    cube_dir = Path(out_dir) / f"{start_date.isoformat()}_{days}d_{model_version}"
+    cube_dir.mkdir(parents=True, exist_ok=True)
+
+    start = datetime.combine(start_date, datetime.min.time().replace(hour=FORECAST_HOUR))
+    day_dates = [start + timedelta(days=day) for day in range(days)]
+    started = time.perf_counter()
+    chunks = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [
+            pool.submit(score_day, str(cube_dir), day, day_date, latitude, longitude, model_version)
+            for day, day_date in enumerate(day_dates)
+        ]
+        for future in futures:
+            day, name, elapsed = future.result()
+            chunks[day] = name
+            print(f"   📅 Day {day + 1}/{days} scored in {elapsed:.2f}s")
+
+    meta = {
+        'start_date': start_date.isoformat(),
+        'days': days,
+        'hour': FORECAST_HOUR,
+        'lat_min': float(lat_axis[0]),
+        'lon_min': float(lon_axis[0]),
+        'resolution': res,
+        'n_lat': len(lat_axis),
+        'n_lon': len(lon_axis),
+        'variables': CHUNK_VARIABLES,
+        'categories': CPCB_CATEGORIES,
+        'chunks': [chunks[day] for day in range(days)],
+        'model_version': model_version,
+        'model_path': str(offline_forecast.model_path),
+        'provenance': {
+            'feature_columns': FEATURE_COLUMNS,
+            'aod_source': aod_interpolator.source if aod_interpolator.available else 'baseline',
+            'aod_timestamp': str(aod_interpolator.timestamp) if aod_interpolator.available else None,
+            'aod_max_age_days': aod_interpolator.max_age_days,
+            'aod_sources': (aod_interpolator.source_for(day_dates).tolist() if aod_interpolator.available
+                            else ['baseline'] * days),
+            'weather_source': 'climatology' if met_climatology.available else 'baseline',
+            'weather_built_at': met_climatology.meta.get('built_at') if met_climatology.available else None,
+            'land_mask_source': land_mask.meta.get('source') if land_mask.available else None
+        },
+        'created_at': datetime.now().isoformat(),
+        'workers': workers or os.cpu_count(),
+        'elapsed_seconds': round(time.perf_counter() - started, 3)
+    }
+    tmp_path = cube_dir / "meta.json.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, cube_dir / "meta.json")
+    return cube_dir
+
+
+class ForecastCube:
+    """Read side of a forecast cube; day chunks are decompressed on first access"""
+
+    def __init__(self, cube_dir):
+        self.cube_dir = Path(cube_dir)
+        with open(self.cube_dir / "meta.json") as f:
+            self.meta = json.load(f)
+        self.days = self.meta['days']
+        self.start_date = date.fromisoformat(self.meta['start_date'])
+        self.model_version = self.meta['model_version']
+        self.categories = self.meta['categories']
+        res = self.meta['resolution']
+        self.latitudes = self.meta['lat_min'] + res * np.arange(self.meta['n_lat'])
+        self.longitudes = self.meta['lon_min'] + res * np.arange(self.meta['n_lon'])
+        self._chunks = {}
+
+    @classmethod
+    def find(cls, start_date, days, model_version, root=DEFAULT_FORECAST_DIR):
+        """Newest complete cube for this start date and model covering ``days`` days"""
+        candidates = []
+        for meta_path in Path(root).glob(f"{start_date.isoformat()}_*_{model_version}/meta.json"):
+            cube = cls(meta_path.parent)
+            if cube.days >= days:
+                candidates.append((cube.meta['created_at'], cube))
+        return max(candidates, key=lambda item: item[0])[1] if candidates else None
+
+    def day(self, index):
+        """All variables of one forecast day as {variable: (lat, lon) array}"""
+        if index not in self._chunks:
+            with np.load(self.cube_dir / self.meta['chunks'][index]) as chunk:
+                self._chunks[index] = {name: chunk[name] for name in chunk.files}
+        return self._chunks[index]
+
+    def stack(self, variable, days=None):
+        """(days, lat, lon) array of one variable"""
+        return np.stack([self.day(index)[variable] for index in range(days or self.days)])
+
+    def cell_index(self, latitude, longitude):
+        res = self.meta['resolution']
+        i = int(np.clip(round((latitude - self.meta['lat_min']) / res), 0, self.meta['n_lat'] - 1))
+        j = int(np.clip(round((longitude - self.meta['lon_min']) / res), 0, self.meta['n_lon'] - 1))
+        return i, j
+
+    def cell_forecast(self, latitude, longitude, days=None):
+        """Forecast for the cell containing a point, shaped like generate_forecast()
+
+        Returns None for cells the cube skipped as ocean/outside India.
+        """
+        i, j = self.cell_index(latitude, longitude)
+        if self.day(0)['category'][i, j] < 0:
+            return None
+        start = datetime.combine(self.start_date, datetime.min.time().replace(hour=self.meta['hour']))
+        forecasts = []
+        for index in range(days or self.days):
+            chunk = self.day(index)
+            forecasts.append({
+                'date': (start + timedelta(days=index)).isoformat(),
+                'pm2_5': round(float(chunk['pm2_5'][i, j]), 1),
+                'aqi': int(chunk['aqi'][i, j]),
+                'category': self.categories[chunk['category'][i, j]],
+                'temperature': round(float(chunk['temperature'][i, j]), 1),
+                'humidity': round(float(chunk['humidity'][i, j]), 1),
+                'wind_speed': round(float(chunk['wind_speed'][i, j]), 1),
+                'aod_source': self.meta['provenance'].get('aod_sources', ['baseline'] * self.days)[index]
+            })
+
+        return {
+            'location': {
+                'latitude': float(self.latitudes[i]),
+                'longitude': float(self.longitudes[j])
+            },
+            'forecast': forecasts,
+            'model_info': {
+                'type': 'forecast_cube',
+                'accuracy': 'approximate',
+                'note': f"Sliced from the national forecast cube ({self.meta['resolution']}° cells)",
+                'model_version': self.model_version,
+                **self.meta['provenance']
+            }
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the national PM2.5/AQI forecast cube")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="First forecast day")
+    parser.add_argument("--days", type=int, default=7, help="Forecast horizon in days")
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPU count)")
+    parser.add_argument("--out", default=str(DEFAULT_FORECAST_DIR), help="Output directory")
+    args = parser.parse_args()
+
+    print(f"🗺️ Building {args.days}-day national forecast from {args.start}")
+    cube_dir = build_forecast_cube(args.start, args.days, args.workers, args.out)
+    cube = ForecastCube(cube_dir)
+    size_kb = sum(path.stat().st_size for path in cube_dir.glob("*.npz")) / 1024
+    print(f"✅ {cube.days} x {cube.meta['n_lat']} x {cube.meta['n_lon']} cube in "
+          f"{cube.meta['elapsed_seconds']:.2f}s ({size_kb:.0f} KB) -> {cube_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+In-memory Index for the VayuDrishti Prediction Grid
+Answers the sidebar filters without rescanning the whole grid
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class GridIndex:
+    """Sorted PM2.5 index plus one packed bitmap per health category
+
+    Built once per loaded grid. A PM2.5 range is resolved with two binary
+    searches over the pre-sorted values and a category restriction is a bit
+    test on the candidate rows only, so a filter change costs O(log n + k)
+    for k matching rows instead of an O(n) mask with string comparisons.
+    """
+
+    def __init__(self, pm25, codes, categories):
+        pm25 = np.asarray(pm25)
+        codes = np.asarray(codes)
+        self.n_rows = len(pm25)
+        self.categories = list(categories)
+        self.pm25 = pm25
+        self.codes = codes
+
+        self.order = np.argsort(pm25, kind='stable')
+        self.sorted_pm25 = pm25[self.order]
+
+        self.bitmaps = {}
+        self.bounds = {}
+        for code, category in enumerate(self.categories):
+            member = codes == code
+            self.bitmaps[category] = np.packbits(member)
+            if member.any():
+                values = pm25[member]
+                self.bounds[category] = (float(values.min()), float(values.max()))
+        if self.n_rows:
+            self.bounds[None] = (float(self.sorted_pm25[0]), float(self.sorted_pm25[-1]))
+
+    @classmethod
+    def from_frame(cls, df, value_col='predicted_pm2_5', category_col='health_category'):
+        """Build the index from a predictions DataFrame"""
+        codes, categories = pd.factorize(df[category_col], sort=True)
+        return cls(df[value_col].to_numpy(), codes, categories.tolist())
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Build the index straight from a PredictionGrid's typed columns"""
+        return cls(grid.pm25, grid.codes, grid.categories)
+
+    @property
+    def present_categories(self):
+        """Categories with at least one row, in index order"""
+        return [category for category in self.categories if category in self.bounds]
+
+    def value_bounds(self, category=None):
+        """(min, max) PM2.5 over all rows or over one category"""
+        return self.bounds.get(category, (0.0, 0.0))
+
+    def _range_rows(self, low, high):
+        start = np.searchsorted(self.sorted_pm25, low, side='left')
+        stop = np.searchsorted(self.sorted_pm25, high, side='right')
+        return self.order[start:stop]
+
+    def _in_category(self, rows, category):
+        bitmap = self.bitmaps.get(category)
+        if bitmap is None:
+            return rows[:0]
+        bits = (bitmap[rows >> 3] >> (7 - (rows & 7))) & 1
+        return rows[bits.astype(bool)]
+
+    def select(self, category=None, pm25_range=None):
+        """Row positions matching the filters, in ascending PM2.5 order"""
+        if pm25_range is None:
+            rows = self.order
+        else:
+            rows = self._range_rows(pm25_range[0], pm25_range[1])
+        if category is not None:
+            rows = self._in_category(rows, category)
+        return rows
+
+    def aggregate(self, rows, n_bins=30):
+        """Histogram, category counts and summary statistics for ``rows``
+
+        ``rows`` must come from select(), i.e. be in ascending PM2.5 order, so
+        min, max and median are read off the selection without sorting. The
+        result size depends only on ``n_bins`` and the category count.
+        """
+        n_categories = len(self.categories)
+        values = self.pm25[rows].astype(np.float64)
+        codes = self.codes[rows]
+        n = len(values)
+        if n == 0:
+            return {
+                'categories': self.categories,
+                'bin_edges': np.zeros(n_bins + 1),
+                'bin_counts': np.zeros((n_categories, n_bins), dtype=np.int64),
+                'category_counts': np.zeros(n_categories, dtype=np.int64),
+                'count': 0, 'mean': np.nan, 'median': np.nan, 'std': np.nan,
+                'min': np.nan, 'max': np.nan
+            }
+
+        low, high = values[0], values[-1]
+        width = (high - low) / n_bins or 1.0
+        bins = np.minimum(((values - low) / width).astype(np.intp), n_bins - 1)
+
+        # Joint (category, bin) counts in a single bincount; codes are int8, so widen before
+        # combining, and rows without a category (code -1 from factorize) stay out of the counts
+        known = codes >= 0
+        bin_counts = np.bincount(
+            codes[known].astype(np.intp) * n_bins + bins[known], minlength=n_categories * n_bins
+        ).reshape(n_categories, n_bins)
+
+        bin_edges = low + width * np.arange(n_bins + 1)
+        bin_edges[-1] = max(high, bin_edges[-1])
+
+        mean = values.sum() / n
+        std = np.sqrt(((values - mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+        return {
+            'categories': self.categories,
+            'bin_edges': bin_edges,
+            'bin_counts': bin_counts,
+            'category_counts': bin_counts.sum(axis=1),
+            'count': n,
+            'mean': mean,
+            'median': (values[(n - 1) // 2] + values[n // 2]) / 2,
+            'std': std,
+            'min': low,
+            'max': high
+        }
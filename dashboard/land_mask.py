@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+India Land Mask for VayuDrishti
+Rasterized country/state membership so point filtering is a single array gather
+
+Usage:
+    python land_mask.py [--boundaries ../data/boundaries/india_states.geojson] [--resolution 0.02]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_BOUNDARY_FILE = Path(__file__).parent.parent / "data" / "boundaries" / "india_states.geojson"
+DEFAULT_MASK_DIR = Path(__file__).parent.parent / "data" / "cubes" / "land_mask"
+
+# Raster extent (covers the mainland and the island territories)
+MASK_BOUNDS = {
+    'lat_min': 6.0,
+    'lat_max': 38.0,
+    'lon_min': 68.0,
+    'lon_max': 98.0
+}
+DEFAULT_RESOLUTION = 0.02
+
+# GeoJSON properties that carry the state/UT name in common India boundary exports
+STATE_NAME_KEYS = ['st_nm', 'ST_NM', 'NAME_1', 'state', 'STATE', 'name', 'NAME']
+
+
+def _feature_rings(geometry):
+    """Every ring (exterior and holes) of a Polygon/MultiPolygon as (n, 2) lon/lat arrays"""
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return []
+    rings = [np.asarray(ring, dtype=np.float64)[:, :2] for polygon in polygons for ring in polygon]
+    # Close rings whose last vertex does not repeat the first
+    return [ring if np.array_equal(ring[0], ring[-1]) else np.vstack([ring, ring[:1]]) for ring in rings]
+
+
+def rasterize_rings(rings, shape, bounds, resolution):
+    """Cells whose centres fall inside ``rings`` (even-odd rule, so holes are excluded)
+
+    All ring edges are intersected with every cell-centre row they span at
+    once; the sorted crossings of each row pair up into filled spans that are
+    written through a difference array.
+    """
+    n_lat, n_lon = shape
+    edges = np.concatenate([np.stack([ring[:-1], ring[1:]], axis=1) for ring in rings if len(ring) > 1])
+    (x0, y0), (x1, y1) = edges[:, 0].T, edges[:, 1].T
+
+    # Rows whose centre latitude lies in [min(y0, y1), max(y0, y1)) for each edge
+    low = np.ceil((np.minimum(y0, y1) - bounds['lat_min']) / resolution - 0.5).astype(np.int64)
+    high = np.ceil((np.maximum(y0, y1) - bounds['lat_min']) / resolution - 0.5).astype(np.int64)
+    low, high = np.clip(low, 0, n_lat), np.clip(high, 0, n_lat)
+    spans = high - low
+    edge = np.repeat(np.arange(len(edges)), spans)
+    row = np.repeat(low, spans) + (np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans))
+
+    y = bounds['lat_min'] + (row + 0.5) * resolution
+    x = x0[edge] + (y - y0[edge]) * (x1[edge] - x0[edge]) / (y1[edge] - y0[edge])
+
+    order = np.lexsort((x, row))
+    row, x = row[order], x[order]
+    start = np.clip(np.ceil((x[0::2] - bounds['lon_min']) / resolution - 0.5), 0, n_lon).astype(np.int64)
+    stop = np.clip(np.ceil((x[1::2] - bounds['lon_min']) / resolution - 0.5), 0, n_lon).astype(np.int64)
+
+    diff = np.zeros((n_lat, n_lon + 1), dtype=np.int32)
+    np.add.at(diff, (row[0::2], start), 1)
+    np.add.at(diff, (row[0::2], stop), -1)
+    return np.cumsum(diff[:, :-1], axis=1) > 0
+
+
+def _mtime_ns(path):
+    """Modification time of ``path`` in ns, or None if it does not exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def approximate_mask(latitude, longitude):
+    """Bounding box minus sea/neighbour rectangles (used when no boundary file exists)"""
+    return (
+        (latitude >= 8.0) & (latitude <= 37.0) & (longitude >= 68.0) & (longitude <= 97.0) &
+        # Arabian Sea (west of 70°E and south of 20°N)
+        ~((longitude < 70.0) & (latitude < 20.0)) &
+        # Bay of Bengal (east of 90°E and south of 15°N)
+        ~((longitude > 90.0) & (latitude < 15.0)) &
+        # Pakistan (west of 74°E and north of 28°N)
+        ~((longitude < 74.0) & (latitude > 28.0)) &
+        # China (east of 95°E and north of 28°N)
+        ~((longitude > 95.0) & (latitude > 28.0))
+    )
+
+
+class LandMask:
+    """Memory-mapped uint8 raster: 0 outside India, otherwise 1 + index into ``regions``
+
+    The store is opened on first use. With ``auto_build`` it is (re)built
+    first when it is missing or when the boundary file it was built from
+    appeared, changed or disappeared since. Without a boundary file, points
+    are tested against the approximate outline itself rather than its raster.
+    """
+
+    def __init__(self, store_dir=DEFAULT_MASK_DIR, auto_build=True):
+        self.store_dir = Path(store_dir)
+        self.auto_build = auto_build
+        self.meta = {}
+        self.codes = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        self._load()
+        return self.codes is not None
+
+    @property
+    def regions(self):
+        self._load()
+        # Without a store, lookups use the approximate outline's single region
+        return self.meta.get('regions', []) if self.codes is not None else ['India']
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                if self.auto_build and self.is_stale():
+                    self.build(self.meta.get('boundary_file', DEFAULT_BOUNDARY_FILE))
+                elif (self.store_dir / "meta.json").exists():
+                    self.refresh()
+            except Exception as e:
+                print(f"⚠️ Land mask not available: {e}")
+                self.codes = None
+            self._loaded = True
+
+    def is_stale(self):
+        """Whether the store is missing or its boundary file is not the one it was built from"""
+        if not (self.store_dir / "meta.json").exists():
+            return True
+        with open(self.store_dir / "meta.json") as f:
+            self.meta = json.load(f)
+        boundary_file = self.meta.get('boundary_file')
+        return boundary_file is None or self.meta.get('boundary_mtime_ns') != _mtime_ns(boundary_file)
+
+    def refresh(self):
+        with open(self.store_dir / "meta.json") as f:
+            self.meta = json.load(f)
+        self.codes = np.memmap(self.store_dir / "mask.u8", dtype=np.uint8, mode='r',
+                               shape=(self.meta['n_lat'], self.meta['n_lon']))
+
+    def build(self, boundary_file=DEFAULT_BOUNDARY_FILE, resolution=DEFAULT_RESOLUTION, bounds=MASK_BOUNDS):
+        """Rasterize the boundary file (or the approximate outline) into the store"""
+        started = time.perf_counter()
+        boundary_file = Path(boundary_file).resolve()
+        boundary_mtime_ns = _mtime_ns(boundary_file)
+        n_lat = int(round((bounds['lat_max'] - bounds['lat_min']) / resolution))
+        n_lon = int(round((bounds['lon_max'] - bounds['lon_min']) / resolution))
+        codes = np.zeros((n_lat, n_lon), dtype=np.uint8)
+
+        if boundary_mtime_ns is not None:
+            with open(boundary_file) as f:
+                features = json.load(f)['features']
+            regions = []
+            for feature in features:
+                rings = _feature_rings(feature['geometry'] or {'type': None})
+                if not rings:
+                    continue
+                properties = feature.get('properties') or {}
+                name = next((properties[key] for key in STATE_NAME_KEYS if properties.get(key)), None)
+                name = str(name or f"Region {len(regions) + 1}")
+                if name not in regions:
+                    regions.append(name)
+                if len(regions) > 255:
+                    raise ValueError("More than 255 regions do not fit the uint8 mask")
+                codes[rasterize_rings(rings, codes.shape, bounds, resolution)] = regions.index(name) + 1
+            source = str(boundary_file)
+        else:
+            latitude = bounds['lat_min'] + (np.arange(n_lat) + 0.5) * resolution
+            longitude = bounds['lon_min'] + (np.arange(n_lon) + 0.5) * resolution
+            codes[approximate_mask(latitude[:, np.newaxis], longitude[np.newaxis, :])] = 1
+            regions = ['India']
+            source = 'approximate'
+            print(f"⚠️ Boundary file {boundary_file} not found; using the approximate outline")
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_dir / "mask.u8.tmp"
+        codes.tofile(tmp_path)
+        os.replace(tmp_path, self.store_dir / "mask.u8")
+
+        meta = {
+            **bounds,
+            'resolution': resolution,
+            'n_lat': n_lat,
+            'n_lon': n_lon,
+            'regions': regions,
+            'source': source,
+            'boundary_file': str(boundary_file),
+            'boundary_mtime_ns': boundary_mtime_ns,
+            'land_fraction': float((codes > 0).mean()),
+            'built_at': datetime.now().isoformat(),
+            'elapsed_seconds': round(time.perf_counter() - started, 3)
+        }
+        tmp_path = self.store_dir / "meta.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.store_dir / "meta.json")
+        self.refresh()
+        return meta
+
+    def lookup(self, latitude, longitude):
+        """Region codes (0 = outside India) for coordinate arrays in one gather
+
+        If the store could not be loaded, points are tested against the
+        approximate outline (code 1) so callers never need to check first.
+        """
+        self._load()
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        if self.codes is None or self.meta.get('source') == 'approximate':
+            # Cell edges would move points on a rectangle edge in or out of the outline
+            return approximate_mask(latitude, longitude).astype(np.uint8)
+        res = self.meta['resolution']
+        i = np.floor((latitude - self.meta['lat_min']) / res).astype(np.int64)
+        j = np.floor((longitude - self.meta['lon_min']) / res).astype(np.int64)
+        inside = (i >= 0) & (i < self.meta['n_lat']) & (j >= 0) & (j < self.meta['n_lon'])
+        codes = np.zeros(np.broadcast(latitude, longitude).shape, dtype=np.uint8)
+        codes[inside] = self.codes[i[inside], j[inside]]
+        return codes
+
+    def contains(self, latitude, longitude):
+        """Boolean mask of the coordinates that fall on Indian land"""
+        return self.lookup(latitude, longitude) > 0
+
+    def region_names(self, codes):
+        """Decode region codes to names (None outside India)"""
+        names = np.asarray([None] + self.regions, dtype=object)
+        return names[np.asarray(codes)]
+
+
+# Shared instance used by the dashboard and the scoring jobs (opened on first use)
+land_mask = LandMask()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterize the India land/state mask")
+    parser.add_argument("--boundaries", default=str(DEFAULT_BOUNDARY_FILE), help="GeoJSON state/UT boundaries")
+    parser.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION, help="Cell size in degrees")
+    parser.add_argument("--store", default=str(DEFAULT_MASK_DIR), help="Mask directory")
+    args = parser.parse_args()
+
+    print(f"🗺️ Rasterizing {args.boundaries} at {args.resolution}°")
+    mask = LandMask(args.store, auto_build=False)
+    meta = mask.build(args.boundaries, args.resolution)
+    print(f"✅ {meta['n_lat']} x {meta['n_lon']} mask, {len(meta['regions'])} region(s), "
+          f"{meta['land_fraction']:.1%} land, built in {meta['elapsed_seconds']:.2f}s -> {args.store}")
+
+
+if __name__ == "__main__":
+    main()
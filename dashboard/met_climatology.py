@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Meteorological Climatology Cube for VayuDrishti
+Month x hour x grid-cell means of the weather features, stored as a memory-mapped array
+
+Usage:
+    python met_climatology.py [weather CSVs ...]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aod_cube import AOD_GRID
+from feature_builder import SEASON_BY_MONTH
+
+MET_VARIABLES = ['t2m_celsius', 'r2m', 'wind_speed_10m', 'blh']
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEFAULT_CLIMATOLOGY_DIR = DATA_DIR / "cubes" / "met_climatology"
+
+# Seconds between checks of the store (and its sources) for changes
+CHECK_INTERVAL = 30.0
+
+
+def default_sources(data_dir=DATA_DIR):
+    """Local weather tables: processed reanalysis exports plus the merged training sets"""
+    data_dir = Path(data_dir)
+    return [
+        data_dir / "reanalysis",
+        data_dir / "processed" / "cleaned_dataset.csv",
+        data_dir / "unified" / "cleaned_dataset.csv"
+    ]
+
+
+DEFAULT_SOURCES = default_sources()
+
+# Prior used where no observation exists for a cell (the former synthetic baseline)
+SEASON_TEMPERATURE = np.array([0, 15, 25, 30, 20], dtype=np.float32)
+SEASON_HUMIDITY = np.array([0, 70, 60, 85, 65], dtype=np.float32)
+REGIONAL_BASELINES = [
+    # (lat_min, lat_max, lon_min, lon_max), wind_speed_10m, blh
+    ((28.0, 29.0, 76.5, 77.5), 3.0, 600.0),   # Delhi/NCR
+    ((18.8, 19.3, 72.7, 73.2), 5.0, 900.0),   # Mumbai
+    ((12.8, 13.2, 77.4, 77.8), 4.0, 1000.0),  # Bangalore
+    ((22.3, 22.8, 88.2, 88.5), 3.5, 700.0)    # Kolkata
+]
+DEFAULT_WIND = 4.0
+DEFAULT_BLH = 800.0
+
+# Fill level recorded per (month, hour, cell, variable)
+LEVEL_PRIOR, LEVEL_MONTH, LEVEL_OBSERVED = 0, 1, 2
+
+
+def baseline_weather(latitude, longitude, month):
+    """Vectorized seasonal/regional prior for arrays of points"""
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    season = SEASON_BY_MONTH[np.asarray(month, dtype=np.intp)]
+    shape = np.broadcast(latitude, longitude, season).shape
+
+    wind = np.full(shape, DEFAULT_WIND, dtype=np.float32)
+    blh = np.full(shape, DEFAULT_BLH, dtype=np.float32)
+    assigned = np.zeros(shape, dtype=bool)
+    for (lat_min, lat_max, lon_min, lon_max), wind_base, blh_base in REGIONAL_BASELINES:
+        box = ((lat_min <= latitude) & (latitude <= lat_max)
+               & (lon_min <= longitude) & (longitude <= lon_max) & ~assigned)
+        wind[box] = wind_base
+        blh[box] = blh_base
+        assigned |= box
+
+    return {
+        't2m_celsius': np.broadcast_to(SEASON_TEMPERATURE[season], shape),
+        'r2m': np.broadcast_to(SEASON_HUMIDITY[season], shape),
+        'wind_speed_10m': wind,
+        'blh': blh
+    }
+
+
+def weather_files(sources=DEFAULT_SOURCES):
+    """Every CSV under ``sources`` (files or directories), in a stable order"""
+    paths = []
+    for source in map(Path, sources):
+        if source.is_dir():
+            paths.extend(sorted(source.rglob("*.csv")))
+        elif source.exists():
+            paths.append(source)
+    return paths
+
+
+def file_stats(paths):
+    """Provenance of the source files: path, size and modification time of each"""
+    stats = []
+    for path in paths:
+        stat = os.stat(path)
+        stats.append({'path': str(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+    return stats
+
+
+def _mtime_ns(path):
+    """Modification time of ``path`` in ns, or None if it does not exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def load_weather_tables(sources=DEFAULT_SOURCES):
+    """Concatenate the weather columns of every readable CSV under ``sources``"""
+    paths = weather_files(sources)
+
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path)
+        if 't2m_celsius' not in df.columns and 't2m' in df.columns:
+            df['t2m_celsius'] = df['t2m'] - 273.15  # Kelvin reanalysis exports
+        if 'datetime' in df.columns:
+            stamps = pd.to_datetime(df['datetime'])
+            df['month'] = stamps.dt.month
+            df['hour'] = stamps.dt.hour
+        variables = [name for name in MET_VARIABLES if name in df.columns]
+        if not variables or not {'latitude', 'longitude', 'month', 'hour'} <= set(df.columns):
+            continue
+        frames.append(df[['latitude', 'longitude', 'month', 'hour'] + variables])
+
+    if not frames:
+        return pd.DataFrame(columns=['latitude', 'longitude', 'month', 'hour'] + MET_VARIABLES), paths
+    return pd.concat(frames, ignore_index=True), paths
+
+
+class MetClimatology:
+    """Dense (month, hour, lat, lon, variable) float32 climatology
+
+    Each cell holds the mean of the local observations for that month and
+    hour; hours without observations take the cell's monthly mean and cells
+    without any observation for the month take the seasonal/regional prior.
+    ``level`` records which of the three filled each entry. Lookups for a
+    batch of points are a single fancy-index gather into the memory map.
+
+    The store is opened on first use, not on import, and reopened once a
+    rebuild (by the CLI or the data pipeline) replaces it; both are checked
+    at most every ``check_interval`` seconds. ``stale`` is set while the
+    size or mtime of any source file, or the set of files under the source
+    directories, differs from what meta.json recorded. Only with
+    ``auto_build`` is a missing or stale store (re)built on access.
+    """
+
+    def __init__(self, store_dir=DEFAULT_CLIMATOLOGY_DIR, auto_build=False, check_interval=CHECK_INTERVAL):
+        self.store_dir = Path(store_dir)
+        self.auto_build = auto_build
+        self.check_interval = check_interval
+        self.meta = {}
+        self.values = None
+        self.stale = False
+        self._opened_mtime_ns = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        self._load()
+        return self.values is not None
+
+    def _load(self):
+        if time.monotonic() < self._next_check:
+            return
+        with self._lock:
+            if time.monotonic() < self._next_check:
+                return
+            try:
+                stale = self.is_stale()
+                if self.auto_build and stale:
+                    self.build(self._read_meta().get('source_roots', DEFAULT_SOURCES))
+                    stale = False
+                elif _mtime_ns(self.store_dir / "meta.json") != self._opened_mtime_ns:
+                    self._open()
+                if stale and not self.stale and self.values is not None:
+                    print("⚠️ Meteorological climatology is older than its sources; "
+                          "rebuild it with met_climatology.py")
+                self.stale = stale
+            except Exception as e:
+                print(f"⚠️ Meteorological climatology not available: {e}")
+                self.values = None
+                self._opened_mtime_ns = None
+            self._next_check = time.monotonic() + self.check_interval
+
+    def _read_meta(self):
+        try:
+            with open(self.store_dir / "meta.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def is_stale(self):
+        """Whether the store is missing or was built from different source files than exist now"""
+        meta = self._read_meta()
+        if not meta:
+            return True
+        current = file_stats(weather_files(meta.get('source_roots', DEFAULT_SOURCES)))
+        return current != meta.get('sources')
+
+    def _open(self):
+        """(Re)map the store as meta.json describes it, or mark it unavailable if there is none"""
+        mtime_ns = _mtime_ns(self.store_dir / "meta.json")
+        meta = self._read_meta()
+        if not meta:
+            self.meta, self.values, self._opened_mtime_ns = {}, None, mtime_ns
+            return
+        shape = (12, 24, meta['n_lat'], meta['n_lon'], len(meta['variables']))
+        level = np.memmap(self.store_dir / "level.i1", dtype=np.int8, mode='r', shape=shape)
+        values = np.memmap(self.store_dir / "climatology.f32", dtype=np.float32, mode='r', shape=shape)
+        self.meta, self.variables, self.level, self.values = meta, meta['variables'], level, values
+        self._opened_mtime_ns = mtime_ns
+
+    def build(self, sources=DEFAULT_SOURCES, grid=AOD_GRID):
+        """Aggregate the local weather tables into the climatology store"""
+        sources = [Path(source).resolve() for source in sources]
+        # Stat before reading, so a file changed mid-build reads as stale next time
+        sources_stats = file_stats(weather_files(sources))
+        df, paths = load_weather_tables(sources)
+        res = grid['resolution']
+        n_lat = int(round((grid['lat_max'] - grid['lat_min']) / res)) + 1
+        n_lon = int(round((grid['lon_max'] - grid['lon_min']) / res)) + 1
+        n_cells = n_lat * n_lon
+        n_slots = 12 * 24 * n_cells
+
+        rows = np.rint((df['latitude'].to_numpy(dtype=np.float64) - grid['lat_min']) / res)
+        cols = np.rint((df['longitude'].to_numpy(dtype=np.float64) - grid['lon_min']) / res)
+        month = df['month'].to_numpy(dtype=np.int64) - 1
+        hour = df['hour'].to_numpy(dtype=np.int64) % 24
+        inside = (rows >= 0) & (rows < n_lat) & (cols >= 0) & (cols < n_lon)
+        slot = (month * 24 + hour) * n_cells + (rows * n_lon + cols).astype(np.int64)
+
+        # Prior on the grid for every month (hour independent)
+        lat_axis = grid['lat_min'] + res * np.arange(n_lat)
+        lon_axis = grid['lon_min'] + res * np.arange(n_lon)
+        prior = baseline_weather(
+            lat_axis[None, :, None], lon_axis[None, None, :], np.arange(1, 13)[:, None, None]
+        )
+
+        values = np.empty((12, 24, n_lat, n_lon, len(MET_VARIABLES)), dtype=np.float32)
+        level = np.empty(values.shape, dtype=np.int8)
+        for k, name in enumerate(MET_VARIABLES):
+            observed = inside & df[name].notna().to_numpy() if name in df.columns else np.zeros(len(df), dtype=bool)
+            weights = df[name].to_numpy(dtype=np.float64)[observed] if observed.any() else None
+            sums = np.bincount(slot[observed], weights=weights, minlength=n_slots).reshape(12, 24, n_cells)
+            counts = np.bincount(slot[observed], minlength=n_slots).reshape(12, 24, n_cells)
+            month_sums = sums.sum(axis=1, keepdims=True)
+            month_counts = counts.sum(axis=1, keepdims=True)
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                filled = np.where(
+                    counts > 0, sums / counts,
+                    np.where(month_counts > 0, month_sums / month_counts,
+                             prior[name].reshape(12, 1, n_cells))
+                )
+            values[..., k] = filled.reshape(12, 24, n_lat, n_lon)
+            level[..., k] = np.where(
+                counts > 0, LEVEL_OBSERVED, np.where(month_counts > 0, LEVEL_MONTH, LEVEL_PRIOR)
+            ).reshape(12, 24, n_lat, n_lon)
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        for filename, array in (("climatology.f32", values), ("level.i1", level)):
+            tmp_path = self.store_dir / f"{filename}.tmp"
+            array.tofile(tmp_path)
+            os.replace(tmp_path, self.store_dir / filename)
+
+        meta = {
+            'lat_min': grid['lat_min'],
+            'lon_min': grid['lon_min'],
+            'resolution': res,
+            'n_lat': n_lat,
+            'n_lon': n_lon,
+            'variables': MET_VARIABLES,
+            'n_observations': int(inside.sum()),
+            'observed_fraction': dict(zip(MET_VARIABLES, (level == LEVEL_OBSERVED).mean(axis=(0, 1, 2, 3)).tolist())),
+            'source_roots': [str(source) for source in sources],
+            'sources': sources_stats,
+            'built_at': datetime.now().isoformat()
+        }
+        tmp_path = self.store_dir / "meta.json.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.store_dir / "meta.json")
+
+        self._open()
+        return meta
+
+    def _indices(self, latitude, longitude, month, hour):
+        res = self.meta['resolution']
+        rows = np.rint((np.asarray(latitude, dtype=np.float64) - self.meta['lat_min']) / res)
+        cols = np.rint((np.asarray(longitude, dtype=np.float64) - self.meta['lon_min']) / res)
+        return (
+            np.asarray(month, dtype=np.intp) - 1,
+            np.asarray(hour, dtype=np.intp) % 24,
+            np.clip(rows, 0, self.meta['n_lat'] - 1).astype(np.intp),
+            np.clip(cols, 0, self.meta['n_lon'] - 1).astype(np.intp)
+        )
+
+    def gather(self, latitude, longitude, month, hour):
+        """Weather features for a batch of points as {variable: float32 array}"""
+        self._load()
+        block = self.values[self._indices(latitude, longitude, month, hour)]
+        return {name: block[..., k] for k, name in enumerate(self.variables)}
+
+    def fill_level(self, latitude, longitude, month, hour):
+        """How each looked-up value was filled (LEVEL_OBSERVED/LEVEL_MONTH/LEVEL_PRIOR)"""
+        self._load()
+        block = self.level[self._indices(latitude, longitude, month, hour)]
+        return {name: block[..., k] for k, name in enumerate(self.variables)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the meteorological climatology cube")
+    parser.add_argument("sources", nargs="*", help="Weather CSV files or directories")
+    parser.add_argument("--store", default=str(DEFAULT_CLIMATOLOGY_DIR), help="Output directory")
+    args = parser.parse_args()
+
+    print("🌤️ Building meteorological climatology")
+    started = datetime.now()
+    climatology = MetClimatology(args.store)
+    meta = climatology.build(args.sources or DEFAULT_SOURCES)
+
+    print(f"✅ {meta['n_observations']} observations from {len(meta['sources'])} file(s) "
+          f"in {(datetime.now() - started).total_seconds():.2f}s")
+    print(f"📦 Shape: 12 x 24 x {meta['n_lat']} x {meta['n_lon']} x {len(meta['variables'])}")
+    for name, fraction in meta['observed_fraction'].items():
+        print(f"   {name:<16} {fraction:.4%} of entries observed")
+
+
+# Shared instance (opened on first use; built by this script or the data pipeline)
+met_climatology = MetClimatology()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Station Nowcast Store for VayuDrishti Dashboard
+SQLite table of the latest nowcast per CPCB station, published incrementally by src/station_nowcast.py
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_STORE_PATH = Path(__file__).parent.parent / "data" / "cache" / "station_nowcast.sqlite"
+
+
+class NowcastStore:
+    """Latest reading, rolling averages, AQI and model residual of every station
+
+    Every publish bumps a revision and stamps it on the stations it
+    changed, so readers fetch only the rows changed since the revision they
+    last saw. The updater's resumable state (rolling windows and source
+    cursors) is committed in the same transaction as the rows it produced.
+    """
+
+    def __init__(self, db_path=DEFAULT_STORE_PATH):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._view = pd.DataFrame()
+        self._view_revision = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stations (
+                    station_name TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    revision INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS station_state (
+                    station_name TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cursors (
+                    source TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_stations_revision ON stations(revision)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call, as in the forecast cache
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def revision(self):
+        """Revision of the latest publish (0 before the first)"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(revision), 0) FROM stations").fetchone()[0]
+
+    def changed_since(self, revision=0):
+        """(rows of stations published after ``revision``, latest revision)"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload, revision FROM stations WHERE revision > ? ORDER BY revision", (revision,)
+            ).fetchall()
+        frame = pd.DataFrame([json.loads(payload) for payload, _ in rows])
+        if not frame.empty:
+            frame['datetime'] = pd.to_datetime(frame['datetime'])
+        return frame, max([revision] + [row[1] for row in rows])
+
+    def latest(self):
+        """Every station's current nowcast; repeated calls read only the stations changed since"""
+        with self._lock:
+            if self.revision() < self._view_revision:
+                # The store was cleared and rebuilt by another process
+                self._view, self._view_revision = pd.DataFrame(), 0
+            changed, revision = self.changed_since(self._view_revision)
+            if not changed.empty:
+                kept = self._view
+                if not kept.empty:
+                    kept = kept[~kept['station_name'].isin(changed['station_name'])]
+                self._view = pd.concat([kept, changed], ignore_index=True) if not kept.empty else changed
+            self._view_revision = revision
+            return self._view
+
+    def load_state(self):
+        """({station: updater state}, {source: cursor}) saved by the last publish"""
+        with self._connect() as conn:
+            states = conn.execute("SELECT station_name, payload FROM station_state").fetchall()
+            cursors = conn.execute("SELECT source, payload FROM cursors").fetchall()
+        return ({station: json.loads(payload) for station, payload in states},
+                {source: json.loads(payload) for source, payload in cursors})
+
+    def publish(self, rows, states, cursors):
+        """Upsert changed station ``rows`` (dicts) with their updater ``states`` and the source ``cursors``
+
+        Returns the new revision, or the current one if nothing changed.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                revision = conn.execute("SELECT COALESCE(MAX(revision), 0) FROM stations").fetchone()[0]
+                if rows:
+                    revision += 1
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO stations (station_name, payload, revision, updated_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        [(row['station_name'], json.dumps(row, default=float), revision, now) for row in rows]
+                    )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO station_state (station_name, payload) VALUES (?, ?)",
+                    [(station, json.dumps(state)) for station, state in states.items()]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cursors (source, payload) VALUES (?, ?)",
+                    [(source, json.dumps(cursor)) for source, cursor in cursors.items()]
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return revision
+
+    def clear(self):
+        """Forget every station and cursor, so the next update rebuilds from the station files"""
+        with self._connect() as conn:
+            for table in ('stations', 'station_state', 'cursors'):
+                conn.execute(f"DELETE FROM {table}")
+        with self._lock:
+            self._view = pd.DataFrame()
+            self._view_revision = 0
+
+
+# Create global instance
+nowcast_store = NowcastStore()
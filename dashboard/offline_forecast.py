@@ -9,8 +9,17 @@ from datetime import datetime, timedelta
 import joblib
 import os
 import sys
+import hashlib
+import threading
+import time
+from collections import namedtuple
 from pathlib import Path
 
+from feature_builder import FEATURE_BUILDER, FEATURE_COLUMNS, FEATURE_DEFAULTS, FEATURE_INDEX
+from aod_interpolator import aod_interpolator
+from aqi_engine import CPCB_CATEGORIES, pm25_to_cpcb_aqi_array
+from met_climatology import baseline_weather, met_climatology
+
 # Unicode print fix
 def safe_print(text):
     """Safe print that handles Unicode encoding issues"""
@@ -19,12 +28,60 @@ def safe_print(text):
     except UnicodeEncodeError:
         print(text.encode('ascii', 'ignore').decode('ascii') if isinstance(text, str) else str(text))
 
+# Fixed inputs a candidate model must score sensibly before it is swapped in
+SMOKE_LOCATIONS = [(28.61, 77.21), (19.08, 72.88), (12.97, 77.59), (22.57, 88.36), (13.08, 80.27), (26.91, 75.79)]
+SMOKE_MONTHS = [1, 4, 7, 10]
+SMOKE_PM25_RANGE = (0.0, 1000.0)
+
+# The active model and its artifact, swapped as a single reference
+ModelSlot = namedtuple('ModelSlot', ['model', 'path', 'version', 'stat'])
+
+
 class OfflineForecast:
     def __init__(self):
-        self.model = None
-        self.model_loaded = False
+        self._slot = None
+        self._reload_lock = threading.Lock()
+        self._reload_listeners = {}
+        self._rejected_stat = None
+        self._watcher = None
+        self.reload_history = []
         self.load_model()
     
+    @property
+    def model(self):
+        return self._slot.model if self._slot else None
+    
+    @property
+    def model_loaded(self):
+        return self._slot is not None
+    
+    @property
+    def model_path(self):
+        return self._slot.path if self._slot else None
+    
+    @property
+    def model_version(self):
+        return self._slot.version if self._slot else None
+    
+    @staticmethod
+    def _artifact_stat(model_path):
+        stat = os.stat(model_path)
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    @staticmethod
+    def _read_model(model_path):
+        """Unpickle a model artifact"""
+        # Load the model with warning suppression for version compatibility
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            model = joblib.load(model_path)
+        
+        # Fix gpu_id attribute issue for older XGBoost models
+        if hasattr(model, '_Booster') and not hasattr(model, 'gpu_id'):
+            model.gpu_id = None
+        return model
+    
     def load_model(self):
         """Load the XGBoost model from disk"""
         try:
@@ -40,18 +97,11 @@ class OfflineForecast:
             
             for model_path in possible_paths:
                 if model_path.exists():
-                    # Load the model with warning suppression for version compatibility
-                    import warnings
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        self.model = joblib.load(model_path)
-                    
-                    # Fix gpu_id attribute issue for older XGBoost models
-                    if hasattr(self.model, '_Booster') and not hasattr(self.model, 'gpu_id'):
-                        self.model.gpu_id = None
-                    
-                    self.model_loaded = True
-                    safe_print(f"✅ Model loaded from {model_path}")
+                    stat = self._artifact_stat(model_path)
+                    self._slot = ModelSlot(
+                        self._read_model(model_path), model_path, self.compute_model_version(model_path), stat
+                    )
+                    safe_print(f"✅ Model loaded from {model_path} (version {self.model_version})")
                     return
             
             safe_print("❌ Model file 'best_model.pkl' not found in any expected location")
@@ -62,91 +112,165 @@ class OfflineForecast:
         except Exception as e:
             safe_print(f"❌ Error loading model: {e}")
     
+    @staticmethod
+    def smoke_matrix():
+        """Feature matrix of the smoke set (major cities across the seasons)"""
+        lat, month = np.meshgrid([loc[0] for loc in SMOKE_LOCATIONS], SMOKE_MONTHS, indexing='ij')
+        lon, _ = np.meshgrid([loc[1] for loc in SMOKE_LOCATIONS], SMOKE_MONTHS, indexing='ij')
+        return FEATURE_BUILDER.build({'latitude': lat.ravel(), 'longitude': lon.ravel(), 'month': month.ravel()})
+    
+    def validate_model(self, model):
+        """Raise ValueError unless ``model`` scores the smoke set with plausible values"""
+        n_features = getattr(model, 'n_features_in_', len(FEATURE_COLUMNS))
+        if n_features != len(FEATURE_COLUMNS):
+            raise ValueError(f"expects {n_features} features, schema has {len(FEATURE_COLUMNS)}")
+        
+        matrix = self.smoke_matrix()
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            predictions = np.asarray(model.predict(matrix))
+        if predictions.shape != (len(matrix),):
+            raise ValueError(f"returned shape {predictions.shape} for {len(matrix)} smoke rows")
+        if not np.isfinite(predictions).all():
+            raise ValueError("returned non-finite predictions on the smoke set")
+        low, high = SMOKE_PM25_RANGE
+        if predictions.min() < low or predictions.max() > high:
+            raise ValueError(f"smoke predictions {predictions.min():.1f}-{predictions.max():.1f} outside {low}-{high}")
+    
+    def add_reload_listener(self, name, callback):
+        """Call ``callback(old_version, new_version)`` after each swap (one callback per name)"""
+        self._reload_listeners[name] = callback
+    
+    def reload_model(self):
+        """Load, validate and swap in the current artifact; returns True if the model changed"""
+        with self._reload_lock:
+            active = self._slot
+            if active is None:
+                return False
+            started = time.perf_counter()
+            stat = self._artifact_stat(active.path)
+            version = self.compute_model_version(active.path)
+            if version == active.version:
+                self._slot = active._replace(stat=stat)
+                return False
+            
+            # Build the standby buffer completely before touching the active one
+            try:
+                model = self._read_model(active.path)
+                loaded = time.perf_counter()
+                self.validate_model(model)
+            except Exception as e:
+                self._rejected_stat = stat
+                safe_print(f"❌ Model {version} rejected, keeping {active.version}: {e}")
+                return False
+            validated = time.perf_counter()
+            
+            # Single reference swap; predictions already running keep the old model
+            self._slot = ModelSlot(model, active.path, version, stat)
+            for name, callback in list(self._reload_listeners.items()):
+                try:
+                    callback(active.version, version)
+                except Exception as e:
+                    safe_print(f"⚠️ Reload listener '{name}' failed: {e}")
+            finished = time.perf_counter()
+            
+            timings = {
+                'old_version': active.version,
+                'new_version': version,
+                'reloaded_at': datetime.now().isoformat(),
+                'load_ms': round((loaded - started) * 1000, 1),
+                'validate_ms': round((validated - loaded) * 1000, 1),
+                'total_ms': round((finished - started) * 1000, 1)
+            }
+            self.reload_history.append(timings)
+            safe_print(f"🔄 Model hot-reloaded {active.version} -> {version} in {timings['total_ms']} ms "
+                       f"(load {timings['load_ms']} ms, validate {timings['validate_ms']} ms)")
+            return True
+    
+    def start_watching(self, interval=5.0):
+        """Poll the model artifact in a background thread and hot-reload new versions"""
+        if self._watcher is not None or not self.model_loaded:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="model-watcher", daemon=True)
+        self._watcher.start()
+    
+    def _watch(self, interval):
+        pending = None
+        while True:
+            time.sleep(interval)
+            try:
+                stat = self._artifact_stat(self.model_path)
+            except OSError:
+                continue  # Artifact is being replaced
+            if stat == self._slot.stat or stat == self._rejected_stat:
+                pending = None
+                continue
+            # Only reload once the writer is done: the file must be unchanged for one interval
+            if stat != pending:
+                pending = stat
+                continue
+            try:
+                self.reload_model()
+            except OSError as e:
+                safe_print(f"⚠️ Model reload failed: {e}")
+            pending = None
+    
+    @staticmethod
+    def compute_model_version(model_path):
+        """Short content hash of the model artifact, used to key caches"""
+        digest = hashlib.sha256()
+        with open(model_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:12]
+    
     def pm25_to_cpcb_aqi(self, pm25):
         """Convert PM2.5 to CPCB AQI"""
-        if pm25 <= 30:
-            return pm25 * 50 / 30, "Good"
-        elif pm25 <= 60:
-            return 50 + (pm25 - 30) * 50 / 30, "Satisfactory"
-        elif pm25 <= 90:
-            return 100 + (pm25 - 60) * 100 / 30, "Moderate"
-        elif pm25 <= 120:
-            return 200 + (pm25 - 90) * 100 / 30, "Poor"
-        elif pm25 <= 250:
-            return 300 + (pm25 - 120) * 100 / 130, "Very Poor"
-        else:
-            return min(500, 400 + (pm25 - 250) * 100 / 130), "Severe"
+        aqi, codes = pm25_to_cpcb_aqi_array(pm25)
+        return float(aqi), CPCB_CATEGORIES[codes]
     
-    def generate_baseline_features(self, lat, lon, date):
-        """Generate baseline features for a location and date"""
-        # Seasonal patterns
-        month = date.month
-        hour = date.hour
+    def generate_baseline_batch(self, latitude, longitude, dates):
+        """Baseline feature columns for arrays of points and datetimes in one gather"""
+        months = np.array([d.month for d in dates], dtype=np.intp)
+        hours = np.array([d.hour for d in dates], dtype=np.intp)
+        shape = np.broadcast(np.asarray(latitude), np.asarray(longitude), months).shape
+        latitude = np.broadcast_to(np.asarray(latitude, dtype=np.float64), shape)
+        longitude = np.broadcast_to(np.asarray(longitude, dtype=np.float64), shape)
+        months = np.broadcast_to(months, shape)
+        hours = np.broadcast_to(hours, shape)
+        stamps = np.broadcast_to(np.array(dates, dtype='datetime64[s]'), shape)
         
-        if month in [12, 1, 2]:
-            season = 1  # Winter
-            temp_base = 15
-            humidity_base = 70
-        elif month in [3, 4, 5]:
-            season = 2  # Spring
-            temp_base = 25
-            humidity_base = 60
-        elif month in [6, 7, 8, 9]:
-            season = 3  # Monsoon
-            temp_base = 30
-            humidity_base = 85
+        # Weather from the local climatology, or the seasonal/regional prior
+        if met_climatology.available:
+            columns = met_climatology.gather(latitude, longitude, months, hours)
         else:
-            season = 4  # Post-monsoon
-            temp_base = 20
-            humidity_base = 65
+            columns = baseline_weather(latitude, longitude, months)
         
-        # Location-based adjustments
-        # Delhi/NCR area (high pollution)
-        if 28.0 <= lat <= 29.0 and 76.5 <= lon <= 77.5:
-            aod_base = 0.8
-            wind_base = 3.0
-            blh_base = 600
-        # Mumbai area (coastal, moderate)
-        elif 18.8 <= lat <= 19.3 and 72.7 <= lon <= 73.2:
-            aod_base = 0.6
-            wind_base = 5.0
-            blh_base = 900
-        # Bangalore area (elevated, better)
-        elif 12.8 <= lat <= 13.2 and 77.4 <= lon <= 77.8:
-            aod_base = 0.5
-            wind_base = 4.0
-            blh_base = 1000
-        # Kolkata area (high humidity, moderate pollution)
-        elif 22.3 <= lat <= 22.8 and 88.2 <= lon <= 88.5:
-            aod_base = 0.7
-            wind_base = 3.5
-            blh_base = 700
+        # Observed satellite AOD where available (monthly means for dates far from the newest pass)
+        if aod_interpolator.available:
+            columns['aod_550'] = aod_interpolator.interpolate(latitude, longitude, when=stamps)
         else:
-            # Default for other locations
-            aod_base = 0.6
-            wind_base = 4.0
-            blh_base = 800
-        
-        # Add some randomness for realistic variation
-        np.random.seed(int(lat * lon * 1000) + date.timetuple().tm_yday)
+            columns['aod_550'] = np.full(shape, FEATURE_DEFAULTS['aod_550'])
         
-        # Generate all 12 features required by the model
-        features = {
-            'aod_550': max(0.1, min(2.0, aod_base + np.random.normal(0, 0.1))),
-            't2m_celsius': temp_base + np.random.normal(0, 3),
-            'wind_speed_10m': max(0.5, wind_base + np.random.normal(0, 1)),
-            'r2m': max(30, min(95, humidity_base + np.random.normal(0, 10))),
-            'blh': max(200, blh_base + np.random.normal(0, 200)),
-            'lat_cos': np.cos(np.radians(lat)),
-            'lat_sin': np.sin(np.radians(lat)),
-            'lon_cos': np.cos(np.radians(lon)),
-            'lon_sin': np.sin(np.radians(lon)),
-            'hour': hour,
-            'month': month,
-            'season': season
-        }
-        
-        return features
+        columns.update({
+            'latitude': latitude,
+            'longitude': longitude,
+            'hour': hours,
+            'month': months
+        })
+        return columns
+    
+    def generate_baseline_features(self, lat, lon, date):
+        """Generate baseline features for a location and date"""
+        columns = self.generate_baseline_batch(lat, lon, [date])
+        row = FEATURE_BUILDER.build(columns)[0]
+        return {name: row[FEATURE_INDEX[name]].item() for name in FEATURE_COLUMNS}
+    
+    @staticmethod
+    def apply_pollution_trend(aod, day_offset):
+        """Pollution tends to accumulate over consecutive forecast days"""
+        return np.minimum(2.0, aod + np.minimum(0.3, np.asarray(day_offset) * 0.1))
     
     def generate_forecast(self, latitude, longitude, start_date, forecast_days):
         """Generate offline forecast"""
@@ -162,66 +286,35 @@ class OfflineForecast:
             # If it's a date object, convert to datetime with noon as default hour
             current_date = datetime.combine(start_date, datetime.min.time().replace(hour=12))
         
-        for day in range(forecast_days):
-            # Generate features for this day
-            features = self.generate_baseline_features(latitude, longitude, current_date)
-            
-            # Add day-to-day variation
-            if day > 0:
-                # Pollution tends to accumulate over consecutive days
-                pollution_trend = min(0.3, day * 0.1)
-                features['aod_550'] += pollution_trend
-                features['aod_550'] = min(2.0, features['aod_550'])
-            
-            # Create feature array for prediction (12 features in correct order)
-            feature_array = np.array([[
-                features['aod_550'],
-                features['t2m_celsius'], 
-                features['wind_speed_10m'],
-                features['r2m'],
-                features['blh'],
-                features['lat_cos'],
-                features['lat_sin'],
-                features['lon_cos'],
-                features['lon_sin'],
-                features['hour'],
-                features['month'],
-                features['season']
-            ]])
-            
-            # Make prediction with error handling
-            try:
-                import warnings
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    pm25_prediction = self.model.predict(feature_array)[0]
-            except AttributeError as e:
-                if "'XGBModel' object has no attribute 'gpu_id'" in str(e):
-                    # Handle gpu_id attribute error specifically
-                    if not hasattr(self.model, 'gpu_id'):
-                        self.model.gpu_id = None
-                    pm25_prediction = self.model.predict(feature_array)[0]
-                else:
-                    raise e
-            
-            # Ensure realistic bounds
-            pm25_prediction = max(5, min(500, pm25_prediction))
+        # Gather every day's baseline features, then score the horizon in one call
+        day_dates = [current_date + timedelta(days=day) for day in range(forecast_days)]
+        columns = self.generate_baseline_batch(latitude, longitude, day_dates)
+        
+        columns['aod_550'] = self.apply_pollution_trend(columns['aod_550'], np.arange(forecast_days))
+        feature_matrix = FEATURE_BUILDER.build(columns)
+        
+        # Ensure realistic bounds
+        pm25_predictions = np.clip(self.predict_matrix(feature_matrix), 5, 500)
+        aod_sources = aod_interpolator.source_for(day_dates) if aod_interpolator.available else ['baseline'] * forecast_days
+        
+        for day, day_date in enumerate(day_dates):
+            pm25_prediction = float(pm25_predictions[day])
             
             # Convert to AQI
             aqi, category = self.pm25_to_cpcb_aqi(pm25_prediction)
             
             forecast_item = {
-                'date': current_date.isoformat(),
+                'date': day_date.isoformat(),
                 'pm2_5': round(pm25_prediction, 1),
                 'aqi': int(aqi),
                 'category': category,
-                'temperature': round(features['t2m_celsius'], 1),
-                'humidity': round(features['r2m'], 1),
-                'wind_speed': round(features['wind_speed_10m'], 1)
+                'temperature': round(float(feature_matrix[day, FEATURE_INDEX['t2m_celsius']]), 1),
+                'humidity': round(float(feature_matrix[day, FEATURE_INDEX['r2m']]), 1),
+                'wind_speed': round(float(feature_matrix[day, FEATURE_INDEX['wind_speed_10m']]), 1),
+                'aod_source': str(aod_sources[day])
             }
             
             forecasts.append(forecast_item)
-            current_date += timedelta(days=1)
         
         return {
             'location': {
@@ -232,21 +325,50 @@ class OfflineForecast:
             'model_info': {
                 'type': 'offline_fallback',
                 'accuracy': 'approximate',
-                'note': 'Generated using local model with baseline meteorological assumptions'
+                'note': 'Generated using local model with climatological meteorology',
+                'aod_source': 'satellite' if aod_interpolator.available else 'baseline',
+                'aod_timestamp': str(aod_interpolator.timestamp) if aod_interpolator.available else None,
+                'aod_max_age_days': aod_interpolator.max_age_days,
+                'weather_source': 'climatology' if met_climatology.available else 'baseline'
             }
         }
     
+    def predict_matrix(self, feature_matrix, iteration_range=None):
+        """Score a feature matrix built by FEATURE_BUILDER in a single model call
+
+        ``iteration_range=(0, k)`` scores with only the first ``k`` trees.
+        """
+        # Pin the active model so a hot reload cannot swap it mid-call
+        model = self.model
+        kwargs = {} if iteration_range is None else {'iteration_range': iteration_range}
+        try:
+            import warnings
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                return model.predict(feature_matrix, **kwargs)
+        except AttributeError as e:
+            if "'XGBModel' object has no attribute 'gpu_id'" in str(e):
+                # Handle gpu_id attribute error specifically
+                if not hasattr(model, 'gpu_id'):
+                    model.gpu_id = None
+                return model.predict(feature_matrix, **kwargs)
+            raise e
+    
+    def explain_matrix(self, feature_matrix):
+        """TreeSHAP contributions (rows, features + bias) for a feature matrix in one booster pass"""
+        import xgboost as xgb
+        # Pin the active model so a hot reload cannot swap it mid-call
+        booster = self.model.get_booster()
+        matrix = xgb.DMatrix(feature_matrix, feature_names=booster.feature_names)
+        return booster.predict(matrix, pred_contribs=True)
+    
     def predict_single(self, feature_array):
         """Make a single prediction using the loaded model"""
         if not self.model_loaded or self.model is None:
             raise Exception("Model not loaded. Cannot make prediction.")
         
         try:
-            # Suppress warnings for XGBoost version compatibility
-            import warnings
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                prediction = self.model.predict(feature_array)[0]
+            prediction = self.predict_matrix(feature_array)[0]
             return max(5, min(500, prediction))  # Ensure realistic bounds
         except Exception as e:
             # If prediction fails, return a reasonable fallback
@@ -256,12 +378,13 @@ class OfflineForecast:
             fallback_pm25 = min(500, max(5, aod * 120))  # Simple linear relationship
             return fallback_pm25
     
-    def predict_pm25_offline(self, input_features: dict) -> dict:
+    def predict_pm25_offline(self, input_features: dict, explain: bool = False) -> dict:
         """
         Simplified PM2.5 prediction function for hackathon demo
         
         Args:
             input_features (dict): Features like {'aod_550': 0.6, 't2m_celsius': 25, ...}
+            explain (bool): Score through TreeSHAP and add per-feature 'contributions'
             
         Returns:
             dict: {'pm25': float, 'aqi': int, 'health_category': str, 'health_message': str}
@@ -275,41 +398,15 @@ class OfflineForecast:
             }
         
         try:
-            # Extract features in the correct order for the model (12 features)
-            lat = input_features.get('latitude', 28.6)
-            lon = input_features.get('longitude', 77.2)
-            hour = input_features.get('hour', 12)
-            month = input_features.get('month', 6)
-            
-            feature_array = np.array([[
-                input_features.get('aod_550', 0.6),
-                input_features.get('t2m_celsius', 25.0),
-                input_features.get('wind_speed_10m', 4.0),
-                input_features.get('r2m', 65.0),
-                input_features.get('blh', 800.0),
-                np.cos(np.radians(lat)),  # lat_cos
-                np.sin(np.radians(lat)),  # lat_sin
-                np.cos(np.radians(lon)),  # lon_cos
-                np.sin(np.radians(lon)),  # lon_sin
-                hour,
-                month,
-                input_features.get('season', 2)
-            ]])
-            
-            # Make prediction with error handling
-            try:
-                import warnings
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    pm25_prediction = self.model.predict(feature_array)[0]
-            except AttributeError as e:
-                if "'XGBModel' object has no attribute 'gpu_id'" in str(e):
-                    # Handle gpu_id attribute error specifically
-                    if not hasattr(self.model, 'gpu_id'):
-                        self.model.gpu_id = None
-                    pm25_prediction = self.model.predict(feature_array)[0]
-                else:
-                    raise e
+            # Latitude/longitude are encoded and missing inputs defaulted by the shared builder
+            feature_array = FEATURE_BUILDER.build(input_features)
+            contributions = None
+            if explain:
+                # The contributions sum to the prediction, so one pass gives both
+                contributions = self.explain_matrix(feature_array)
+                pm25_prediction = float(contributions[0].sum())
+            else:
+                pm25_prediction = float(self.predict_matrix(feature_array)[0])
             
             pm25_prediction = max(5, min(500, pm25_prediction))  # Realistic bounds
             
@@ -326,12 +423,15 @@ class OfflineForecast:
                 "Severe": "🔴 Severe air quality emergency! Stay indoors."
             }
             
-            return {
+            result = {
                 'pm25': round(pm25_prediction, 1),
                 'aqi': int(aqi_val),
                 'health_category': health_cat,
                 'health_message': health_messages.get(health_cat, "Unknown air quality status")
             }
+            if contributions is not None:
+                result['contributions'] = contributions
+            return result
             
         except Exception as e:
             safe_print(f"Prediction error: {e}")
@@ -0,0 +1,128 @@
+"""
+Compact Prediction Grid for VayuDrishti Dashboard
+Columnar in-memory container for a day's PM2.5 predictions
+"""
+
+import numpy as np
+import pandas as pd
+
+# Health categories in severity order with their upper PM2.5 bounds (μg/m³)
+HEALTH_CATEGORIES = [
+    "Good",
+    "Moderate",
+    "Unhealthy for Sensitive Groups",
+    "Unhealthy",
+    "Very Unhealthy",
+    "Hazardous"
+]
+HEALTH_THRESHOLDS = np.array([12.0, 35.5, 55.4, 150.4, 250.4])
+
+# Cell size of the regular prediction grid
+GRID_RESOLUTION = 0.5
+
+
+def categorize_pm25(pm25):
+    """Vectorized health category codes (index into HEALTH_CATEGORIES)"""
+    return np.searchsorted(HEALTH_THRESHOLDS, pm25, side='left').astype(np.int8)
+
+
+class PredictionGrid:
+    """PM2.5 predictions stored as typed columns
+
+    Values are float32, categories are int8 codes into ``categories`` and
+    the prediction timestamp is stored once per grid. Coordinates are
+    float32, or, when every point sits on a regular ``resolution`` lattice,
+    int16 cell indices relative to ``origin``.
+    """
+
+    def __init__(self, latitude, longitude, pm25, codes=None, categories=None,
+                 timestamp=None, resolution=GRID_RESOLUTION):
+        self.pm25 = np.ascontiguousarray(pm25, dtype=np.float32)
+        if codes is None:
+            self.codes = categorize_pm25(self.pm25)
+            self.categories = list(HEALTH_CATEGORIES)
+        else:
+            self.codes = np.asarray(codes, dtype=np.int8)
+            self.categories = list(categories)
+        self.timestamp = timestamp
+        self._encode_coordinates(np.asarray(latitude), np.asarray(longitude), resolution)
+
+    def _encode_coordinates(self, latitude, longitude, resolution):
+        self.origin = None
+        self.resolution = None
+        if resolution and len(latitude):
+            origin = (float(latitude.min()), float(longitude.min()))
+            lat_index = np.rint((latitude - origin[0]) / resolution)
+            lon_index = np.rint((longitude - origin[1]) / resolution)
+            on_grid = (
+                max(lat_index.max(), lon_index.max()) <= np.iinfo(np.int16).max
+                and np.allclose(origin[0] + lat_index * resolution, latitude, atol=1e-6)
+                and np.allclose(origin[1] + lon_index * resolution, longitude, atol=1e-6)
+            )
+            if on_grid:
+                self.origin = origin
+                self.resolution = resolution
+                self._lat = lat_index.astype(np.int16)
+                self._lon = lon_index.astype(np.int16)
+                return
+        self._lat = np.ascontiguousarray(latitude, dtype=np.float32)
+        self._lon = np.ascontiguousarray(longitude, dtype=np.float32)
+
+    @classmethod
+    def from_frame(cls, df, timestamp=None, resolution=GRID_RESOLUTION):
+        """Build a grid from a predictions DataFrame"""
+        codes, categories = None, None
+        if 'health_category' in df.columns:
+            codes, uniques = pd.factorize(df['health_category'])
+            categories = uniques.tolist()
+        if timestamp is None and 'prediction_timestamp' in df.columns and len(df):
+            timestamp = str(df['prediction_timestamp'].iloc[0])
+        return cls(
+            df['latitude'].to_numpy(),
+            df['longitude'].to_numpy(),
+            df['predicted_pm2_5'].to_numpy(),
+            codes=codes,
+            categories=categories,
+            timestamp=timestamp,
+            resolution=resolution
+        )
+
+    def __len__(self):
+        return len(self.pm25)
+
+    @property
+    def is_grid_encoded(self):
+        return self.origin is not None
+
+    @property
+    def latitude(self):
+        if self.is_grid_encoded:
+            return (self.origin[0] + self._lat * self.resolution).astype(np.float32)
+        return self._lat
+
+    @property
+    def longitude(self):
+        if self.is_grid_encoded:
+            return (self.origin[1] + self._lon * self.resolution).astype(np.float32)
+        return self._lon
+
+    @property
+    def nbytes(self):
+        """Bytes held by the grid's column arrays"""
+        return self.pm25.nbytes + self.codes.nbytes + self._lat.nbytes + self._lon.nbytes
+
+    def category_names(self, rows=None):
+        """Decode category codes to strings (for display only)"""
+        codes = self.codes if rows is None else self.codes[rows]
+        return np.asarray(self.categories, dtype=object)[codes]
+
+    def to_frame(self, rows=None):
+        """Expand (a subset of) the grid into a DataFrame for export"""
+        take = slice(None) if rows is None else rows
+        return pd.DataFrame({
+            'latitude': self.latitude[take],
+            'longitude': self.longitude[take],
+            'predicted_pm2_5': self.pm25[take],
+            'health_category': self.category_names(rows),
+            'prediction_timestamp': self.timestamp
+        })
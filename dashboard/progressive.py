@@ -0,0 +1,124 @@
+"""
+Progressive Prediction for VayuDrishti
+Instant PM2.5 estimates from the first trees of the ensemble, refined to the full model
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from feature_builder import FEATURE_BUILDER
+
+# Fractions of the ensemble tried as the approximation, smallest first
+APPROX_FRACTIONS = (0.05, 0.1, 0.2, 0.3, 0.5)
+# Largest acceptable mean absolute deviation from the full model (μg/m³)
+DEFAULT_TOLERANCE = 3.0
+# Sampled serving inputs: half choose the tree count, the other half measure it
+CALIBRATION_ROWS = 4000
+
+
+def sample_grid_inputs(forecaster, n_rows=CALIBRATION_ROWS, seed=0):
+    """Feature matrix of ``n_rows`` random land cells of the serving grid at random months and hours
+
+    The inputs come from the same climatology and AOD sources that live
+    predictions and the forecast cube use, so no labels are needed: the
+    approximation is measured against the full model on them.
+    """
+    from aod_cube import AOD_GRID
+    from land_mask import approximate_mask, land_mask
+
+    rng = np.random.default_rng(seed)
+    latitude, longitude = np.empty(0), np.empty(0)
+    while len(latitude) < n_rows:
+        lat = rng.uniform(AOD_GRID['lat_min'], AOD_GRID['lat_max'], 4 * n_rows)
+        lon = rng.uniform(AOD_GRID['lon_min'], AOD_GRID['lon_max'], 4 * n_rows)
+        land = land_mask.contains(lat, lon) if land_mask.available else approximate_mask(lat, lon)
+        latitude, longitude = np.concatenate([latitude, lat[land]]), np.concatenate([longitude, lon[land]])
+    latitude, longitude = latitude[:n_rows], longitude[:n_rows]
+
+    dates = [datetime(2025, int(month), 15, int(hour))
+             for month, hour in zip(rng.integers(1, 13, n_rows), rng.integers(0, 24, n_rows))]
+    return FEATURE_BUILDER.build(forecaster.generate_baseline_batch(latitude, longitude, dates))
+
+
+class ProgressivePredictor:
+    """Approximate-then-refine scoring through the ensemble's iteration range
+
+    The approximation uses the smallest leading slice of the trees whose mean
+    absolute deviation from the full model is within ``tolerance`` on half of
+    a sample of serving-grid inputs; the other half measures the chosen slice.
+    Calibration is redone whenever the model version changes.
+    """
+
+    def __init__(self, forecaster, tolerance=DEFAULT_TOLERANCE):
+        self.forecaster = forecaster
+        self.tolerance = tolerance
+        self.report = None
+        self._lock = threading.Lock()
+
+    @property
+    def n_trees(self):
+        return self.forecaster.model.get_booster().num_boosted_rounds()
+
+    def calibrate(self):
+        """Choose the tree count on half of the sampled inputs and measure it on the other half"""
+        with self._lock:
+            model_version = self.forecaster.model_version
+            if self.report is not None and self.report['model_version'] == model_version:
+                return self.report
+
+            started = time.perf_counter()
+            matrix = sample_grid_inputs(self.forecaster)
+            n_trees = self.n_trees
+            # The reported error comes from rows the choice of tree count never saw
+            calibration, evaluation = matrix[0::2], matrix[1::2]
+
+            candidates = []
+            full = self.forecaster.predict_matrix(calibration)
+            for fraction in APPROX_FRACTIONS:
+                k = max(1, int(round(n_trees * fraction)))
+                approx = self.forecaster.predict_matrix(calibration, iteration_range=(0, k))
+                candidates.append({'trees': k, 'mae': float(np.abs(approx - full).mean())})
+            chosen = next((c for c in candidates if c['mae'] <= self.tolerance), None)
+            trees = chosen['trees'] if chosen else n_trees
+
+            error = None
+            if chosen is not None:
+                full = self.forecaster.predict_matrix(evaluation)
+                approx = self.forecaster.predict_matrix(evaluation, iteration_range=(0, trees))
+                deviation = np.abs(approx - full)
+                error = {
+                    'trees': trees,
+                    'mae': float(deviation.mean()),
+                    'p95': float(np.percentile(deviation, 95)),
+                    'max': float(deviation.max())
+                }
+
+            self.report = {
+                'model_version': model_version,
+                'n_trees': n_trees,
+                'trees': trees,
+                'tolerance': self.tolerance,
+                'calibration_rows': len(calibration),
+                'validation_rows': len(evaluation),
+                'candidates': candidates,
+                'error': error,
+                'calibration_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+            return self.report
+
+    def approximate(self, feature_matrix):
+        """Predictions from the calibrated leading slice of the ensemble"""
+        report = self.calibrate()
+        return self.forecaster.predict_matrix(feature_matrix, iteration_range=(0, report['trees']))
+
+    def refine(self, feature_matrix):
+        """Predictions from the full ensemble"""
+        return self.forecaster.predict_matrix(feature_matrix)
+
+    def predict(self, feature_matrix):
+        """Yield ('approximate', predictions) and then ('full', predictions)"""
+        yield 'approximate', self.approximate(feature_matrix)
+        yield 'full', self.refine(feature_matrix)
@@ -0,0 +1,96 @@
+"""
+Sensitivity Surfaces for VayuDrishti
+Dense 1-D/2-D PM2.5 response grids over chosen inputs, scored in one batch and cached
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from feature_builder import FEATURE_BUILDER
+
+# Sweepable inputs: (label, min, max, step) matching the Live Prediction sliders,
+# so every slider position falls exactly on a grid node
+SENSITIVITY_AXES = {
+    'aod_550': ("Aerosol Optical Depth", 0.0, 2.0, 0.01),
+    'blh': ("Boundary Layer Height (m)", 0.0, 3000.0, 10.0),
+    'wind_speed_10m': ("Wind Speed (m/s)", 0.0, 20.0, 0.1),
+    't2m_celsius': ("Temperature (°C)", -10.0, 50.0, 0.5),
+    'r2m': ("Humidity (%)", 0.0, 100.0, 1.0)
+}
+
+
+def axis_values(name):
+    """Grid nodes of one sweepable input"""
+    _, low, high, step = SENSITIVITY_AXES[name]
+    return low + step * np.arange(int(round((high - low) / step)) + 1)
+
+
+class ResponseSurface:
+    """PM2.5 over a dense grid of one or two inputs with every other input fixed"""
+
+    def __init__(self, axes, values, base, model_version, elapsed):
+        self.axes = list(axes)
+        self.coordinates = [axis_values(name) for name in self.axes]
+        self.values = values
+        self.base = dict(base)
+        self.model_version = model_version
+        self.elapsed = elapsed
+
+    def index(self, name, value):
+        _, low, _, step = SENSITIVITY_AXES[name]
+        return int(np.clip(round((value - low) / step), 0, len(axis_values(name)) - 1))
+
+    def at(self, point):
+        """PM2.5 at the grid node nearest to ``point`` ({input: value})"""
+        return float(self.values[tuple(self.index(name, point[name]) for name in self.axes)])
+
+
+class SensitivityCache:
+    """LRU of response surfaces keyed by the swept axes, the fixed inputs and the model version"""
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(axes, base, model_version):
+        fixed = "|".join(f"{name}={round(float(value), 4)}" for name, value in sorted(base.items()) if name not in axes)
+        return f"{','.join(axes)}|{fixed}|{model_version}"
+
+    def surface(self, forecaster, axes, base):
+        """Response surface over ``axes`` around the inputs in ``base``, scored once per key"""
+        key = self.make_key(axes, base, forecaster.model_version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        started = time.perf_counter()
+        grids = np.meshgrid(*[axis_values(name) for name in axes], indexing='ij')
+        columns = {name: value for name, value in base.items() if name not in axes}
+        columns.update({name: grid.ravel() for name, grid in zip(axes, grids)})
+        predictions = np.clip(forecaster.predict_matrix(FEATURE_BUILDER.build(columns)), 5, 500)
+        surface = ResponseSurface(
+            axes, predictions.astype(np.float32).reshape(grids[0].shape), base,
+            forecaster.model_version, time.perf_counter() - started
+        )
+
+        with self._lock:
+            self._entries[key] = surface
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return surface
+
+    def invalidate_model(self, model_version):
+        """Drop every surface computed with ``model_version``"""
+        with self._lock:
+            for key in [key for key in self._entries if key.endswith(f"|{model_version}")]:
+                del self._entries[key]
+
+
+# Shared instance used by the dashboard
+sensitivity_cache = SensitivityCache()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+CPCB Station Averages for VayuDrishti
+Rolling 24h/8h pollutant averages and AQI per station, streamed in O(1) or backfilled in bulk
+
+Usage:
+    python station_aqi.py [../data/cpcb/*.csv]
+"""
+
+import argparse
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aqi_engine import aqi_frame
+
+DEFAULT_CPCB_DIR = Path(__file__).parent.parent / "data" / "cpcb"
+
+# CPCB averaging period per pollutant (hours)
+WINDOW_HOURS = {
+    'pm2_5': 24,
+    'pm10': 24,
+    'no2': 24,
+    'so2': 24,
+    'nh3': 24,
+    'o3': 8,
+    'co': 8
+}
+# CPCB requires 16 of 24 hours (two thirds of any window) to report an average
+MIN_COVERAGE = 16 / 24
+# Sampling interval of the CPCB station files
+SAMPLE_HOURS = 3
+
+
+def window_name(pollutant):
+    return f"{pollutant}_{WINDOW_HOURS[pollutant]}h"
+
+
+class RollingMean:
+    """Time-windowed mean over (t - window, t] with amortized O(1) updates"""
+
+    def __init__(self, window_seconds):
+        self.window_seconds = window_seconds
+        self.readings = deque()
+        self.total = 0.0
+        self.count = 0
+        self.latest = None
+
+    def add(self, t, value):
+        """Add a reading at ``t`` (epoch seconds); NaN only advances the window"""
+        if self.latest is not None and t < self.latest:
+            raise ValueError(f"Reading at {t} is older than the latest reading at {self.latest}")
+        self.latest = t
+        if not np.isnan(value):
+            self.readings.append((t, value))
+            self.total += value
+            self.count += 1
+        self.expire(t)
+
+    def expire(self, now):
+        while self.readings and self.readings[0][0] <= now - self.window_seconds:
+            _, value = self.readings.popleft()
+            self.total -= value
+            self.count -= 1
+        if not self.readings:
+            self.total = 0.0  # Reset accumulated float error whenever the window empties
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def state(self):
+        """JSON-serializable window contents, restored by ``from_state``"""
+        return {'latest': self.latest, 'readings': [list(reading) for reading in self.readings]}
+
+    @classmethod
+    def from_state(cls, window_seconds, state):
+        window = cls(window_seconds)
+        window.latest = state['latest']
+        window.readings = deque(tuple(reading) for reading in state['readings'])
+        window.total = sum(value for _, value in window.readings)
+        window.count = len(window.readings)
+        return window
+
+
+class StationAverager:
+    """Streaming rolling averages for every (station, pollutant)"""
+
+    def __init__(self, pollutants=('pm2_5', 'pm10', 'no2', 'so2'), sample_hours=SAMPLE_HOURS):
+        self.pollutants = list(pollutants)
+        self.sample_hours = sample_hours
+        self.windows = {}
+        self.updated = {}
+
+    def _window(self, station, pollutant):
+        key = (station, pollutant)
+        if key not in self.windows:
+            self.windows[key] = RollingMean(WINDOW_HOURS[pollutant] * 3600)
+        return self.windows[key]
+
+    def is_complete(self, pollutant, count):
+        return count * self.sample_hours >= MIN_COVERAGE * WINDOW_HOURS[pollutant]
+
+    def update(self, station, timestamp, readings):
+        """Add one station reading ({pollutant: value}); returns the station's current averages"""
+        t = pd.Timestamp(timestamp).value // 10**9
+        for pollutant in self.pollutants:
+            self._window(station, pollutant).add(t, float(readings.get(pollutant, np.nan)))
+        self.updated[station] = pd.Timestamp(timestamp)
+        return self.averages(station)
+
+    def averages(self, station):
+        """{'<pollutant>_<hours>h': mean or NaN when coverage is incomplete} for one station"""
+        result = {}
+        for pollutant in self.pollutants:
+            window = self._window(station, pollutant)
+            result[window_name(pollutant)] = window.mean if self.is_complete(pollutant, window.count) else np.nan
+        return result
+
+    def export(self, station):
+        """Rolling state of one station, so a stream can resume without replaying history"""
+        return {
+            'updated': self.updated[station].isoformat(),
+            'windows': {pollutant: self._window(station, pollutant).state() for pollutant in self.pollutants}
+        }
+
+    def restore(self, station, state):
+        """Load a station's rolling state saved by ``export``"""
+        for pollutant, window in state['windows'].items():
+            if pollutant in self.pollutants:
+                self.windows[(station, pollutant)] = RollingMean.from_state(WINDOW_HOURS[pollutant] * 3600, window)
+        self.updated[station] = pd.Timestamp(state['updated'])
+
+    def snapshot(self):
+        """Latest averages and CPCB AQI of every station as a DataFrame"""
+        rows = [{'station_name': station, 'datetime': when, **self.averages(station)}
+                for station, when in self.updated.items()]
+        return station_aqi(pd.DataFrame(rows, columns=['station_name', 'datetime'] +
+                                        [window_name(pollutant) for pollutant in self.pollutants]))
+
+
+def rolling_backfill(df, pollutants=('pm2_5', 'pm10', 'no2', 'so2'), station_col='station_name',
+                     time_col='datetime', sample_hours=SAMPLE_HOURS):
+    """Rolling averages for every row of a station history in one vectorized pass
+
+    Rows are sorted by (station, time) and each station's times are offset
+    into disjoint ranges, so one searchsorted finds every window start and
+    prefix sums give every window total without a per-group loop.
+    """
+    df = df.sort_values([station_col, time_col], kind='stable').reset_index(drop=True)
+    codes = pd.factorize(df[station_col])[0].astype(np.int64)
+    seconds = pd.to_datetime(df[time_col]).to_numpy().astype('datetime64[s]').astype(np.int64)
+    seconds = seconds - (seconds.min() if len(seconds) else 0)
+
+    out = {}
+    for pollutant in pollutants:
+        if pollutant not in df.columns:
+            continue
+        window = WINDOW_HOURS[pollutant] * 3600
+        stride = (seconds.max() if len(seconds) else 0) + window + 1
+        keys = codes * stride + seconds
+        start = np.searchsorted(keys, keys - window, side='right')
+
+        values = df[pollutant].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        total = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+        count = np.concatenate([[0], np.cumsum(valid)])
+        end = np.arange(1, len(df) + 1)
+        n = count[end] - count[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (total[end] - total[start]) / n
+        complete = n * sample_hours >= MIN_COVERAGE * WINDOW_HOURS[pollutant]
+        out[window_name(pollutant)] = np.where(complete, mean, np.nan)
+        out[f"{window_name(pollutant)}_count"] = n
+
+    return df.assign(**out)
+
+
+def station_aqi(averaged):
+    """CPCB AQI, category and dominant pollutant for every row of rolling_backfill() output"""
+    columns = {pollutant: window_name(pollutant) for pollutant in WINDOW_HOURS
+               if window_name(pollutant) in averaged.columns}
+    return aqi_frame(averaged, columns)
+
+
+def load_cpcb_history(paths=None):
+    """All CPCB station files as one frame, without the rows repeated across overlapping files"""
+    paths = paths or sorted(DEFAULT_CPCB_DIR.glob("*.csv"))
+    frames = [pd.read_csv(path, parse_dates=['datetime']) for path in paths]
+    if not frames:
+        raise FileNotFoundError(f"No CPCB files found in {DEFAULT_CPCB_DIR}")
+    history = pd.concat(frames, ignore_index=True)
+    return history.drop_duplicates(['station_name', 'datetime'], keep='last')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling CPCB averages and AQI per station")
+    parser.add_argument("csv", nargs="*", help="CPCB CSV files (default: data/cpcb/*.csv)")
+    args = parser.parse_args()
+
+    history = load_cpcb_history(args.csv)
+    print(f"📡 {len(history):,} readings from {history['station_name'].nunique()} stations")
+
+    started = pd.Timestamp.now()
+    averaged = station_aqi(rolling_backfill(history))
+    elapsed = (pd.Timestamp.now() - started).total_seconds()
+    print(f"✅ Backfilled rolling averages and AQI in {elapsed * 1000:.1f} ms")
+
+    latest = averaged.groupby('station_name').tail(1)
+    columns = ['station_name', 'datetime'] + [window_name(p) for p in ('pm2_5', 'pm10', 'no2', 'so2')]
+    columns += ['aqi', 'aqi_category', 'dominant_pollutant']
+    print(latest[columns].to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,18 @@ import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import json
+import sys
 import warnings
+from pathlib import Path
 warnings.filterwarnings('ignore')
 
+# Share the serving feature schema so training and inference stay in parity
+sys.path.insert(0, str(Path(__file__).parent / "dashboard"))
+from feature_builder import FEATURE_BUILDER, FEATURE_COLUMNS
+from arrow_data import SOURCE_COLUMNS, build_features, column_array, read_table
+
+TARGET_COLUMNS = ['actual_pm2_5', 'pm2_5']
+
 def load_and_fix_model():
     """Load training data and recreate model with current XGBoost version"""
     print("🔧 Fixing XGBoost model compatibility...")
@@ -27,53 +36,53 @@ def load_and_fix_model():
             "models/predictions_optimized.csv"
         ]
         
-        df = None
+        # Read only the feature sources and target into Arrow (no pandas frame)
+        table = None
         for path in data_paths:
             try:
-                df_temp = pd.read_csv(path)
-                if 'actual_pm2_5' in df_temp.columns or 'pm2_5' in df_temp.columns:
-                    df = df_temp
+                table_temp = read_table(path, columns=SOURCE_COLUMNS + TARGET_COLUMNS)
+                if any(col in table_temp.column_names for col in TARGET_COLUMNS):
+                    table = table_temp
                     print(f"✅ Loaded training data from {path}")
                     break
             except FileNotFoundError:
                 continue
         
-        if df is None:
+        if table is None:
             print("❌ No training data found. Creating synthetic model...")
             create_synthetic_model()
             return
         
         # Prepare features and target
-        if 'actual_pm2_5' in df.columns:
+        if 'actual_pm2_5' in table.column_names:
             target_col = 'actual_pm2_5'
-        elif 'pm2_5' in df.columns:
+        elif 'pm2_5' in table.column_names:
             target_col = 'pm2_5'
         else:
             print("❌ No PM2.5 target column found")
             return
         
-        # Expected feature columns for the model
-        feature_cols = [
-            'aod_550', 't2m_celsius', 'wind_speed_10m', 'r2m', 'blh',
-            'lat_cos', 'lat_sin', 'lon_cos', 'lon_sin', 'hour', 'month', 'season'
-        ]
-        
-        # Check if we have all required features
-        available_features = [col for col in feature_cols if col in df.columns]
+        # Check which model features the data can supply or derive
+        missing_features = FEATURE_BUILDER.missing_columns({col: True for col in table.column_names})
+        available_features = [col for col in FEATURE_COLUMNS if col not in missing_features]
         
         if len(available_features) < 8:  # Need at least 8 core features
             print(f"❌ Insufficient features available. Found: {available_features}")
             create_synthetic_model()
             return
+        if missing_features:
+            print(f"⚠️ Filling missing features with serving defaults: {missing_features}")
             
-        # Use available features
-        X = df[available_features].copy()
-        y = df[target_col].copy()
+        # Build the 12-feature matrix exactly as the dashboard does at inference,
+        # written straight from the Arrow buffers into one float32 matrix
+        X = build_features(table)
+        y = column_array(table, target_col)
         
-        # Remove any rows with missing values
-        mask = ~(X.isnull().any(axis=1) | y.isnull())
-        X = X[mask]
-        y = y[mask]
+        # Remove any rows with missing values (copies only when some are dropped)
+        mask = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        if not mask.all():
+            X, y = X[mask], y[mask]
+        X = FEATURE_BUILDER.frame(X)
         
         if len(X) < 10:
             print(f"❌ Too few valid samples ({len(X)}). Creating synthetic model...")
@@ -82,33 +91,9 @@ def load_and_fix_model():
         
         print(f"✅ Prepared dataset: {len(X)} samples, {len(available_features)} features")
         
-        # Split data
-        if len(X) >= 20:
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-        else:
-            X_train = X_test = X
-            y_train = y_test = y
-        
-        # Create new XGBoost model with current version
-        model = xgb.XGBRegressor(
-            n_estimators=300,
-            max_depth=3,
-            learning_rate=0.1,
-            subsample=0.9,
-            colsample_bytree=0.9,
-            random_state=42,
-            n_jobs=-1
-        )
-        
         # Train model
         print("🚀 Training new XGBoost model...")
-        model.fit(X_train, y_train)
-        
-        # Evaluate
-        y_pred = model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-        r2 = r2_score(y_test, y_pred)
+        model, mae, rmse, r2 = train_model(X, y)
         
         print(f"📊 New Model Performance:")
         print(f"   MAE: {mae:.2f} μg/m³")
@@ -120,12 +105,40 @@ def load_and_fix_model():
         print("✅ Updated model saved to models/best_model.pkl")
         
         # Update metrics
-        update_metrics(mae, rmse, r2, available_features, len(X))
+        update_metrics(mae, rmse, r2, FEATURE_COLUMNS, len(X))
         
     except Exception as e:
         print(f"❌ Error fixing model: {e}")
         create_synthetic_model()
 
+def train_model(X, y):
+    """Fit the production XGBoost configuration; returns (model, mae, rmse, r2) on a held-out split"""
+    # Split data
+    if len(X) >= 20:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+    else:
+        X_train = X_test = X
+        y_train = y_test = y
+    
+    # Create new XGBoost model with current version
+    model = xgb.XGBRegressor(
+        n_estimators=300,
+        max_depth=3,
+        learning_rate=0.1,
+        subsample=0.9,
+        colsample_bytree=0.9,
+        random_state=42,
+        n_jobs=-1
+    )
+    model.fit(X_train, y_train)
+    
+    # Evaluate
+    y_pred = model.predict(X_test)
+    mae = mean_absolute_error(y_test, y_pred)
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    r2 = r2_score(y_test, y_pred)
+    return model, mae, rmse, r2
+
 def create_synthetic_model():
     """Create a simple synthetic model based on domain knowledge"""
     print("🔧 Creating synthetic XGBoost model...")
@@ -144,10 +157,6 @@ def create_synthetic_model():
     # Location features (India bounds)
     lat = np.random.uniform(8, 35, n_samples)
     lon = np.random.uniform(68, 97, n_samples)
-    lat_cos = np.cos(np.radians(lat))
-    lat_sin = np.sin(np.radians(lat))
-    lon_cos = np.cos(np.radians(lon))
-    lon_sin = np.sin(np.radians(lon))
     
     hour = np.random.randint(0, 24, n_samples)
     month = np.random.randint(1, 13, n_samples)
@@ -166,21 +175,19 @@ def create_synthetic_model():
     # Ensure realistic bounds
     pm25 = np.clip(pm25, 5, 500)
     
-    # Create DataFrame
-    X = pd.DataFrame({
+    # Build the feature matrix through the shared serving schema
+    X = FEATURE_BUILDER.frame(FEATURE_BUILDER.build({
         'aod_550': aod_550,
         't2m_celsius': t2m_celsius,
         'wind_speed_10m': wind_speed_10m,
         'r2m': r2m,
         'blh': blh,
-        'lat_cos': lat_cos,
-        'lat_sin': lat_sin,
-        'lon_cos': lon_cos,
-        'lon_sin': lon_sin,
+        'latitude': lat,
+        'longitude': lon,
         'hour': hour,
         'month': month,
         'season': season
-    })
+    }))
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, pm25, test_size=0.3, random_state=42)
@@ -216,7 +223,7 @@ def create_synthetic_model():
     # Update metrics
     update_metrics(mae, rmse, r2, list(X.columns), len(X))
 
-def update_metrics(mae, rmse, r2, features, n_samples):
+def update_metrics(mae, rmse, r2, features, n_samples, path='models/model_metrics.json'):
     """Update the model metrics file"""
     metrics = {
         "best_model": {
@@ -240,7 +247,7 @@ def update_metrics(mae, rmse, r2, features, n_samples):
     }
     
     try:
-        with open('models/model_metrics.json', 'w') as f:
+        with open(path, 'w') as f:
             json.dump(metrics, f, indent=2)
         print("✅ Updated model metrics saved")
     except Exception as e:
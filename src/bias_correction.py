@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Station Bias Correction for VayuDrishti
+Model residuals at CPCB stations spread over the prediction grid by localized inverse-distance weighting
+
+Usage:
+    python src/bias_correction.py [data/unified/predictions/*.parquet] [--k 8] [--radius-km 250]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from sklearn.neighbors import KDTree
+
+DEFAULT_PREDICTIONS_DIR = Path(__file__).resolve().parent.parent / "data" / "unified" / "predictions"
+EARTH_RADIUS_KM = 6371.0
+# Same bounds as the model's scored predictions
+PM25_RANGE = (5, 500)
+
+
+def earth_points(latitude, longitude):
+    """Coordinates on a sphere of the Earth's radius; their chord distance (km) ranks like great-circle distance"""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    return EARTH_RADIUS_KM * np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+class BiasCorrector:
+    """Residual field of one scored day, fitted at the station cells and evaluated anywhere
+
+    The residual (observed minus predicted PM2.5) of a station at a grid
+    row's hour, or its daily mean when it did not report that hour, is
+    weighted by ``1 / (d² + smoothing_km²)`` over the ``k`` nearest stations
+    within ``radius_km``. A zero residual at ``radius_km`` joins every
+    weighted mean, so the correction fades to nothing away from stations.
+    Neighbours come from a KD-tree over the station cells, queried once per
+    distinct grid cell, so a day costs O(cells · k · log stations + rows · k)
+    rather than O(rows · stations).
+    """
+
+    def __init__(self, k=8, radius_km=250.0, smoothing_km=25.0):
+        self.k = k
+        self.radius_km = radius_km
+        self.smoothing_km = smoothing_km
+        self.tree = None
+
+    def fit(self, scored):
+        """Station residuals from the ground-truth rows of a scored partition"""
+        truth = scored[scored['has_ground_truth'].eq(True) & scored['pm2_5'].notna()]
+        truth = truth.assign(residual=truth['pm2_5'].astype(np.float64) - truth['predicted_pm2_5'])
+        self.hours = np.unique(scored['datetime'].to_numpy())
+
+        # One station per grid cell: readings were already averaged per cell and hour by the join
+        by_hour = truth.pivot_table(index='grid_id', columns='datetime', values='residual', aggfunc='mean')
+        by_hour = by_hour.reindex(columns=self.hours)
+        self.stations = truth.groupby('grid_id')[['latitude', 'longitude']].first().loc[by_hour.index]
+
+        # Hours a station did not report use its daily mean; the last column is the daily mean itself
+        daily = by_hour.mean(axis=1).to_numpy()
+        hourly = by_hour.to_numpy(dtype=np.float64)
+        self.residuals = np.column_stack([np.where(np.isnan(hourly), daily[:, None], hourly), daily])
+        self.tree = KDTree(earth_points(self.stations['latitude'], self.stations['longitude'])) \
+            if len(self.stations) else None
+        return self
+
+    def hour_index(self, times):
+        """Column of ``residuals`` for each time (the daily mean for hours the fit did not see)"""
+        times = np.asarray(times, dtype=self.hours.dtype)
+        index = np.searchsorted(self.hours, times).clip(0, max(len(self.hours) - 1, 0))
+        seen = len(self.hours) > 0 and (self.hours[index] == times)
+        return np.where(seen, index, len(self.hours))
+
+    def neighbours(self, latitude, longitude, exclude_self=False):
+        """(distances km, station indices) of the k nearest stations of each point, nearest first"""
+        k = min(self.k + exclude_self, len(self.stations))
+        distances, indices = self.tree.query(earth_points(latitude, longitude), k=k)
+        if exclude_self:
+            distances, indices = distances[:, 1:], indices[:, 1:]
+        return distances, indices
+
+    def spread(self, distances, indices, columns):
+        """Weighted residual of each row's neighbours (rows × k) at that row's residual column"""
+        values = self.residuals[indices, columns[:, None]]
+        weights = np.where(distances < self.radius_km, 1.0 / (distances ** 2 + self.smoothing_km ** 2), 0.0)
+        weights[np.isnan(values)] = 0.0
+        total = (weights * np.nan_to_num(values)).sum(axis=1)
+        return total / (weights.sum(axis=1) + 1.0 / (self.radius_km ** 2 + self.smoothing_km ** 2))
+
+    def correction(self, scored):
+        """Residual correction (μg/m³) for every row of a scored partition"""
+        if self.tree is None or not len(scored):
+            return np.zeros(len(scored))
+        codes, cells = pd.factorize(scored['grid_id'])
+        first = pd.Series(np.arange(len(codes))).groupby(codes).first().to_numpy()
+        distances, indices = self.neighbours(scored['latitude'].to_numpy()[first],
+                                             scored['longitude'].to_numpy()[first])
+        return self.spread(distances[codes], indices[codes], self.hour_index(scored['datetime'].to_numpy()))
+
+    def correct(self, scored):
+        """The scored rows with ``bias_correction`` and the clipped ``corrected_pm2_5``"""
+        correction = self.correction(scored)
+        corrected = np.clip(scored['predicted_pm2_5'].to_numpy() + correction, *PM25_RANGE)
+        return scored.assign(bias_correction=correction.astype(np.float32),
+                             corrected_pm2_5=corrected.astype(np.float32))
+
+    def evaluate(self, scored, held_out=None):
+        """Leave-one-station-out accuracy of the raw and corrected predictions at the station rows
+
+        Each station's rows are corrected from the other stations only, as a
+        grid cell without a station would be. ``held_out`` (a boolean per
+        scored row) limits the evaluation to stations the model was not
+        trained on, whose raw residuals are not shrunk by the fit.
+        """
+        truth = scored['has_ground_truth'].eq(True) & scored['pm2_5'].notna()
+        if held_out is not None:
+            truth &= np.asarray(held_out, dtype=bool)
+        truth = scored[truth]
+        report = {'stations': len(self.stations), 'rows': len(truth),
+                  'evaluated_stations': int(truth['grid_id'].nunique())}
+        if len(self.stations) < 2 or truth.empty:
+            return report
+        station = self.stations.index.get_indexer(truth['grid_id'])
+        distances, indices = self.neighbours(self.stations['latitude'].to_numpy(),
+                                             self.stations['longitude'].to_numpy(), exclude_self=True)
+        held_out = self.spread(distances[station], indices[station], self.hour_index(truth['datetime'].to_numpy()))
+
+        observed = truth['pm2_5'].to_numpy(dtype=np.float64)
+        predicted = truth['predicted_pm2_5'].to_numpy(dtype=np.float64)
+        for name, estimate in (('raw', predicted), ('corrected', np.clip(predicted + held_out, *PM25_RANGE))):
+            error = observed - estimate
+            report[f'mae_{name}'] = float(np.abs(error).mean())
+            report[f'rmse_{name}'] = float(np.sqrt((error ** 2).mean()))
+        return report
+
+
+def combine_reports(reports):
+    """Row-weighted held-out metrics over several days' ``evaluate()`` reports"""
+    reports = [report for report in reports if 'mae_raw' in report]
+    rows = sum(report['rows'] for report in reports)
+    combined = {'days': len(reports), 'rows': rows}
+    if not rows:
+        return combined
+    for name in ('raw', 'corrected'):
+        combined[f'mae_{name}'] = sum(r[f'mae_{name}'] * r['rows'] for r in reports) / rows
+        combined[f'rmse_{name}'] = np.sqrt(sum(r[f'rmse_{name}'] ** 2 * r['rows'] for r in reports) / rows)
+    return combined
+
+
+def describe_gain(report):
+    return (f"MAE {report['mae_raw']:.2f} → {report['mae_corrected']:.2f} μg/m³, "
+            f"RMSE {report['rmse_raw']:.2f} → {report['rmse_corrected']:.2f} μg/m³ "
+            f"on {report['rows']:,} held-out station rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Held-out accuracy of the station bias correction")
+    parser.add_argument("predictions", nargs="*", help="Scored partitions (default: data/unified/predictions)")
+    parser.add_argument("--k", type=int, default=8, help="Nearest stations per grid cell")
+    parser.add_argument("--radius-km", type=float, default=250.0, help="Stations further away are ignored")
+    parser.add_argument("--smoothing-km", type=float, default=25.0, help="Distance softening of the weights")
+    args = parser.parse_args()
+
+    paths = args.predictions or sorted(DEFAULT_PREDICTIONS_DIR.glob("*.parquet"))
+    if not paths:
+        raise SystemExit(f"❌ No scored partitions found in {DEFAULT_PREDICTIONS_DIR}")
+    # Only the stations retraining never sees give honest raw residuals
+    from data_orchestrator import holdout_cells
+
+    reports = []
+    for path in paths:
+        scored = pq.read_table(path).to_pandas()
+        started = time.perf_counter()
+        corrector = BiasCorrector(args.k, args.radius_km, args.smoothing_km).fit(scored)
+        corrected = corrector.correct(scored)
+        elapsed = time.perf_counter() - started
+        report = corrector.evaluate(scored, holdout_cells(scored['grid_id']))
+        reports.append(report)
+        gain = describe_gain(report) if 'mae_raw' in report else "fewer than 2 stations, not evaluated"
+        print(f"📍 {Path(path).stem}: {len(corrected):,} rows corrected from {report['stations']} stations "
+              f"in {elapsed * 1000:.1f} ms; {gain}")
+
+    combined = combine_reports(reports)
+    if combined['rows']:
+        print(f"✅ {combined['days']} day(s): {describe_gain(combined)}")
+
+
+if __name__ == "__main__":
+    main()
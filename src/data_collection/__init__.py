@@ -0,0 +1,18 @@
+"""
+Data Collection for VayuDrishti
+Async, connection-pooled collectors for CPCB stations, satellite AOD and ERA5 weather
+"""
+
+from .cpcb_downloader import CPCBDataDownloader
+from .era5_weather_downloader import ERA5WeatherDownloader
+from .http_pool import AsyncHTTPPool, HTTPError, run_sync
+from .satellite_aod_downloader import SatelliteAODDownloader
+
+__all__ = [
+    'AsyncHTTPPool',
+    'CPCBDataDownloader',
+    'ERA5WeatherDownloader',
+    'HTTPError',
+    'SatelliteAODDownloader',
+    'run_sync'
+]
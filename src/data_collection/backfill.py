@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Historical Backfill for VayuDrishti Collectors
+Resumable (source, day) shards fetched by concurrent workers, tracked in an append-only manifest
+
+Usage:
+    cd src && python -m data_collection.backfill [--days-back 180] [--sources satellite weather cpcb] [--workers 8]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import traceback
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pyarrow.parquet as pq
+
+from .cpcb_downloader import CPCBDataDownloader
+from .era5_weather_downloader import ERA5WeatherDownloader
+from .satellite_aod_downloader import SatelliteAODDownloader
+
+DEFAULT_BACKFILL_DIR = Path(__file__).parent.parent.parent / "data" / "backfill"
+SOURCES = ['satellite', 'weather', 'cpcb']
+PROGRESS_INTERVAL = 5.0
+
+
+class Shard:
+    """One (source, day) unit of work stored as ``<root>/<source>/<day>.parquet``"""
+
+    def __init__(self, source, day, root):
+        self.source = source
+        self.day = day
+        self.path = Path(root) / source / f"{day.isoformat()}.parquet"
+
+    @property
+    def key(self):
+        return f"{self.source}/{self.day.isoformat()}"
+
+
+class BackfillManifest:
+    """Append-only JSONL of shard outcomes; the last entry per shard wins
+
+    Each line is flushed and fsynced on completion, so a crash loses at most
+    the shards that were still in flight.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line torn by a crash mid-write
+                    self.entries[entry['shard']] = entry
+
+    def is_done(self, shard):
+        entry = self.entries.get(shard.key)
+        return entry is not None and entry['status'] == 'done'
+
+    def record(self, shard, status, **details):
+        entry = {'shard': shard.key, 'status': status, 'recorded_at': datetime.now().isoformat(), **details}
+        self.entries[shard.key] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class SourceProgress:
+    """Per-source shard, row and byte counters"""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    @property
+    def finished(self):
+        return self.done + self.skipped + self.failed
+
+    def summary(self, source):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"{source:<10} {self.finished:>4}/{self.total:<4} shards "
+                f"({self.done} fetched, {self.skipped} skipped, {self.failed} failed) "
+                f"{self.rows:>12,} rows {self.rows / elapsed:>10,.0f} rows/s "
+                f"{self.bytes / 1024 / 1024 / elapsed:>6.2f} MB/s")
+
+
+class Backfill:
+    """Plans, skips and runs (source, day) shards over shared per-source connection pools"""
+
+    def __init__(self, root=DEFAULT_BACKFILL_DIR, workers=8, api_base=None, api_key=None):
+        self.root = Path(root)
+        self.workers = workers
+        self.manifest = BackfillManifest(self.root / "manifest.jsonl")
+        self.downloaders = {
+            # Day shards never overlap and are themselves the stored result
+            'satellite': SatelliteAODDownloader(self.root / "satellite", use_cache=False),
+            'weather': ERA5WeatherDownloader(self.root / "weather", use_cache=False),
+            'cpcb': CPCBDataDownloader(self.root / "cpcb", api_key=api_key, use_cache=False)
+        }
+        if api_base:
+            # Point every source at one host (e.g. the local stand-in API), keeping the paths
+            for downloader in self.downloaders.values():
+                downloader.base_url = api_base.rstrip('/') + urlsplit(downloader.base_url).path
+
+    def plan(self, sources, start_day, end_day):
+        """Every shard of ``sources`` from ``start_day`` to ``end_day`` (inclusive)
+
+        The CPCB feed only serves the current readings, so only today's CPCB
+        shard can be fetched; history comes from the other sources.
+        """
+        shards = []
+        for source in sources:
+            day = start_day if source != 'cpcb' else max(start_day, date.today())
+            while day <= end_day:
+                shards.append(Shard(source, day, self.root))
+                day += timedelta(days=1)
+        return shards
+
+    def pending(self, shards, refresh=()):
+        """(shards to fetch, shards already complete) by manifest or by storage
+
+        Shards whose key is in ``refresh`` are fetched again even if stored.
+        """
+        todo, complete = [], []
+        for shard in shards:
+            if shard.key in refresh:
+                todo.append(shard)
+            elif self.manifest.is_done(shard) and shard.path.exists():
+                complete.append(shard)
+            elif shard.path.exists():
+                # Stored by a run that died before recording it
+                self.manifest.record(shard, 'done', rows=pq.read_metadata(shard.path).num_rows,
+                                     path=str(shard.path), recovered=True)
+                complete.append(shard)
+            else:
+                todo.append(shard)
+        return todo, complete
+
+    async def fetch_shard(self, pool, shard):
+        day = shard.day.isoformat()
+        downloader = self.downloaders[shard.source]
+        if shard.source == 'satellite':
+            return await downloader.fetch_hourly(pool, day, day, path=shard.path)
+        if shard.source == 'weather':
+            return await downloader.fetch_surface(pool, day, day, path=shard.path)
+        return await downloader.fetch_feed(pool, path=shard.path)
+
+    async def run(self, shards, progress_interval=PROGRESS_INTERVAL, refresh=()):
+        """Fetch the pending shards (and those in ``refresh``); returns {source: SourceProgress}"""
+        todo, complete = self.pending(shards, refresh)
+        progress = {}
+        for shard in shards:
+            progress.setdefault(shard.source, SourceProgress(0)).total += 1
+        for shard in complete:
+            progress[shard.source].skipped += 1
+
+        queue = asyncio.Queue()
+        for shard in todo:
+            queue.put_nowait(shard)
+        pools = {source: self.downloaders[source].make_pool() for source in progress}
+
+        async def worker():
+            while not queue.empty():
+                shard = queue.get_nowait()
+                pool = pools[shard.source]
+                bytes_before = pool.stats['bytes']
+                started = time.perf_counter()
+                try:
+                    _, rows = await self.fetch_shard(pool, shard)
+                except Exception as e:
+                    progress[shard.source].failed += 1
+                    self.manifest.record(shard, 'failed', error=f"{type(e).__name__}: {e}",
+                                         trace=traceback.format_exc(limit=3))
+                    continue
+                # Bytes are attributed approximately when shards of a source overlap in time
+                transferred = pool.stats['bytes'] - bytes_before
+                progress[shard.source].done += 1
+                progress[shard.source].rows += rows
+                progress[shard.source].bytes += transferred
+                self.manifest.record(shard, 'done', rows=rows, bytes=transferred, path=str(shard.path),
+                                     seconds=round(time.perf_counter() - started, 3))
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(progress_interval)
+                for source, counters in progress.items():
+                    print(f"⏳ {counters.summary(source)}")
+
+        report_task = asyncio.create_task(reporter())
+        try:
+            await asyncio.gather(*[worker() for _ in range(min(self.workers, len(todo)) or 1)])
+        finally:
+            report_task.cancel()
+            for pool in pools.values():
+                await pool.close()
+        return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable sharded historical backfill")
+    parser.add_argument("--days-back", type=int, default=180, help="Days of history up to --end-date")
+    parser.add_argument("--end-date", help="Last day to backfill (YYYY-MM-DD, default: today)")
+    parser.add_argument("--sources", nargs="+", choices=SOURCES, default=SOURCES, help="Sources to backfill")
+    parser.add_argument("--workers", type=int, default=8, help="Shards fetched concurrently")
+    parser.add_argument("--store", default=str(DEFAULT_BACKFILL_DIR), help="Shard store and manifest directory")
+    parser.add_argument("--api-base", help="Serve every source from this base URL (e.g. the local stand-in API)")
+    args = parser.parse_args()
+
+    end_day = date.fromisoformat(args.end_date) if args.end_date else date.today()
+    start_day = end_day - timedelta(days=args.days_back - 1)
+    backfill = Backfill(args.store, workers=args.workers, api_base=args.api_base)
+    shards = backfill.plan(args.sources, start_day, end_day)
+    print(f"🗂️ {len(shards)} shards from {start_day} to {end_day} across {', '.join(args.sources)}")
+
+    started = time.perf_counter()
+    progress = asyncio.run(backfill.run(shards))
+    print(f"\n✅ Backfill finished in {time.perf_counter() - started:.1f}s")
+    for source, counters in progress.items():
+        print(f"   {counters.summary(source)}")
+
+    failed = defaultdict(list)
+    for shard in shards:
+        entry = backfill.manifest.entries.get(shard.key, {})
+        if entry.get('status') == 'failed':
+            failed[shard.source].append(f"{shard.day}: {entry['error']}")
+    for source, errors in failed.items():
+        print(f"❌ {source}: {len(errors)} failed shard(s), rerun to retry; first: {errors[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Offline Ingest Benchmark for VayuDrishti Collectors
+Serial one-connection-per-request fetching vs the pooled async collectors, against the local stand-in API
+
+Usage:
+    cd src && python -m data_collection.benchmark_ingest [--latency 30] [--connect-latency 90] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .cpcb_downloader import CPCB_RESOURCE_URL, CPCBDataDownloader
+from .mock_server import MockAPIServer, record_demo_responses
+from .satellite_aod_downloader import AIR_QUALITY_URL, SatelliteAODDownloader
+
+START_DATE = '2025-07-18'
+END_DATE = '2025-07-21'
+
+
+async def run_source(name, downloader, fetch, pool_options, output):
+    async with downloader.make_pool(record_dir=None, **pool_options) as pool:
+        started = time.perf_counter()
+        _, rows = await fetch(pool, output)
+        elapsed = time.perf_counter() - started
+        return {
+            'source': name,
+            'seconds': elapsed,
+            'rows': rows,
+            'requests': pool.stats['requests'],
+            'connections': pool.stats['connections'],
+            'megabytes': pool.stats['bytes'] / 1024 / 1024
+        }
+
+
+async def benchmark(args, recordings_dir, work_dir):
+    modes = {
+        'serial': {'limit_per_host': 1, 'keep_alive': False},
+        'pooled': {'limit_per_host': args.concurrency, 'keep_alive': True}
+    }
+    results = []
+    async with MockAPIServer(recordings_dir, latency=args.latency / 1000,
+                             connect_latency=args.connect_latency / 1000) as server:
+        cpcb = CPCBDataDownloader(work_dir / "cpcb", api_key="offline", use_cache=False,
+                                  base_url=server.url + urlsplit(CPCB_RESOURCE_URL).path)
+        satellite = SatelliteAODDownloader(work_dir / "satellite", use_cache=False,
+                                           base_url=server.url + urlsplit(AIR_QUALITY_URL).path)
+        sources = {
+            'cpcb': (cpcb, lambda pool, output: cpcb.fetch_feed(pool, path=output)),
+            'satellite': (satellite, lambda pool, output: satellite.fetch_hourly(pool, START_DATE, END_DATE, output))
+        }
+        for mode, pool_options in modes.items():
+            for name, (downloader, fetch) in sources.items():
+                result = await run_source(name, downloader, fetch, pool_options,
+                                          work_dir / f"{name}_{mode}.parquet")
+                results.append({'mode': mode, **result})
+        if server.stats['missing']:
+            print(f"⚠️ {server.stats['missing']} request(s) had no recording")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collector ingest throughput offline")
+    parser.add_argument("--recordings", help="Existing recordings directory (default: seed from the demo files)")
+    parser.add_argument("--latency", type=float, default=30.0, help="Emulated response latency (ms)")
+    parser.add_argument("--connect-latency", type=float, default=90.0, help="Emulated connection setup (ms)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Pooled requests in flight per host")
+    parser.add_argument("--station-copies", type=int, default=50, help="Demo station replicas in the CPCB feed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        recordings_dir = args.recordings
+        if recordings_dir is None:
+            recordings_dir = work_dir / "recordings"
+            for source, (requests, size) in record_demo_responses(
+                    recordings_dir, START_DATE, END_DATE, station_copies=args.station_copies).items():
+                print(f"📼 {source}: {requests} recorded responses, {size / 1024 / 1024:.1f} MB")
+
+        print(f"⏱️ Latency {args.latency:.0f} ms/response, {args.connect_latency:.0f} ms/connection")
+        results = asyncio.run(benchmark(args, recordings_dir, work_dir))
+
+    print(f"\n{'Source':<10} {'Mode':<8} {'Seconds':>8} {'Requests':>9} {'Conns':>6} {'Rows/s':>11} {'MB/s':>7}")
+    for r in results:
+        print(f"{r['source']:<10} {r['mode']:<8} {r['seconds']:>8.2f} {r['requests']:>9} {r['connections']:>6} "
+              f"{r['rows'] / r['seconds']:>11,.0f} {r['megabytes'] / r['seconds']:>7.1f}")
+
+    by_key = {(r['source'], r['mode']): r for r in results}
+    for source in ('cpcb', 'satellite'):
+        serial, pooled = by_key[(source, 'serial')], by_key[(source, 'pooled')]
+        if serial['rows'] != pooled['rows']:
+            print(f"❌ {source}: serial and pooled runs decoded different row counts")
+        print(f"🚀 {source}: {serial['seconds'] / pooled['seconds']:.1f}x faster pooled "
+              f"({pooled['rows']:,} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Collector Logging for VayuDrishti
+One logger per source, written to the source's data directory and to the console
+"""
+
+import logging
+from pathlib import Path
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def get_logger(name, log_file):
+    """Logger ``vayudrishti.<name>`` appending to ``log_file`` (handlers are added once)"""
+    logger = logging.getLogger(f"vayudrishti.{name}")
+    log_file = str(Path(log_file).resolve())
+    if not any(getattr(handler, 'baseFilename', None) == log_file for handler in logger.handlers):
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(file_handler)
+    if not any(type(handler) is logging.StreamHandler for handler in logger.handlers):
+        logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+    return logger
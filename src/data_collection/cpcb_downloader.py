@@ -0,0 +1,192 @@
+"""
+CPCB Station Data Downloader for VayuDrishti
+Paged data.gov.in real-time air quality feed, fetched concurrently and streamed to Parquet
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from .collector_log import get_logger
+from .http_pool import AsyncHTTPPool, HTTPError, gather_or_cancel, run_sync
+from .raw_cache import RawCache
+from .typed_storage import CSVStreamDecoder, ParquetSink
+
+DEFAULT_CPCB_DIR = Path(__file__).parent.parent.parent / "data" / "cpcb"
+
+# data.gov.in "Real time Air Quality Index from various locations" (CPCB)
+CPCB_RESOURCE_URL = "https://api.data.gov.in/resource/89d74e94-7999-415a-9c3d-8cc094b5f66b"
+API_KEY_ENV = "DATA_GOV_IN_API_KEY"
+PAGE_SIZE = 1000
+
+# One record per (station, pollutant) as served by the feed
+FEED_SCHEMA = pa.schema([
+    ('country', pa.string()),
+    ('state', pa.string()),
+    ('city', pa.string()),
+    ('station', pa.string()),
+    ('last_update', pa.timestamp('s')),
+    ('latitude', pa.float64()),
+    ('longitude', pa.float64()),
+    ('pollutant_id', pa.string()),
+    ('min_value', pa.float32()),
+    ('max_value', pa.float32()),
+    ('avg_value', pa.float32())
+])
+FEED_TIMESTAMP_FORMATS = ['%d-%m-%Y %H:%M:%S', pa_csv.ISO8601]
+
+# Feed pollutant ids -> station file columns
+POLLUTANT_IDS = {
+    'PM2.5': 'pm2_5',
+    'PM10': 'pm10',
+    'NO2': 'no2',
+    'SO2': 'so2',
+    'OZONE': 'o3',
+    'CO': 'co',
+    'NH3': 'nh3'
+}
+STATION_COLUMNS = ['station', 'state', 'city', 'latitude', 'longitude']
+
+
+def decode_feed_csv(body):
+    """One feed CSV page (bytes) as a typed table"""
+    decoder = CSVStreamDecoder(FEED_SCHEMA, timestamp_parsers=FEED_TIMESTAMP_FORMATS)
+    return pa.Table.from_batches(decoder.feed(body) + decoder.close(), schema=FEED_SCHEMA)
+
+
+def feed_to_station_frame(table):
+    """Long feed records -> one row per (station, reading time) in the data/cpcb CSV layout"""
+    df = table.to_pandas()
+    df['pollutant'] = df['pollutant_id'].map(POLLUTANT_IDS)
+    df = df.dropna(subset=['pollutant', 'last_update'])
+    wide = (df.groupby(['last_update'] + STATION_COLUMNS + ['pollutant'], dropna=False, observed=True)['avg_value']
+            .last().unstack('pollutant').reset_index())
+    wide.columns.name = None
+    wide = wide.rename(columns={
+        'last_update': 'datetime',
+        'station': 'station_name',
+        'latitude': 'station_latitude',
+        'longitude': 'station_longitude'
+    })
+    pollutants = [name for name in POLLUTANT_IDS.values() if name in wide.columns]
+    wide['has_ground_truth'] = wide['pm2_5'].notna() if 'pm2_5' in wide.columns else False
+    columns = ['datetime', 'station_name', 'state', 'city', 'station_latitude', 'station_longitude']
+    return wide[columns + pollutants + ['has_ground_truth']].sort_values(['station_name', 'datetime'])
+
+
+class CPCBDataDownloader:
+    """Collects the CPCB feed into ``<data_dir>/raw`` (typed Parquet) and station CSVs
+
+    The feed only exposes each station's latest reading, so history is built
+    from the snapshots of successive collection runs.
+    """
+
+    def __init__(self, data_dir=DEFAULT_CPCB_DIR, api_key=None, base_url=CPCB_RESOURCE_URL,
+                 limit_per_host=8, page_size=PAGE_SIZE, record_dir=None, use_cache=True, raw_cache=None):
+        self.data_dir = Path(data_dir)
+        self.raw_dir = self.data_dir / "raw"
+        self.api_key = api_key or os.environ.get(API_KEY_ENV)
+        self.base_url = base_url
+        self.limit_per_host = limit_per_host
+        self.page_size = page_size
+        self.record_dir = record_dir
+        self.raw_cache = raw_cache or (RawCache() if use_cache else None)
+        self.logger = get_logger('cpcb', self.data_dir / "cpcb_download.log")
+
+    def make_pool(self, **overrides):
+        options = {'limit_per_host': self.limit_per_host, 'record_dir': self.record_dir, **overrides}
+        return AsyncHTTPPool(**options)
+
+    def _params(self, **params):
+        if not self.api_key:
+            raise ValueError(f"No data.gov.in API key; set {API_KEY_ENV} or pass api_key")
+        return {'api-key': self.api_key, **params}
+
+    async def fetch_feed(self, pool, filters=None, path=None):
+        """Fetch every page of the feed into one Parquet file; returns (path, rows)"""
+        filter_params = {f"filters[{name}]": value for name, value in (filters or {}).items()}
+        probe = await pool.fetch(self.base_url, lambda response: response.json(),
+                                 params=self._params(format='json', offset=0, limit=1, **filter_params))
+        total = int(probe.get('total', 0))
+        path = Path(path or self.raw_dir / f"cpcb_feed_{datetime.now():%Y%m%d_%H%M%S}.parquet")
+
+        with ParquetSink(path, FEED_SCHEMA) as sink:
+            async def consume(response):
+                # Batches decode while the body streams; the page reaches the
+                # sink only once complete, so a retried page adds no duplicates
+                decoder = CSVStreamDecoder(FEED_SCHEMA, timestamp_parsers=FEED_TIMESTAMP_FORMATS)
+                batches = []
+                async for data in response.iter_chunks():
+                    batches += decoder.feed(data)
+                return batches + decoder.close()
+
+            async def fetch_page(offset):
+                params = self._params(format='csv', offset=offset, limit=self.page_size, **filter_params)
+                if self.raw_cache is None:
+                    for batch in await pool.fetch(self.base_url, consume, params=params):
+                        sink.write(batch)
+                    return
+                # Unchanged pages are revalidated (304) and their decoded table reused
+                window = await self.raw_cache.fetch_window(pool, 'cpcb', self.base_url, params)
+                sink.write(self.raw_cache.decode(window, 'feed', decode_feed_csv))
+
+            await gather_or_cancel(*[fetch_page(offset) for offset in range(0, total, self.page_size)])
+        return path, sink.rows
+
+    async def collect(self, filters=None):
+        async with self.make_pool() as pool:
+            path, rows = await self.fetch_feed(pool, filters)
+            self.logger.info(f"Fetched {rows:,} feed records in {pool.stats['requests']} requests "
+                             f"over {pool.stats['connections']} connection(s) -> {path.name}")
+            return path, rows
+
+    def _snapshot(self):
+        try:
+            path, _ = run_sync(self.collect())
+            return pq.read_table(path)
+        except (HTTPError, OSError, ValueError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Error fetching stations: {e}")
+            return None
+
+    def get_all_stations(self):
+        """Every station in the current feed (station, state, city, latitude, longitude)"""
+        self.logger.info("Fetching all CPCB stations across India...")
+        table = self._snapshot()
+        if table is None or table.num_rows == 0:
+            self.logger.error("No stations found")
+            return pd.DataFrame(columns=STATION_COLUMNS)
+        stations = table.select(STATION_COLUMNS).to_pandas().drop_duplicates('station')
+        self.logger.info(f"Found {len(stations)} stations")
+        return stations.reset_index(drop=True)
+
+    def load_history(self, days_back=30):
+        """Station readings of the last ``days_back`` days from every stored feed snapshot"""
+        since = pd.Timestamp(datetime.now() - timedelta(days=days_back))
+        paths = sorted(self.raw_dir.glob("cpcb_feed_*.parquet"))
+        if not paths:
+            return pd.DataFrame()
+        table = pa.concat_tables([pq.read_table(path) for path in paths])
+        history = feed_to_station_frame(table)
+        return history[history['datetime'] >= since].drop_duplicates(['station_name', 'datetime'], keep='last')
+
+    def download_all_stations_data(self, days_back=30):
+        """Collect a fresh feed snapshot and return (and save) the stored readings of the last ``days_back`` days"""
+        self.logger.info(f"Starting download for all CPCB stations (last {days_back} days)")
+        self._snapshot()
+        history = self.load_history(days_back)
+        if history.empty:
+            self.logger.error("No CPCB data collected")
+            return history
+
+        start, end = history['datetime'].min(), history['datetime'].max()
+        output = self.data_dir / f"cpcb_data_{start:%Y%m%d}_to_{end:%Y%m%d}.csv"
+        history.to_csv(output, index=False)
+        self.logger.info(f"Saved {len(history):,} readings from {history['station_name'].nunique()} "
+                         f"stations to {output.name}")
+        return history
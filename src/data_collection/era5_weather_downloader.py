@@ -0,0 +1,110 @@
+"""
+ERA5 Weather Downloader for VayuDrishti
+Hourly ERA5 single-level meteorology over the India grid, processed to the model's inputs
+"""
+
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .collector_log import get_logger
+from .http_pool import AsyncHTTPPool, HTTPError, run_sync
+from .open_meteo import fetch_grid_series, grid_points, series_schema
+from .raw_cache import RawCache
+from .typed_storage import ParquetSink
+
+DEFAULT_REANALYSIS_DIR = Path(__file__).parent.parent.parent / "data" / "reanalysis"
+
+# ERA5 reanalysis archive, served without an API key
+ERA5_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/era5"
+SURFACE_VARIABLES = {
+    'temperature_2m': 't2m_celsius',
+    'relative_humidity_2m': 'r2m',
+    'wind_speed_10m': 'wind_speed_10m',
+    'wind_direction_10m': 'wind_direction_10m',
+    'boundary_layer_height': 'blh',
+    'surface_pressure': 'sp_hpa'
+}
+WEATHER_RESOLUTION = 0.5
+
+
+class ERA5WeatherDownloader:
+    """Collects ERA5 surface fields into ``<data_dir>/raw`` (typed Parquet)"""
+
+    def __init__(self, data_dir=DEFAULT_REANALYSIS_DIR, base_url=ERA5_ARCHIVE_URL, resolution=WEATHER_RESOLUTION,
+                 limit_per_host=8, record_dir=None, use_cache=True, raw_cache=None):
+        self.data_dir = Path(data_dir)
+        self.raw_dir = self.data_dir / "raw"
+        self.base_url = base_url
+        self.resolution = resolution
+        self.limit_per_host = limit_per_host
+        self.record_dir = record_dir
+        self.raw_cache = raw_cache or (RawCache() if use_cache else None)
+        self.logger = get_logger('era5', self.data_dir / "era5_download.log")
+
+    def make_pool(self, **overrides):
+        options = {'limit_per_host': self.limit_per_host, 'record_dir': self.record_dir, **overrides}
+        return AsyncHTTPPool(**options)
+
+    def raw_path(self, start_date, end_date):
+        return self.raw_dir / f"era5_surface_{start_date.replace('-', '')}_to_{end_date.replace('-', '')}.parquet"
+
+    def query_params(self, start_date, end_date):
+        return {'start_date': start_date, 'end_date': end_date, 'timezone': 'GMT', 'wind_speed_unit': 'ms'}
+
+    async def fetch_surface(self, pool, start_date, end_date, path=None):
+        """Hourly surface fields of every grid node into one Parquet file; returns (path, rows)"""
+        latitude, longitude = grid_points(self.resolution)
+        path = Path(path or self.raw_path(start_date, end_date))
+        with ParquetSink(path, series_schema(SURFACE_VARIABLES)) as sink:
+            await fetch_grid_series(pool, self.base_url, latitude, longitude,
+                                    self.query_params(start_date, end_date), SURFACE_VARIABLES, sink,
+                                    raw_cache=self.raw_cache, source='weather')
+        return path, sink.rows
+
+    async def collect(self, start_date, end_date):
+        async with self.make_pool() as pool:
+            path, rows = await self.fetch_surface(pool, start_date, end_date)
+            self.logger.info(f"Fetched {rows:,} hourly surface records in {pool.stats['requests']} requests "
+                             f"over {pool.stats['connections']} connection(s) -> {path.name}")
+            return path, rows
+
+    def download_surface_data(self, start_date, end_date):
+        """Path of the hourly surface Parquet file between two 'YYYY-MM-DD' dates, or None on failure"""
+        self.logger.info(f"Downloading ERA5 surface data from {start_date} to {end_date}")
+        try:
+            path, _ = run_sync(self.collect(start_date, end_date))
+            return str(path)
+        except (HTTPError, OSError, ValueError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Error fetching ERA5 surface data: {e}")
+            return None
+
+    def download_pressure_level_data(self, start_date, end_date):
+        """ERA5 pressure levels are only served by the Copernicus CDS API, which is not a dependency"""
+        self.logger.warning("Pressure level data needs the Copernicus CDS API (cdsapi); skipping")
+        return None
+
+    def process_for_ml(self, surface_file, pressure_file=None):
+        """Surface (and optional pressure level) files -> the meteorological columns used for training"""
+        if not surface_file or not Path(surface_file).exists():
+            self.logger.error("No surface data to process")
+            return pd.DataFrame()
+
+        df = pq.read_table(surface_file).to_pandas()
+        direction = np.deg2rad(df.pop('wind_direction_10m'))
+        # Meteorological direction is where the wind blows from
+        df['u10'] = -df['wind_speed_10m'] * np.sin(direction)
+        df['v10'] = -df['wind_speed_10m'] * np.cos(direction)
+        df['t2m'] = df['t2m_celsius'] + 273.15
+        df['sp'] = df.pop('sp_hpa') * 100.0
+        df['hour'] = df['datetime'].dt.hour
+        df['month'] = df['datetime'].dt.month
+
+        if pressure_file and Path(pressure_file).exists():
+            pressure = pq.read_table(pressure_file).to_pandas()
+            df = df.merge(pressure, on=['datetime', 'latitude', 'longitude'], how='left')
+        self.logger.info(f"Processed {len(df):,} weather records")
+        return df
@@ -0,0 +1,384 @@
+"""
+Async HTTP Connection Pool for VayuDrishti
+Keep-alive HTTP/1.1 over asyncio streams with per-host concurrency limits, retries and streamed bodies
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import ssl
+import time
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit
+from urllib.request import getproxies
+
+# Statuses worth retrying (throttling and transient upstream failures)
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+# Redirects followed (up to MAX_REDIRECTS per request); any other status outside 2xx/304 is an HTTPError
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+# Resets of reused keep-alive connections retried without counting as an attempt
+MAX_STALE_RESETS = 2
+# Query parameters that never reach logs, errors or recording keys
+SECRET_PARAMS = {'api-key', 'api_key', 'apikey', 'token'}
+USER_AGENT = "VayuDrishti-Collector/1.0"
+# Content-Encodings the pool asks for and decodes (zlib detects gzip vs zlib-wrapped deflate)
+CONTENT_ENCODINGS = {'gzip', 'x-gzip', 'deflate'}
+
+logger = logging.getLogger("vayudrishti.http_pool")
+
+
+class HTTPError(Exception):
+    """Non-retryable (or retries exhausted) HTTP error status"""
+
+    def __init__(self, status, url, reason=""):
+        super().__init__(f"{status} {reason} for url: {url}".replace("  ", " "))
+        self.status = status
+        self.url = url
+
+
+def redact(url):
+    """URL with secret query parameters masked"""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [(name, '***' if name.lower() in SECRET_PARAMS else value) for name, value in parse_qsl(parts.query)]
+    return parts._replace(query=urlencode(query, safe='*,:')).geturl()
+
+
+def request_key(method, target):
+    """Host-independent key of a request (method, path and non-secret query) for recordings"""
+    parts = urlsplit(target)
+    query = sorted((name, value) for name, value in parse_qsl(parts.query) if name.lower() not in SECRET_PARAMS)
+    return hashlib.sha1(f"{method} {parts.path}?{urlencode(query)}".encode()).hexdigest()
+
+
+class Response:
+    """Status, headers and a body that is streamed off the connection on demand"""
+
+    def __init__(self, status, reason, headers, reader, url, timeout, stats, recorder=None, method='GET'):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.url = url
+        self._reader = reader
+        self._timeout = timeout
+        self._stats = stats
+        self._recorder = recorder
+        self.chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+        length = headers.get('content-length')
+        self._remaining = int(length) if length is not None and not self.chunked else None
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            self._remaining = 0  # These never carry a body, whatever Content-Length says
+        self.keep_alive = (headers.get('connection', '').lower() != 'close' and
+                           (self.chunked or self._remaining is not None))
+        self.complete = False
+        self.encoding = headers.get('content-encoding', 'identity').strip().lower()
+
+    def _decoder(self):
+        """Streaming decompressor for the body's Content-Encoding (None for identity)"""
+        if self.encoding in ('', 'identity'):
+            return None
+        if self.encoding in CONTENT_ENCODINGS:
+            return zlib.decompressobj(32 + zlib.MAX_WBITS)
+        raise ValueError(f"Unsupported Content-Encoding '{self.encoding}' for url: {redact(self.url)}")
+
+    async def _read(self, coro):
+        return await asyncio.wait_for(coro, self._timeout)
+
+    async def _body_chunks(self, chunk_size):
+        if self.chunked:
+            while True:
+                size = int((await self._read(self._reader.readline())).split(b';')[0], 16)
+                if size == 0:
+                    while (await self._read(self._reader.readline())) not in (b'\r\n', b''):
+                        pass  # Trailers
+                    return
+                data = await self._read(self._reader.readexactly(size))
+                await self._read(self._reader.readexactly(2))
+                yield data
+        elif self._remaining is not None:
+            while self._remaining > 0:
+                data = await self._read(self._reader.read(min(chunk_size, self._remaining)))
+                if not data:
+                    raise asyncio.IncompleteReadError(b'', self._remaining)
+                self._remaining -= len(data)
+                yield data
+        else:
+            while data := await self._read(self._reader.read(chunk_size)):
+                yield data
+
+    async def iter_chunks(self, chunk_size=65536):
+        """Yield the (decoded) body as it arrives, never holding more than one chunk"""
+        if self.complete:
+            return
+        decoder = self._decoder()
+        async for data in self._body_chunks(chunk_size):
+            self._stats['bytes'] += len(data)  # Bytes on the wire
+            if decoder is not None:
+                data = decoder.decompress(data)
+            if data:
+                if self._recorder is not None:
+                    self._recorder.write(data)
+                yield data
+        if decoder is not None and (data := decoder.flush()):
+            if self._recorder is not None:
+                self._recorder.write(data)
+            yield data
+        self.complete = True
+        if self._recorder is not None:
+            self._recorder.finish(self)
+
+    async def read(self):
+        return b''.join([data async for data in self.iter_chunks()])
+
+    async def json(self):
+        return json.loads(await self.read())
+
+
+class _Recorder:
+    """Tees a response body into ``<key>.body`` + ``<key>.json`` for the mock server to replay"""
+
+    def __init__(self, record_dir, key):
+        self.path = Path(record_dir) / key
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(f"{self.path}.body.tmp", 'wb')
+        self.finished = False
+
+    def write(self, data):
+        self._file.write(data)
+
+    def finish(self, response):
+        self._file.close()
+        os.replace(f"{self.path}.body.tmp", f"{self.path}.body")
+        meta = {
+            'status': response.status,
+            'reason': response.reason,
+            # The body is stored decoded, so its transfer and content encodings are dropped
+            'headers': {name: value for name, value in response.headers.items()
+                        if name not in ('content-length', 'transfer-encoding', 'content-encoding', 'connection')},
+            'url': redact(response.url),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        with open(f"{self.path}.json.tmp", 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(f"{self.path}.json.tmp", f"{self.path}.json")
+        self.finished = True
+
+    def abort(self):
+        self._file.close()
+        Path(f"{self.path}.body.tmp").unlink(missing_ok=True)
+
+
+class AsyncHTTPPool:
+    """Pooled keep-alive connections with at most ``limit_per_host`` requests in flight per host
+
+    ``fetch`` retries connection failures and RETRY_STATUSES with exponential
+    backoff (honouring Retry-After), follows redirects and raises HTTPError
+    for any other status outside 2xx/304. The ``consume`` coroutine streams
+    the body, so a retry replays the whole request and its decoding.
+
+    Scope, deliberately small since every collector talks to a few JSON
+    APIs: HTTP/1.1 only; gzip/deflate bodies are decoded and any other
+    Content-Encoding raises ValueError; HEAD, 204, 304 and 1xx responses
+    have no body; interim 1xx responses are skipped. Proxies are not
+    supported: connections always go directly to the host, and a configured
+    HTTP(S)_PROXY only logs a warning.
+    """
+
+    def __init__(self, limit_per_host=8, retries=4, backoff=0.5, max_backoff=30.0, timeout=60.0,
+                 keep_alive=True, headers=None, record_dir=None):
+        self.limit_per_host = limit_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.headers = dict(headers or {})
+        self.record_dir = record_dir
+        self._idle = defaultdict(list)
+        self._semaphores = {}
+        self.stats = {'requests': 0, 'retries': 0, 'connections': 0, 'reused': 0, 'bytes': 0}
+        proxies = {scheme: url for scheme, url in getproxies().items() if scheme in ('http', 'https')}
+        if proxies:
+            logger.warning(f"Proxy settings are ignored; connecting directly ({', '.join(sorted(proxies))} proxy set)")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+    def _semaphore(self, host_key):
+        if host_key not in self._semaphores:
+            self._semaphores[host_key] = asyncio.Semaphore(self.limit_per_host)
+        return self._semaphores[host_key]
+
+    async def _connect(self, host_key):
+        scheme, host, port = host_key
+        context = ssl.create_default_context() if scheme == 'https' else None
+        connection = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=context), self.timeout)
+        self.stats['connections'] += 1
+        return connection
+
+    def _take_idle(self, host_key):
+        idle = self._idle[host_key]
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.stats['reused'] += 1
+                return reader, writer
+            writer.close()
+        return None
+
+    def _drop_idle(self, host_key):
+        for _, writer in self._idle.pop(host_key, []):
+            writer.close()
+
+    def _release(self, host_key, connection, reusable):
+        if reusable and self.keep_alive:
+            self._idle[host_key].append(connection)
+        else:
+            connection[1].close()
+
+    async def _send(self, connection, method, host, target, headers):
+        reader, writer = connection
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+                 "Accept-Encoding: gzip, deflate", f"Connection: {'keep-alive' if self.keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in {**self.headers, **(headers or {})}.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+
+        while True:
+            status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if not status_line:
+                raise ConnectionResetError("Connection closed before the response")
+            _, status, *reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+            response_headers = {}
+            while (line := await asyncio.wait_for(reader.readline(), self.timeout)) not in (b'\r\n', b'\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                response_headers[name.strip().lower()] = value.strip()
+            # Interim responses (100 Continue, 103 Early Hints) precede the real one
+            if not 100 <= int(status) < 200 or int(status) == 101:
+                return int(status), (reason[0] if reason else ''), response_headers
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        # Full jitter keeps retrying workers from synchronizing on the upstream
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def fetch(self, url, consume, params=None, headers=None, method='GET', _redirects=0):
+        """Run ``consume(response)`` on a successful response and return its result"""
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params, safe=',:')}"
+        parts = urlsplit(url)
+        host_key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        host = parts.netloc
+        target = f"{parts.path or '/'}{'?' + parts.query if parts.query else ''}"
+
+        attempt = stale_resets = 0
+        location = None
+        while True:
+            delay = None
+            async with self._semaphore(host_key):
+                connection = self._take_idle(host_key)
+                fresh = connection is None
+                reusable = False
+                recorder = None
+                try:
+                    if fresh:
+                        connection = await self._connect(host_key)
+                    self.stats['requests'] += 1
+                    status, reason, response_headers = await self._send(connection, method, host, target, headers)
+                    if self.record_dir is not None and 200 <= status < 300:
+                        recorder = _Recorder(self.record_dir, request_key(method, target))
+                    response = Response(status, reason, response_headers, connection[0], url,
+                                        self.timeout, self.stats, recorder, method)
+                    if status in REDIRECT_STATUSES and 'location' in response_headers:
+                        await response.read()
+                        reusable = response.keep_alive
+                        if _redirects >= MAX_REDIRECTS:
+                            raise HTTPError(status, redact(url), f"after {MAX_REDIRECTS} redirects")
+                        location = urljoin(url, response_headers['location'])
+                    elif status >= 400:
+                        await response.read()
+                        reusable = response.keep_alive
+                        if status not in RETRY_STATUSES or attempt >= self.retries:
+                            raise HTTPError(status, redact(url), reason)
+                        delay = self._delay(attempt, response_headers.get('retry-after'))
+                    elif not (200 <= status < 300 or status == 304):
+                        # Not a body ``consume`` can decode (e.g. a redirect without a Location)
+                        await response.read()
+                        reusable = response.keep_alive
+                        raise HTTPError(status, redact(url), reason)
+                    else:
+                        result = await consume(response)
+                        if not response.complete:
+                            async for _ in response.iter_chunks():
+                                pass
+                        reusable = response.keep_alive
+                        return result
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                    if not fresh and isinstance(e, ConnectionResetError) and stale_resets < MAX_STALE_RESETS:
+                        # The server dropped idle keep-alive connections; the others idle as long are suspect too
+                        stale_resets += 1
+                        self._drop_idle(host_key)
+                        continue
+                    if attempt >= self.retries:
+                        raise
+                    delay = self._delay(attempt)
+                finally:
+                    if recorder is not None and not recorder.finished:
+                        recorder.abort()
+                    if connection is not None:
+                        self._release(host_key, connection, reusable)
+            if location is not None:
+                # A 303 is answered with a GET, whatever the original method
+                return await self.fetch(location, consume, headers=headers,
+                                        method='GET' if status == 303 else method, _redirects=_redirects + 1)
+            attempt += 1
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+
+
+async def gather_or_cancel(*coros):
+    """asyncio.gather that cancels (and awaits) the remaining coroutines when one fails
+
+    Keeps a failed shard or page from leaving requests in flight that would
+    still write into its (already aborted) output.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def run_sync(coro):
+    """Run a coroutine from synchronous code, including inside Jupyter's running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    import concurrent.futures
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
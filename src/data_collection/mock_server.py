@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in API for VayuDrishti Collectors
+Replays recorded responses over keep-alive HTTP/1.1 with emulated network latency
+
+Usage:
+    python -m data_collection.mock_server [--recordings ../data/cache/recordings] [--port 8765] [--seed-demo]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .cpcb_downloader import CPCB_RESOURCE_URL, DEFAULT_CPCB_DIR, FEED_SCHEMA
+from .http_pool import request_key
+from .open_meteo import grid_points, grid_requests
+from .satellite_aod_downloader import AIR_QUALITY_URL, AOD_VARIABLES, DEFAULT_SATELLITE_DIR
+
+DEFAULT_RECORDINGS_DIR = Path(__file__).parent.parent.parent / "data" / "cache" / "recordings"
+
+
+class MockAPIServer:
+    """Serves ``<key>.body`` with the status/headers in ``<key>.json`` for each recorded request
+
+    ``latency`` is added to every response and ``connect_latency`` to every
+    new connection (the TCP/TLS handshake), so pooling and concurrency show
+    the same effects as against the real hosts.
+    """
+
+    def __init__(self, recordings_dir=DEFAULT_RECORDINGS_DIR, host='127.0.0.1', port=0,
+                 latency=0.0, connect_latency=0.0, chunk_size=16384):
+        self.recordings_dir = Path(recordings_dir)
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.chunk_size = chunk_size
+        self.stats = {'connections': 0, 'requests': 0, 'missing': 0, 'not_modified': 0}
+        self._server = None
+        self._connections = set()
+        self._handlers = set()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        # Idle keep-alive connections would otherwise keep their handlers waiting
+        for reader, _ in list(self._connections):
+            reader.feed_eof()
+        # Let responses still being delayed or written finish against closed clients
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def _recording(self, method, target):
+        path = self.recordings_dir / request_key(method, target)
+        meta_path = Path(f"{path}.json")
+        if not meta_path.exists():
+            return None, None
+        with open(meta_path) as f:
+            return json.load(f), Path(f"{path}.body")
+
+    def _conditional(self, meta, body, body_path, request_headers):
+        """Add ETag/Last-Modified validators and answer matching conditional requests with 304"""
+        validators = {
+            'etag': meta.get('headers', {}).get('etag') or f'"{hashlib.sha1(body).hexdigest()[:20]}"',
+            'last-modified': meta.get('headers', {}).get('last-modified') or
+            formatdate(body_path.stat().st_mtime, usegmt=True)
+        }
+        meta = {**meta, 'headers': {**meta.get('headers', {}), **validators}}
+        if_none_match = request_headers.get('if-none-match')
+        if_modified_since = request_headers.get('if-modified-since')
+        if if_none_match is not None:
+            unchanged = validators['etag'] in [tag.strip() for tag in if_none_match.split(',')]
+        elif if_modified_since is not None:
+            try:
+                modified = parsedate_to_datetime(validators['last-modified'])
+                unchanged = modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                unchanged = False
+        else:
+            unchanged = False
+        if unchanged:
+            self.stats['not_modified'] += 1
+            return {**meta, 'status': 304, 'reason': 'Not Modified'}
+        return meta
+
+    async def _handle(self, reader, writer):
+        self.stats['connections'] += 1
+        self._connections.add((reader, writer))
+        self._handlers.add(asyncio.current_task())
+        await asyncio.sleep(self.connect_latency)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                self.stats['requests'] += 1
+                await asyncio.sleep(self.latency)
+                meta, body_path = self._recording(method, target)
+                if meta is None:
+                    self.stats['missing'] += 1
+                    meta, body = {'status': 404, 'reason': 'Not Found', 'headers': {}}, b'{"error": "not recorded"}'
+                else:
+                    body = body_path.read_bytes()
+                    meta = self._conditional(meta, body, body_path, headers)
+                    if meta['status'] == 304:
+                        body = b''
+
+                lines = [f"HTTP/1.1 {meta['status']} {meta.get('reason', '')}".rstrip()]
+                lines += [f"{name}: {value}" for name, value in meta.get('headers', {}).items()]
+                framing = "Transfer-Encoding: chunked" if meta['status'] != 304 else "Content-Length: 0"
+                lines += [framing, f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+                # Chunked replay exercises the client's incremental decoding
+                for start in range(0, len(body), self.chunk_size):
+                    chunk = body[start:start + self.chunk_size]
+                    writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                    await writer.drain()
+                if meta['status'] != 304:
+                    writer.write(b"0\r\n\r\n")
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.discard((reader, writer))
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+
+def _write_recording(recordings_dir, url, params, body, content_type):
+    parts = urlsplit(url)
+    key = request_key('GET', f"{parts.path}?{urlencode(params)}")
+    (recordings_dir / f"{key}.body").write_bytes(body)
+    meta = {'status': 200, 'reason': 'OK', 'headers': {'content-type': content_type}, 'url': parts.path}
+    with open(recordings_dir / f"{key}.json", 'w') as f:
+        json.dump(meta, f)
+
+
+def record_demo_responses(recordings_dir=DEFAULT_RECORDINGS_DIR, start_date='2025-07-18', end_date='2025-07-21',
+                          station_copies=50, page_size=1000, aod_resolution=0.5):
+    """Recordings of the CPCB feed and the AOD API built from the demo files in data/
+
+    The demo station readings are repeated ``station_copies`` times as
+    distinct stations so the paged feed has a realistic volume; AOD series
+    repeat each grid node's demo value for every hour of the range.
+    Returns {source: (requests, bytes)}.
+    """
+    recordings_dir = Path(recordings_dir)
+    recordings_dir.mkdir(parents=True, exist_ok=True)
+    summary = {}
+
+    # CPCB feed: one record per (station, pollutant, reading)
+    stations = pd.concat([pd.read_csv(path) for path in sorted(DEFAULT_CPCB_DIR.glob("*.csv"))], ignore_index=True)
+    stations['datetime'] = pd.to_datetime(stations['datetime']).dt.floor('h')
+    copies = []
+    for copy in range(station_copies):
+        shifted = stations.copy()
+        shifted['station_name'] = shifted['station_name'] + (f" #{copy}" if copy else "")
+        shifted['station_latitude'] += 0.01 * copy
+        copies.append(shifted)
+    stations = pd.concat(copies, ignore_index=True)
+    feed = stations.melt(
+        id_vars=['datetime', 'station_name', 'state', 'city', 'station_latitude', 'station_longitude'],
+        value_vars=['pm2_5', 'pm10', 'no2', 'so2'], var_name='pollutant_id', value_name='avg_value'
+    )
+    feed = pd.DataFrame({
+        'country': 'India',
+        'state': feed['state'],
+        'city': feed['city'],
+        'station': feed['station_name'],
+        'last_update': feed['datetime'].dt.strftime('%d-%m-%Y %H:%M:%S'),
+        'latitude': feed['station_latitude'].round(6),
+        'longitude': feed['station_longitude'],
+        'pollutant_id': feed['pollutant_id'].map({'pm2_5': 'PM2.5', 'pm10': 'PM10', 'no2': 'NO2', 'so2': 'SO2'}),
+        'min_value': feed['avg_value'],
+        'max_value': feed['avg_value'],
+        'avg_value': feed['avg_value']
+    })[FEED_SCHEMA.names]
+
+    probe = {'total': len(feed), 'count': 1, 'offset': 0, 'limit': 1,
+             'records': feed.head(1).astype(str).to_dict('records')}
+    _write_recording(recordings_dir, CPCB_RESOURCE_URL, {'format': 'json', 'offset': 0, 'limit': 1},
+                     json.dumps(probe).encode(), 'application/json')
+    total_bytes = 0
+    for offset in range(0, len(feed), page_size):
+        body = feed.iloc[offset:offset + page_size].to_csv(index=False).encode()
+        _write_recording(recordings_dir, CPCB_RESOURCE_URL, {'format': 'csv', 'offset': offset, 'limit': page_size},
+                         body, 'text/csv')
+        total_bytes += len(body)
+    summary['cpcb'] = (1 + -(-len(feed) // page_size), total_bytes)
+
+    # AOD: hourly series per grid node, valued from the nearest demo node
+    aod = pd.concat([pd.read_csv(path) for path in sorted(DEFAULT_SATELLITE_DIR.glob("*.csv"))], ignore_index=True)
+    aod = aod.groupby(['latitude', 'longitude'])['aod_550'].mean()
+    times = pd.date_range(start_date, pd.Timestamp(end_date) + pd.Timedelta(hours=23), freq='h')
+    time_strings = list(times.strftime('%Y-%m-%dT%H:%M'))
+    params = {'start_date': start_date, 'end_date': end_date, 'timezone': 'GMT'}
+    latitude, longitude = grid_points(aod_resolution)
+    requests, total_bytes = 0, 0
+    for lat, lon, request_params in grid_requests(latitude, longitude, params, AOD_VARIABLES):
+        locations = []
+        for point_lat, point_lon in zip(lat, lon):
+            value = aod.get((round(point_lat * 2) / 2, round(point_lon * 2) / 2), np.nan)
+            series = [None if np.isnan(value) else round(float(value), 3)] * len(times)
+            locations.append({'latitude': point_lat, 'longitude': point_lon,
+                              'hourly': {'time': time_strings, 'aerosol_optical_depth': series}})
+        body = json.dumps(locations).encode()
+        _write_recording(recordings_dir, AIR_QUALITY_URL, request_params, body, 'application/json')
+        requests += 1
+        total_bytes += len(body)
+    summary['satellite'] = (requests, total_bytes)
+    return summary
+
+
+async def serve(args):
+    async with MockAPIServer(args.recordings, port=args.port, latency=args.latency / 1000,
+                             connect_latency=args.connect_latency / 1000) as server:
+        print(f"🛰️ Replaying {args.recordings} at {server.url} (Ctrl+C to stop)")
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded collector responses locally")
+    parser.add_argument("--recordings", default=str(DEFAULT_RECORDINGS_DIR), help="Recordings directory")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per response (ms)")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="Added latency per new connection (ms)")
+    parser.add_argument("--seed-demo", action="store_true", help="Record responses built from the demo files first")
+    args = parser.parse_args()
+
+    if args.seed_demo:
+        for source, (requests, size) in record_demo_responses(args.recordings).items():
+            print(f"📼 {source}: {requests} responses, {size / 1024 / 1024:.1f} MB")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("👋 Stopped")
+
+
+if __name__ == "__main__":
+    main()
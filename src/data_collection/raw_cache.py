@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Raw Download Cache for VayuDrishti Collectors
+Content-addressed response bodies indexed by (source, query, date window), revalidated with conditional requests
+
+Usage:
+    cd src && python -m data_collection.raw_cache [--prune]
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import pyarrow.parquet as pq
+
+from .http_pool import SECRET_PARAMS
+
+DEFAULT_RAW_CACHE_DIR = Path(__file__).parent.parent.parent / "data" / "cache" / "raw"
+# Query parameters that bound the date window of a request (inclusive)
+DATE_PARAMS = ('start_date', 'end_date')
+# Windows ending this many days ago are final; newer ones may still be revised
+# upstream (ERA5T, CAMS analyses) and are revalidated on every use
+SETTLE_DAYS = 7
+
+CachedWindow = namedtuple('CachedWindow', [
+    'source', 'query', 'start', 'end', 'sha256', 'etag', 'last_modified', 'fetched_at', 'validated_at', 'size'
+])
+
+
+def query_key(url, params):
+    """Key of a request without its secrets and date window, so windows of one query share it"""
+    query = dict(parse_qsl(urlsplit(url).query))
+    query.update({name: str(value) for name, value in params.items()})
+    kept = sorted((name, value) for name, value in query.items()
+                  if name.lower() not in SECRET_PARAMS and name not in DATE_PARAMS)
+    return hashlib.sha1(f"{urlsplit(url).path}?{urlencode(kept)}".encode()).hexdigest()
+
+
+def _days(start, end):
+    day = date.fromisoformat(start)
+    while day <= date.fromisoformat(end):
+        yield day
+        day += timedelta(days=1)
+
+
+def uncovered_ranges(start, end, windows):
+    """Contiguous (start, end) ISO date ranges inside [start, end] that no window covers"""
+    covered = {day for window in windows for day in _days(window.start, window.end)}
+    gaps, gap_start, previous = [], None, None
+    for day in _days(start, end):
+        if day in covered:
+            if gap_start is not None:
+                gaps.append((gap_start.isoformat(), previous.isoformat()))
+                gap_start = None
+        elif gap_start is None:
+            gap_start = day
+        previous = day
+    if gap_start is not None:
+        gaps.append((gap_start.isoformat(), previous.isoformat()))
+    return gaps
+
+
+class RawCache:
+    """Response bodies stored once per SHA-256 under ``blobs/``, indexed by (source, query, window)
+
+    A date-ranged request only fetches the days no cached window of the same
+    query covers. Cached windows that may still change upstream are
+    revalidated with If-None-Match / If-Modified-Since, so an unchanged body
+    is neither transferred again nor, through the ``decoded/`` memo keyed by
+    its hash, parsed again.
+    """
+
+    def __init__(self, root=DEFAULT_RAW_CACHE_DIR, settle_days=SETTLE_DAYS):
+        self.root = Path(root)
+        self.settle_days = settle_days
+        self.blob_dir = self.root / "blobs"
+        self.decoded_dir = self.root / "decoded"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.decoded_dir.mkdir(parents=True, exist_ok=True)
+        self.stats = {'fetched': 0, 'not_modified': 0, 'reused': 0, 'bytes': 0,
+                      'duplicate_blobs': 0, 'decoded': 0, 'decode_hits': 0}
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS windows (
+                    source TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    window_start TEXT NOT NULL,
+                    window_end TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    validated_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    PRIMARY KEY (source, query, window_start, window_end)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(str(self.root / "index.sqlite"), timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def blob_path(self, sha256):
+        return self.blob_dir / sha256[:2] / sha256
+
+    def windows(self, source, query):
+        """Cached windows of a query, newest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM windows WHERE source = ? AND query = ? ORDER BY fetched_at DESC", (source, query)
+            ).fetchall()
+        return [CachedWindow(*row) for row in rows]
+
+    def is_settled(self, window):
+        return date.fromisoformat(window.end) <= date.today() - timedelta(days=self.settle_days)
+
+    def _store(self, source, query, start, end, sha256, etag, last_modified, size, validated_only=False):
+        now = time.time()
+        match = "source = ? AND query = ? AND window_start = ? AND window_end = ?"
+        with self._connect() as conn:
+            if validated_only:
+                conn.execute(f"UPDATE windows SET validated_at = ? WHERE {match}", (now, source, query, start, end))
+            else:
+                conn.execute("INSERT OR REPLACE INTO windows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             (source, query, start, end, sha256, etag, last_modified, now, now, size))
+            row = conn.execute(f"SELECT * FROM windows WHERE {match}", (source, query, start, end)).fetchone()
+        return CachedWindow(*row)
+
+    async def fetch_window(self, pool, source, url, params, start='', end='', cached=None):
+        """The cached window for (source, query, start, end), fetched or revalidated as needed"""
+        query = query_key(url, params)
+        if cached is None:
+            cached = next((w for w in self.windows(source, query) if (w.start, w.end) == (start, end)), None)
+        if cached is not None and not self.blob_path(cached.sha256).exists():
+            cached = None
+        if cached is not None and start and self.is_settled(cached):
+            self.stats['reused'] += 1
+            return cached
+
+        headers = {}
+        if cached is not None and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached is not None and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        async def consume(response):
+            if response.status == 304:
+                return None
+            digest, size = hashlib.sha256(), 0
+            tmp_path = self.blob_dir / f".{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'wb') as f:
+                async for data in response.iter_chunks():
+                    digest.update(data)
+                    f.write(data)
+                    size += len(data)
+            headers = response.headers
+            return digest.hexdigest(), tmp_path, size, headers.get('etag'), headers.get('last-modified')
+
+        request_params = {**params, **({'start_date': start, 'end_date': end} if start else {})}
+        result = await pool.fetch(url, consume, params=request_params, headers=headers)
+        if result is None:
+            self.stats['not_modified'] += 1
+            return self._store(source, query, start, end, None, None, None, None, validated_only=True)
+
+        sha256, tmp_path, size, etag, last_modified = result
+        path = self.blob_path(sha256)
+        if path.exists():
+            # Same bytes as another window or an earlier fetch: keep one copy
+            tmp_path.unlink()
+            self.stats['duplicate_blobs'] += 1
+        else:
+            path.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, path)
+        self.stats['fetched'] += 1
+        self.stats['bytes'] += size
+        return self._store(source, query, start, end, sha256, etag, last_modified, size)
+
+    async def fetch_range(self, pool, source, url, params, start, end):
+        """Windows (newest first) that together cover [start, end] for one query
+
+        Days already covered by cached windows are not requested again; only
+        the uncovered gaps are fetched, each as one new window.
+        """
+        query = query_key(url, params)
+        overlapping = [w for w in self.windows(source, query)
+                       if w.start <= end and w.end >= start and self.blob_path(w.sha256).exists()]
+        windows = []
+        for window in overlapping:
+            windows.append(await self.fetch_window(pool, source, url, params, window.start, window.end, window))
+        for gap_start, gap_end in uncovered_ranges(start, end, overlapping):
+            windows.append(await self.fetch_window(pool, source, url, params, gap_start, gap_end))
+        return sorted(windows, key=lambda window: window.fetched_at, reverse=True)
+
+    def decode(self, window, tag, decode_fn):
+        """``decode_fn(body bytes)`` as an Arrow table, memoized per (content hash, ``tag``)"""
+        path = self.decoded_dir / f"{window.sha256}.{tag}.parquet"
+        if path.exists():
+            self.stats['decode_hits'] += 1
+            return pq.read_table(path)
+        table = decode_fn(self.blob_path(window.sha256).read_bytes())
+        tmp_path = path.with_name(path.name + ".tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        self.stats['decoded'] += 1
+        return table
+
+    def summary(self):
+        """Per-source window counts, indexed bytes and unique blob bytes"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT source, COUNT(*), SUM(size), COUNT(DISTINCT sha256) FROM windows GROUP BY source"
+            ).fetchall()
+        stored = sum(path.stat().st_size for path in self.blob_dir.glob("*/*"))
+        return rows, stored
+
+    def prune(self):
+        """Delete blobs and decoded memos no window references; returns bytes freed"""
+        with self._connect() as conn:
+            referenced = {row[0] for row in conn.execute("SELECT DISTINCT sha256 FROM windows")}
+        freed = 0
+        for path in list(self.blob_dir.glob("*/*")) + list(self.decoded_dir.glob("*.parquet")):
+            if path.name.split('.')[0] not in referenced:
+                freed += path.stat().st_size
+                path.unlink()
+        return freed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or prune the raw download cache")
+    parser.add_argument("--root", default=str(DEFAULT_RAW_CACHE_DIR), help="Cache directory")
+    parser.add_argument("--prune", action="store_true", help="Delete unreferenced blobs and decoded memos")
+    args = parser.parse_args()
+
+    cache = RawCache(args.root)
+    rows, stored = cache.summary()
+    print(f"📦 Raw cache at {args.root}")
+    for source, windows, indexed, blobs in rows:
+        print(f"   {source:<10} {windows:>5} windows {blobs:>5} unique bodies {indexed / 1024 / 1024:>8.1f} MB indexed")
+    print(f"   {stored / 1024 / 1024:.1f} MB stored on disk")
+    if args.prune:
+        print(f"🧹 Freed {cache.prune() / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Satellite AOD Downloader for VayuDrishti
+Hourly 550 nm aerosol optical depth over the India grid, composited to daily means
+"""
+
+import asyncio
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .collector_log import get_logger
+from .http_pool import AsyncHTTPPool, HTTPError, run_sync
+from .open_meteo import fetch_grid_series, grid_points, series_schema
+from .raw_cache import RawCache
+from .typed_storage import ParquetSink
+
+DEFAULT_SATELLITE_DIR = Path(__file__).parent.parent.parent / "data" / "satellite"
+
+# CAMS reanalysis/forecast AOD (assimilates MODIS/VIIRS retrievals), served without an API key
+AIR_QUALITY_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+AOD_VARIABLES = {'aerosol_optical_depth': 'aod_550'}
+AOD_RESOLUTION = 0.5
+
+
+class SatelliteAODDownloader:
+    """Collects hourly AOD into ``<data_dir>/raw`` (typed Parquet) and daily composite CSVs"""
+
+    def __init__(self, data_dir=DEFAULT_SATELLITE_DIR, base_url=AIR_QUALITY_URL, resolution=AOD_RESOLUTION,
+                 limit_per_host=8, record_dir=None, use_cache=True, raw_cache=None):
+        self.data_dir = Path(data_dir)
+        self.raw_dir = self.data_dir / "raw"
+        self.base_url = base_url
+        self.resolution = resolution
+        self.limit_per_host = limit_per_host
+        self.record_dir = record_dir
+        self.raw_cache = raw_cache or (RawCache() if use_cache else None)
+        self.logger = get_logger('satellite', self.data_dir / "satellite_download.log")
+
+    def make_pool(self, **overrides):
+        options = {'limit_per_host': self.limit_per_host, 'record_dir': self.record_dir, **overrides}
+        return AsyncHTTPPool(**options)
+
+    def raw_path(self, start_date, end_date):
+        return self.raw_dir / f"aod_hourly_{start_date.replace('-', '')}_to_{end_date.replace('-', '')}.parquet"
+
+    def query_params(self, start_date, end_date):
+        return {'start_date': start_date, 'end_date': end_date, 'timezone': 'GMT'}
+
+    async def fetch_hourly(self, pool, start_date, end_date, path=None):
+        """Hourly AOD of every grid node into one Parquet file; returns (path, rows)"""
+        latitude, longitude = grid_points(self.resolution)
+        path = Path(path or self.raw_path(start_date, end_date))
+        with ParquetSink(path, series_schema(AOD_VARIABLES)) as sink:
+            await fetch_grid_series(pool, self.base_url, latitude, longitude,
+                                    self.query_params(start_date, end_date), AOD_VARIABLES, sink,
+                                    raw_cache=self.raw_cache, source='satellite')
+        return path, sink.rows
+
+    async def collect(self, start_date, end_date):
+        async with self.make_pool() as pool:
+            path, rows = await self.fetch_hourly(pool, start_date, end_date)
+            self.logger.info(f"Fetched {rows:,} hourly AOD values in {pool.stats['requests']} requests "
+                             f"over {pool.stats['connections']} connection(s) -> {path.name}")
+            return path, rows
+
+    def create_daily_composites(self, start_date, end_date):
+        """Daily mean AOD per grid node between two 'YYYY-MM-DD' dates (inclusive)"""
+        self.logger.info(f"Creating daily AOD composites from {start_date} to {end_date}")
+        try:
+            path, _ = run_sync(self.collect(start_date, end_date))
+        except (HTTPError, OSError, ValueError, asyncio.TimeoutError) as e:
+            self.logger.error(f"Error fetching AOD: {e}")
+            return pd.DataFrame()
+
+        hourly = pq.read_table(path)
+        hourly = hourly.append_column('date', pc.floor_temporal(hourly['datetime'], unit='day'))
+        daily = hourly.group_by(['date', 'latitude', 'longitude']).aggregate([
+            ('aod_550', 'mean'), ('aod_550', 'count')
+        ])
+        composites = daily.to_pandas().rename(columns={
+            'date': 'datetime', 'aod_550_mean': 'aod_550', 'aod_550_count': 'aod_hours'
+        })[['datetime', 'latitude', 'longitude', 'aod_550', 'aod_hours']]
+        composites = composites[composites['aod_hours'] > 0].sort_values(['datetime', 'latitude', 'longitude'])
+
+        output = self.data_dir / f"aod_data_{start_date.replace('-', '')}_to_{end_date.replace('-', '')}.csv"
+        composites.to_csv(output, index=False)
+        self.logger.info(f"Saved {len(composites):,} daily composites to {output.name}")
+        return composites.reset_index(drop=True)
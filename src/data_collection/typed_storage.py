@@ -0,0 +1,106 @@
+"""
+Typed Storage for VayuDrishti Collectors
+Incremental decode of response bodies into Arrow record batches appended to Parquet
+"""
+
+import io
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+NULL_VALUES = ['', 'NA', 'N/A', 'NaN', 'None', 'null', '-']
+
+
+class CSVStreamDecoder:
+    """Feeds CSV bytes as they arrive and emits typed record batches of ~``block_size`` bytes
+
+    Only complete lines are parsed; the header of the stream is prepended to
+    every block so each block converts independently with the same column
+    types. Records must not contain embedded newlines (true of the APIs used).
+    """
+
+    def __init__(self, schema, block_size=1 << 20, timestamp_parsers=None):
+        self.schema = schema
+        self.block_size = block_size
+        self.convert_options = pa_csv.ConvertOptions(
+            column_types={field.name: field.type for field in schema},
+            include_columns=schema.names,
+            include_missing_columns=True,
+            null_values=NULL_VALUES,
+            strings_can_be_null=True,
+            timestamp_parsers=timestamp_parsers or [pa_csv.ISO8601]
+        )
+        self.header = None
+        self._pending = bytearray()
+        self.rows = 0
+
+    def _parse(self, block):
+        table = pa_csv.read_csv(io.BytesIO(self.header + block), convert_options=self.convert_options)
+        table = table.select(self.schema.names).cast(self.schema)
+        self.rows += table.num_rows
+        return table.to_batches()
+
+    def feed(self, data):
+        """Buffer ``data``; returns the batches completed by it (often none)"""
+        self._pending += data
+        if self.header is None:
+            end = self._pending.find(b'\n')
+            if end < 0:
+                return []
+            self.header = bytes(self._pending[:end + 1])
+            del self._pending[:end + 1]
+        if len(self._pending) < self.block_size:
+            return []
+        end = self._pending.rfind(b'\n')
+        if end < 0:
+            return []
+        block = bytes(self._pending[:end + 1])
+        del self._pending[:end + 1]
+        return self._parse(block)
+
+    def close(self):
+        """Batches for whatever remains buffered at the end of the stream"""
+        block, self._pending = bytes(self._pending), bytearray()
+        if self.header is None or not block.strip():
+            return []
+        return self._parse(block if block.endswith(b'\n') else block + b'\n')
+
+
+class ParquetSink:
+    """Appends record batches to a Parquet file that is published atomically on close"""
+
+    def __init__(self, path, schema, compression='zstd'):
+        self.path = Path(path)
+        self.schema = schema
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._writer = pq.ParquetWriter(self._tmp_path, schema, compression=compression)
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, data):
+        """Append a RecordBatch or Table (cast to the sink schema)"""
+        table = data if isinstance(data, pa.Table) else pa.Table.from_batches([data])
+        if table.num_rows:
+            self._writer.write_table(table.select(self.schema.names).cast(self.schema))
+            self.rows += table.num_rows
+
+    def close(self):
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        self._writer.close()
+        self._tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Pan-India Data Orchestrator for VayuDrishti
+Incremental ingest -> join -> features -> train -> score -> correct -> publish over daily partitions,
+then the weather climatology the dashboard forecasts from
+
+Usage:
+    python src/data_orchestrator.py [--days-back 7] [--end-date YYYY-MM-DD] [--no-ingest] [--workers 8]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from functools import partial
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Training and scoring share the dashboard's feature schema and the training script's model setup
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from arrow_data import build_features
+from bias_correction import PM25_RANGE, BiasCorrector, combine_reports, describe_gain
+from data_collection.backfill import SOURCES, Backfill, Shard
+from data_collection.cpcb_downloader import feed_to_station_frame
+from data_collection.http_pool import run_sync
+from data_collection.open_meteo import INDIA_BOUNDS
+from data_collection.satellite_aod_downloader import AOD_RESOLUTION
+from feature_builder import FEATURE_BUILDER, FEATURE_COLUMNS
+from met_climatology import MetClimatology, default_sources, weather_files
+from pipeline_runner import PipelineRunner, Stage, Task, TaskRejected, write_atomic
+
+DEFAULT_DATA_DIR = PROJECT_ROOT / "data"
+DEFAULT_MODELS_DIR = PROJECT_ROOT / "models"
+GRID_SOURCES = ['satellite', 'weather']
+KEY_COLUMNS = ['datetime', 'latitude', 'longitude']
+STATION_POLLUTANTS = ['pm2_5', 'pm10', 'no2', 'so2']
+TRUTH_COLUMNS = ['pm2_5', 'has_ground_truth', 'station_name']
+# Days (counting today) that upstream may still revise; their shards are re-fetched on every run
+REFRESH_DAYS = 2
+MIN_TRAIN_ROWS = 10
+# A retrained model is published only with this many training rows and a lower MAE than the
+# published model on the held-out stations (a fixed 1 in HOLDOUT_BUCKETS of the station cells)
+MIN_PUBLISH_ROWS = 1000
+MIN_HOLDOUT_ROWS = 30
+HOLDOUT_BUCKETS = 5
+# Station-residual correction: nearest stations per grid cell and their reach
+BIAS_CORRECTION = {'k': 8, 'radius_km': 250.0, 'smoothing_km': 25.0}
+
+# Sort order that makes a shard's bytes depend only on its content, not on response arrival order
+SHARD_SORT_KEYS = {
+    'satellite': KEY_COLUMNS,
+    'weather': KEY_COLUMNS,
+    'cpcb': ['station', 'pollutant_id', 'last_update']
+}
+
+
+def write_parquet(table, path):
+    if isinstance(table, pd.DataFrame):
+        table = pa.Table.from_pandas(table, preserve_index=False)
+    return write_atomic(path, lambda tmp_path: pq.write_table(table, tmp_path))
+
+
+def copy_file(source, destination):
+    return write_atomic(destination, lambda tmp_path: shutil.copyfile(source, tmp_path))
+
+
+def station_readings(paths, day, resolution):
+    """CPCB readings of ``day`` from feed shards, averaged per (hour, grid cell)"""
+    paths = [path for path in paths if path.exists()]
+    if not paths:
+        return None
+    readings = feed_to_station_frame(pa.concat_tables([pq.read_table(path) for path in paths]))
+    readings = readings.drop_duplicates(['station_name', 'datetime'], keep='last')
+    readings = readings[readings['datetime'].dt.date == day]
+    if readings.empty:
+        return None
+
+    readings = readings.assign(
+        datetime=readings['datetime'].dt.floor('h'),
+        latitude=((readings['station_latitude'] / resolution).round() * resolution).round(4),
+        longitude=((readings['station_longitude'] / resolution).round() * resolution).round(4)
+    ).sort_values('station_name')
+    pollutants = [name for name in STATION_POLLUTANTS if name in readings.columns]
+    return readings.groupby(KEY_COLUMNS).agg(
+        **{name: (name, 'mean') for name in pollutants},
+        has_ground_truth=('has_ground_truth', 'any'),
+        station_name=('station_name', 'first')
+    ).reset_index()
+
+
+def join_day(day, grid_paths, station_paths, resolution, output):
+    """One day of the gridded sources (outer join), with station readings on their grid cells"""
+    grid = None
+    for path in grid_paths:
+        if path.exists():
+            frame = pq.read_table(path).to_pandas()
+            grid = frame if grid is None else grid.merge(frame, on=KEY_COLUMNS, how='outer')
+
+    stations = station_readings(station_paths, day, resolution)
+    if stations is not None:
+        grid = grid.merge(stations.astype({'datetime': grid['datetime'].dtype}), on=KEY_COLUMNS, how='left')
+    for name, default in (('pm2_5', np.nan), ('has_ground_truth', False), ('station_name', None)):
+        if name not in grid.columns:
+            grid[name] = default
+    grid['pm2_5'] = grid['pm2_5'].astype(np.float32)
+    grid['has_ground_truth'] = grid['has_ground_truth'].eq(True)
+    grid['station_name'] = grid['station_name'].astype('string')
+    grid.insert(3, 'grid_id', grid['latitude'].astype(str) + '_' + grid['longitude'].astype(str))
+    write_parquet(grid.sort_values(KEY_COLUMNS, ignore_index=True), output)
+
+
+def features_day(joined, features_path, labelled_path):
+    """The model's 12 features for every joined row, and the rows with ground truth"""
+    grid = pq.read_table(joined).to_pandas()
+    grid['hour'] = grid['datetime'].dt.hour
+    grid['month'] = grid['datetime'].dt.month
+    matrix = FEATURE_BUILDER.build(grid)
+    features = pa.Table.from_pandas(
+        pd.concat([grid[KEY_COLUMNS + ['grid_id'] + TRUTH_COLUMNS], FEATURE_BUILDER.frame(matrix)], axis=1),
+        preserve_index=False)
+    write_parquet(features, features_path)
+    # Filtered in Arrow so an empty subset keeps the partition schema
+    write_parquet(features.filter(features['has_ground_truth']), labelled_path)
+
+
+def holdout_cells(grid_id):
+    """Which rows belong to held-out station cells, chosen by a stable hash of the cell id"""
+    codes, cells = pd.factorize(np.asarray(grid_id, dtype=object))
+    held_out = np.array([zlib.crc32(str(cell).encode()) % HOLDOUT_BUCKETS == 0 for cell in cells], dtype=bool)
+    return held_out[codes] if len(cells) else np.zeros(len(codes), dtype=bool)
+
+
+_models = {}
+_model_lock = threading.Lock()
+
+
+def load_model(path):
+    """The model at ``path``, loaded once per file version and shared by scoring threads"""
+    global _models
+    key = (str(path), path.stat().st_mtime_ns)
+    with _model_lock:
+        if key not in _models:
+            _models = {key: joblib.load(path)}
+        return _models[key]
+
+
+def score_day(model_path, features_path, output):
+    """Clipped PM2.5 predictions for every row of a features partition"""
+    table = pq.read_table(features_path)
+    predictions = load_model(model_path).predict(build_features(table.select(FEATURE_COLUMNS)))
+    scored = table.select(KEY_COLUMNS + ['grid_id'] + TRUTH_COLUMNS).append_column(
+        'predicted_pm2_5', pa.array(np.clip(predictions, *PM25_RANGE).astype(np.float32)))
+    write_parquet(scored, output)
+
+
+def correct_day(predictions, output, report_path, settings):
+    """Station-residual correction of a scored day, applied only if it helps the held-out stations"""
+    table = pq.read_table(predictions)
+    scored = table.select(KEY_COLUMNS + ['grid_id', 'pm2_5', 'has_ground_truth', 'predicted_pm2_5']).to_pandas()
+    corrector = BiasCorrector(**settings).fit(scored)
+    # Training stations' residuals are in-sample; the decision rests on the held-out stations alone
+    report = corrector.evaluate(scored, holdout_cells(scored['grid_id']))
+    report['applied'] = 'mae_raw' in report and report['mae_corrected'] < report['mae_raw']
+    correction = corrector.correction(scored) if report['applied'] else np.zeros(len(scored))
+    corrected = np.clip(scored['predicted_pm2_5'].to_numpy() + correction, *PM25_RANGE)
+    table = table.append_column('bias_correction', pa.array(correction.astype(np.float32)))
+    write_parquet(table.append_column('corrected_pm2_5', pa.array(corrected.astype(np.float32))), output)
+    write_atomic(report_path, lambda tmp_path: tmp_path.write_text(json.dumps(report)))
+
+
+class PanIndiaDataOrchestrator:
+    """Daily-partitioned pipeline from raw collector shards to published PM2.5 predictions
+
+    Collector shards live in ``<base_data_dir>/backfill`` (shared with the
+    backfill CLI), intermediate partitions and the ledger in ``pipeline/``,
+    and published results in ``unified/`` (``cleaned_dataset.csv``,
+    ``predictions/<day>.parquet``) and ``models_dir``. Every (stage, day)
+    task is skipped while the content hashes of its inputs are unchanged,
+    so a daily refresh only fetches the recent days and re-joins, re-scores
+    and re-publishes the days whose data actually changed. Retraining runs
+    only when the labelled rows change and never sees the held-out station
+    cells; the new model replaces the published one only if it has enough
+    training rows and a lower MAE on those cells, and then re-scores the
+    days of the current range. Rejections are recorded in the ledger.
+    Published predictions carry a station-residual ``corrected_pm2_5``
+    next to the model's ``predicted_pm2_5``. The weather climatology in
+    ``cubes/met_climatology`` is rebuilt whenever its source tables change.
+    """
+
+    def __init__(self, base_data_dir=DEFAULT_DATA_DIR, models_dir=DEFAULT_MODELS_DIR, sources=SOURCES,
+                 refresh_days=REFRESH_DAYS, workers=None, api_base=None, api_key=None,
+                 bias_correction=None):
+        self.base_data_dir = Path(base_data_dir)
+        self.models_dir = Path(models_dir)
+        self.grid_resolution = AOD_RESOLUTION
+        self.india_bounds = dict(INDIA_BOUNDS)
+        self.sources = list(sources)
+        self.refresh_days = refresh_days
+        self.bias_correction = dict(bias_correction or BIAS_CORRECTION)
+        self.work_dir = self.base_data_dir / "pipeline"
+        self.unified_dir = self.base_data_dir / "unified"
+        self.model_path = self.work_dir / "model" / "best_model.pkl"
+        self.metrics_path = self.work_dir / "model" / "model_metrics.json"
+        self.backfill = Backfill(self.base_data_dir / "backfill", workers=workers or 8,
+                                 api_base=api_base, api_key=api_key)
+        self.runner = PipelineRunner([
+            Stage('ingest', self.plan_ingest, run=self.run_ingest, best_effort=True),
+            Stage('join', self.plan_join, processes=True),
+            Stage('features', self.plan_features, processes=True),
+            Stage('train', self.plan_train),
+            Stage('score', self.plan_score),
+            Stage('correct', self.plan_correct, processes=True),
+            Stage('publish', self.plan_publish),
+            Stage('climatology', self.plan_climatology)
+        ], self.work_dir / "ledger.jsonl", workers)
+        self.start_day = self.end_day = date.today()
+        self.ingest = True
+
+    def days(self):
+        day = self.start_day
+        while day <= self.end_day:
+            yield day
+            day += timedelta(days=1)
+
+    def shard_path(self, source, day):
+        return Shard(source, day, self.backfill.root).path
+
+    def partition_path(self, kind, day):
+        return self.work_dir / kind / f"{day.isoformat()}.parquet"
+
+    # Ingest: (source, day) shards fetched by the backfill over shared connection pools
+
+    def plan_ingest(self):
+        if not self.ingest:
+            return []
+        refresh_from = date.today() - timedelta(days=self.refresh_days - 1)
+        return [
+            Task('ingest', shard.key, None, outputs=[shard.path], always_run=shard.day >= refresh_from)
+            for shard in self.backfill.plan(self.sources, self.start_day, self.end_day)
+        ]
+
+    def run_ingest(self, tasks):
+        shards = []
+        for task in tasks:
+            source, day = task.partition.split('/')
+            shards.append(Shard(source, date.fromisoformat(day), self.backfill.root))
+        run_sync(self.backfill.run(shards, refresh={task.partition for task in tasks if task.always_run}))
+
+        errors = {}
+        for task, shard in zip(tasks, shards):
+            entry = self.backfill.manifest.entries.get(shard.key, {})
+            if entry.get('status') != 'done' or not shard.path.exists():
+                errors[task.key] = RuntimeError(entry.get('error', 'shard was not fetched'))
+                continue
+            table = pq.read_table(shard.path)
+            write_parquet(table.sort_by([(name, 'ascending') for name in SHARD_SORT_KEYS[shard.source]]),
+                          shard.path)
+            errors[task.key] = None
+        return errors
+
+    # Join: the gridded sources of a day, with CPCB readings snapped to their grid cell and hour
+
+    def plan_join(self):
+        tasks = []
+        for day in self.days():
+            grid_inputs = [self.shard_path(source, day) for source in GRID_SOURCES if source in self.sources]
+            if not any(path.exists() for path in grid_inputs):
+                continue
+            # Readings of a day can arrive in the next day's feed snapshot
+            station_inputs = ([self.shard_path('cpcb', day + timedelta(days=offset)) for offset in (0, 1)]
+                              if 'cpcb' in self.sources else [])
+            output = self.partition_path('joined', day)
+            tasks.append(Task('join', day.isoformat(),
+                              partial(join_day, day, grid_inputs, station_inputs, self.grid_resolution, output),
+                              inputs=grid_inputs + station_inputs, outputs=[output],
+                              params={'resolution': self.grid_resolution}))
+        return tasks
+
+    # Features: the model's 12 features per grid row, plus the labelled (ground truth) subset
+
+    def plan_features(self):
+        tasks = []
+        for day in self.days():
+            joined = self.partition_path('joined', day)
+            if not joined.exists():
+                continue
+            outputs = [self.partition_path('features', day), self.partition_path('labelled', day)]
+            tasks.append(Task('features', day.isoformat(), partial(features_day, joined, *outputs),
+                              inputs=[joined], outputs=outputs))
+        return tasks
+
+    # Train: the production XGBoost setup on the labelled rows outside the held-out station cells
+
+    def labelled_paths(self):
+        """Every stored labelled partition, so a short refresh range still trains on all history"""
+        return sorted((self.work_dir / "labelled").glob("*.parquet"))
+
+    def labelled_rows(self, labelled):
+        return sum(pq.read_metadata(path).num_rows for path in labelled)
+
+    def plan_train(self):
+        labelled = self.labelled_paths()
+        rows = self.labelled_rows(labelled)
+        if rows < MIN_TRAIN_ROWS:
+            print(f"ℹ️ {rows} labelled rows (< {MIN_TRAIN_ROWS}); not retraining")
+            return []
+        return [Task('train', 'model', partial(self.train, labelled), inputs=labelled,
+                     outputs=[self.model_path, self.metrics_path])]
+
+    def train(self, labelled):
+        from fix_model_compatibility import train_model, update_metrics
+
+        table = pa.concat_tables([pq.read_table(path, columns=FEATURE_COLUMNS + ['grid_id', 'pm2_5'])
+                                  for path in labelled])
+        X = build_features(table.select(FEATURE_COLUMNS))
+        y = table['pm2_5'].to_numpy(zero_copy_only=False).astype(np.float32)
+        valid = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        held_out = holdout_cells(table['grid_id'].to_numpy(zero_copy_only=False))
+        train, test = valid & ~held_out, valid & held_out
+        if train.sum() < MIN_TRAIN_ROWS:
+            raise ValueError(f"Only {train.sum()} labelled rows outside the held-out stations have every feature")
+        X_train = FEATURE_BUILDER.frame(np.ascontiguousarray(X[train]))
+        model, mae, rmse, r2 = train_model(X_train, y[train])
+        print(f"📊 Retrained on {len(X_train):,} rows: MAE {mae:.2f} μg/m³, RMSE {rmse:.2f} μg/m³, R² {r2:.3f}")
+
+        gate = self.publish_gate(model, len(X_train), np.ascontiguousarray(X[test]), y[test])
+        if gate['reason'] is not None:
+            raise TaskRejected(gate['reason'])
+
+        def write_metrics(tmp_path):
+            update_metrics(mae, rmse, r2, FEATURE_COLUMNS, len(X_train), path=tmp_path)
+            metrics = json.loads(tmp_path.read_text())
+            tmp_path.write_text(json.dumps({**metrics, 'holdout': gate}, indent=2))
+
+        write_atomic(self.model_path, lambda tmp_path: joblib.dump(model, tmp_path))
+        write_atomic(self.metrics_path, write_metrics)
+
+    def publish_gate(self, model, train_rows, X_test, y_test):
+        """Held-out comparison of a retrained model with the published one; ``reason`` is set if it must not replace it"""
+        gate = {'train_rows': train_rows, 'holdout_rows': len(y_test), 'reason': None}
+        if len(y_test):
+            gate['mae'] = float(np.abs(np.clip(model.predict(X_test), *PM25_RANGE) - y_test).mean())
+        published_path = self.models_dir / "best_model.pkl"
+
+        if train_rows < MIN_PUBLISH_ROWS:
+            gate['reason'] = f"trained on {train_rows:,} rows (< {MIN_PUBLISH_ROWS:,}); keeping the published model"
+        elif published_path.exists():
+            if len(y_test) < MIN_HOLDOUT_ROWS:
+                gate['reason'] = (f"{len(y_test)} held-out rows (< {MIN_HOLDOUT_ROWS}) cannot show it beats "
+                                  f"the published model")
+            else:
+                published = load_model(published_path).predict(X_test)
+                gate['published_mae'] = float(np.abs(np.clip(published, *PM25_RANGE) - y_test).mean())
+                if gate['mae'] >= gate['published_mae']:
+                    gate['reason'] = (f"held-out MAE {gate['mae']:.2f} μg/m³ does not beat the published model's "
+                                      f"{gate['published_mae']:.2f} μg/m³ on {len(y_test):,} rows")
+        if gate['reason'] is None and 'mae' in gate:
+            published = f" (published model: {gate['published_mae']:.2f})" if 'published_mae' in gate else ""
+            print(f"✅ Held-out MAE {gate['mae']:.2f} μg/m³{published} on {len(y_test):,} rows; publishing")
+        return gate
+
+    # Score: PM2.5 for every grid row of a day with the pipeline's (or else the published) model
+
+    def scoring_model_path(self):
+        return self.model_path if self.model_path.exists() else self.models_dir / "best_model.pkl"
+
+    def plan_score(self):
+        model_path = self.scoring_model_path()
+        tasks = []
+        for day in self.days():
+            features = self.partition_path('features', day)
+            if not features.exists():
+                continue
+            output = self.partition_path('predictions', day)
+            tasks.append(Task('score', day.isoformat(), partial(score_day, model_path, features, output),
+                              inputs=[features, model_path], outputs=[output]))
+        return tasks
+
+    # Correct: station residuals spread over the day's grid, validated on held-out stations
+
+    def report_path(self, day):
+        return self.work_dir / "corrected" / f"{day.isoformat()}.json"
+
+    def plan_correct(self):
+        tasks = []
+        for day in self.days():
+            predictions = self.partition_path('predictions', day)
+            if not predictions.exists():
+                continue
+            outputs = [self.partition_path('corrected', day), self.report_path(day)]
+            tasks.append(Task('correct', day.isoformat(),
+                              partial(correct_day, predictions, *outputs, self.bias_correction),
+                              inputs=[predictions], outputs=outputs, params=self.bias_correction))
+        return tasks
+
+    def correction_report(self):
+        """Held-out station accuracy of the raw and the published predictions over the current range
+
+        Days where the correction was not applied published the raw
+        predictions, so they count with their raw error.
+        """
+        reports = [json.loads(path.read_text()) for path in map(self.report_path, self.days()) if path.exists()]
+        combined = combine_reports([
+            report if report['applied'] else
+            {**report, **{f'{metric}_corrected': report[f'{metric}_raw'] for metric in ('mae', 'rmse')}}
+            for report in reports if 'mae_raw' in report
+        ])
+        combined['applied'] = sum(report['applied'] for report in reports)
+        return combined
+
+    # Publish: atomic copies of changed partitions, the training dataset and a retrained model
+
+    def plan_publish(self):
+        tasks = []
+        for day in self.days():
+            predictions = self.partition_path('corrected', day)
+            if predictions.exists():
+                output = self.unified_dir / "predictions" / predictions.name
+                tasks.append(Task('publish', f"predictions/{day.isoformat()}",
+                                  partial(copy_file, predictions, output), inputs=[predictions], outputs=[output]))
+
+        labelled = self.labelled_paths()
+        if self.labelled_rows(labelled):
+            output = self.unified_dir / "cleaned_dataset.csv"
+            tasks.append(Task('publish', 'cleaned_dataset', partial(self.publish_dataset, labelled, output),
+                              inputs=labelled, outputs=[output]))
+        if self.model_path.exists():
+            # The dashboard hot-reloads the model file, so it is swapped in with one rename
+            outputs = [self.models_dir / "best_model.pkl", self.models_dir / "model_metrics.json"]
+            tasks.append(Task('publish', 'model', partial(self.publish_model, outputs),
+                              inputs=[self.model_path, self.metrics_path], outputs=outputs))
+        return tasks
+
+    def publish_dataset(self, labelled, output):
+        dataset = pa.concat_tables([pq.read_table(path) for path in labelled]).to_pandas()
+        dataset = dataset.sort_values(['datetime', 'station_name'], ignore_index=True)
+        write_atomic(output, lambda tmp_path: dataset.to_csv(tmp_path, index=False))
+
+    def publish_model(self, outputs):
+        copy_file(self.metrics_path, outputs[1])
+        copy_file(self.model_path, outputs[0])
+
+    # Climatology: the dashboard's weather cube, rebuilt when its source tables (incl. the published dataset) change
+
+    def plan_climatology(self):
+        sources = default_sources(self.base_data_dir)
+        inputs = weather_files(sources)
+        if not inputs:
+            return []
+        store_dir = self.base_data_dir / "cubes" / "met_climatology"
+        return [Task('climatology', 'met', partial(MetClimatology(store_dir).build, sources), inputs=inputs,
+                     outputs=[store_dir / name for name in ("meta.json", "climatology.f32", "level.i1")])]
+
+    def run(self, days_back=7, end_date=None, stages=None, force=(), ingest=True):
+        """Bring every stage up to date for the ``days_back`` days ending ``end_date`` (default: today)
+
+        Returns {stage: StageReport}.
+        """
+        self.end_day = date.fromisoformat(end_date) if isinstance(end_date, str) else (end_date or date.today())
+        self.start_day = self.end_day - timedelta(days=days_back - 1)
+        self.ingest = ingest
+        return self.runner.run(stages, force)
+
+    def load_unified(self):
+        """The joined grid rows of the current range as one DataFrame"""
+        paths = [path for path in (self.partition_path('joined', day) for day in self.days()) if path.exists()]
+        if not paths:
+            return pd.DataFrame()
+        return pa.concat_tables([pq.read_table(path) for path in paths]).to_pandas()
+
+    def run_full_pipeline(self, days_back=180, include_pressure_levels=False, end_date=None):
+        """Run the pipeline and return the unified (joined) dataset of the range"""
+        if include_pressure_levels:
+            print("⚠️ Pressure level data needs the Copernicus CDS API (cdsapi); using surface fields only")
+        self.run(days_back, end_date)
+        return self.load_unified()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental raw data -> predictions pipeline")
+    parser.add_argument("--days-back", type=int, default=7, help="Days up to --end-date to bring up to date")
+    parser.add_argument("--end-date", help="Last day of the range (YYYY-MM-DD, default: today)")
+    parser.add_argument("--sources", nargs="+", choices=SOURCES, default=SOURCES, help="Collector sources")
+    parser.add_argument("--stages", nargs="+", help="Only run these stages (default: all)")
+    parser.add_argument("--force", nargs="+", default=[], help="Re-run these stages even if up to date")
+    parser.add_argument("--no-ingest", action="store_true", help="Use the stored shards without fetching")
+    parser.add_argument("--workers", type=int, default=None, help="Partitions processed in parallel")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Data directory")
+    parser.add_argument("--models-dir", default=str(DEFAULT_MODELS_DIR), help="Published model directory")
+    parser.add_argument("--api-base", help="Serve every source from this base URL (e.g. the local stand-in API)")
+    args = parser.parse_args()
+
+    orchestrator = PanIndiaDataOrchestrator(args.data_dir, args.models_dir, sources=args.sources,
+                                            workers=args.workers, api_base=args.api_base)
+    print(f"🚀 Pipeline for the {args.days_back} days up to {args.end_date or 'today'} "
+          f"({', '.join(args.sources)})")
+    started = time.perf_counter()
+    reports = orchestrator.run(args.days_back, args.end_date, args.stages, args.force, ingest=not args.no_ingest)
+    print(f"\n✅ Pipeline finished in {time.perf_counter() - started:.1f}s "
+          f"({orchestrator.runner.hasher.bytes_hashed / 1024 / 1024:.1f} MB hashed)")
+    for name, report in reports.items():
+        for task, error in list(report.errors.items())[:3]:
+            print(f"❌ {task}: {error[:300]}")
+        for task, reason in report.rejections.items():
+            print(f"🚫 {task}: {reason}")
+    correction = orchestrator.correction_report()
+    if correction['rows']:
+        print(f"🎯 Bias correction applied on {correction['applied']}/{correction['days']} day(s); "
+              f"raw → published: {describe_gain(correction)}")
+
+
+if __name__ == "__main__":
+    main()
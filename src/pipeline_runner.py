@@ -0,0 +1,290 @@
+"""
+Incremental Pipeline Runner for VayuDrishti
+Stages of partitioned tasks that re-run only when the content hashes of their inputs change
+"""
+
+import hashlib
+import json
+import os
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+class TaskRejected(Exception):
+    """Raised by a task that ran but kept its previous outputs (e.g. a retrained model that did not improve)
+
+    The ledger records the reason with the task's fingerprint, so the
+    decision stands until the task's inputs change.
+    """
+
+
+class Task:
+    """One partition of a stage: ``fn()`` turns ``inputs`` into ``outputs`` (file paths)
+
+    ``params`` (JSON-serializable) is part of the fingerprint, so a changed
+    setting re-runs the task like a changed input does. Inputs that do not
+    exist are fingerprinted as absent, so their later arrival re-runs the
+    task. ``always_run`` tasks (e.g. fetches of data still being revised
+    upstream) run every time; unchanged outputs still stop the re-run from
+    propagating downstream.
+    """
+
+    def __init__(self, stage, partition, fn, inputs=(), outputs=(), params=None, always_run=False):
+        self.stage = stage
+        self.partition = partition
+        self.fn = fn
+        self.inputs = [Path(path) for path in inputs]
+        self.outputs = [Path(path) for path in outputs]
+        self.params = params or {}
+        self.always_run = always_run
+
+    @property
+    def key(self):
+        return f"{self.stage}/{self.partition}"
+
+
+class Stage:
+    """A named step whose ``plan()`` returns its tasks once the previous stages have run
+
+    Tasks of a stage are independent and run on a thread pool, or with
+    ``processes`` on a process pool for pandas-heavy work that holds the GIL
+    (task functions must then be picklable). A stage that batches its own
+    work, such as fetching over shared connection pools, passes ``run``
+    instead: ``run(tasks)`` -> {task key: exception or None}. Bump
+    ``version`` when the stage's code changes its outputs.
+    Failures of a ``best_effort`` stage leave its previous outputs (if any)
+    in place and do not block the tasks that read them.
+    """
+
+    def __init__(self, name, plan, version=1, run=None, processes=False, best_effort=False):
+        self.name = name
+        self.plan = plan
+        self.version = version
+        self.processes = processes
+        self.best_effort = best_effort
+        self._run = run
+
+    def run(self, tasks, workers):
+        if self._run is not None:
+            return self._run(tasks)
+        errors = {}
+        executor = ProcessPoolExecutor if self.processes and min(workers, len(tasks)) > 1 else ThreadPoolExecutor
+        with executor(max_workers=min(workers, len(tasks))) as pool:
+            futures = {pool.submit(task.fn): task for task in tasks}
+            for future in as_completed(futures):
+                errors[futures[future].key] = future.exception()
+        return errors
+
+
+class FileHasher:
+    """SHA-256 of files, re-read only when their size or mtime changed since the last hash"""
+
+    def __init__(self):
+        self.known = {}
+        self.bytes_hashed = 0
+
+    def seed(self, files):
+        for path, (size, mtime_ns, sha256) in files.items():
+            self.known[path] = (size, mtime_ns, sha256)
+
+    def state(self, path):
+        """(size, mtime_ns, sha256) of ``path``, or None if it does not exist"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        known = self.known.get(str(path))
+        if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            return known
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while block := f.read(HASH_BLOCK_SIZE):
+                digest.update(block)
+        self.bytes_hashed += stat.st_size
+        state = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+        self.known[str(path)] = state
+        return state
+
+
+class PipelineLedger:
+    """Append-only JSONL of task outcomes with the hashes they ran on; the last entry per task wins
+
+    Skipped tasks append nothing, so the ledger (and the cost of a refresh)
+    grows with the work actually done. It is compacted to one line per task
+    once superseded lines dominate.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        self.lines = 0
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line torn by a crash mid-write
+                    self.entries[entry['task']] = entry
+                    self.lines += 1
+
+    def files(self):
+        """{path: (size, mtime_ns, sha256)} of every file the ledger recorded"""
+        files = {}
+        for entry in self.entries.values():
+            for group in ('inputs', 'outputs'):
+                for path, state in entry.get(group, {}).items():
+                    # A file rewritten since an older entry saw it: keep the newest state
+                    if state and (path not in files or state[1] > files[path][1]):
+                        files[path] = tuple(state)
+        return files
+
+    def record(self, task, status, **details):
+        entry = {'task': task.key, 'status': status, 'recorded_at': datetime.now().isoformat(), **details}
+        self.entries[task.key] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.lines += 1
+
+    def compact(self):
+        if self.lines <= 4 * len(self.entries) + 100:
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.lines = len(self.entries)
+
+
+class StageReport:
+    """Task counts and wall time of one stage"""
+
+    def __init__(self, planned):
+        self.planned = planned
+        self.ran = 0
+        self.skipped = 0
+        self.failed = 0
+        self.blocked = 0
+        self.seconds = 0.0
+        self.errors = {}
+        self.rejections = {}
+
+    def summary(self, name):
+        rejected = f" {len(self.rejections):>3} rejected" if self.rejections else ""
+        return (f"{name:<11} {self.ran:>4} ran {self.skipped:>5} up to date {self.failed:>3} failed "
+                f"{self.blocked:>3} blocked{rejected} ({self.seconds:.2f}s)")
+
+
+class PipelineRunner:
+    """Runs stages in order, re-executing only tasks whose fingerprint or outputs changed
+
+    A task's fingerprint hashes its stage version, params and the content
+    hashes of its inputs. Tasks reading an output of a task that failed in
+    this run are blocked rather than run on stale data.
+    """
+
+    def __init__(self, stages, ledger_path, workers=None):
+        self.stages = stages
+        self.ledger = PipelineLedger(ledger_path)
+        self.workers = workers or os.cpu_count()
+        self.hasher = FileHasher()
+        self.hasher.seed(self.ledger.files())
+
+    def fingerprint(self, stage, task):
+        inputs = {str(path): self.hasher.state(path) for path in task.inputs}
+        payload = {
+            'version': stage.version,
+            'params': task.params,
+            'inputs': {path: state[2] if state else None for path, state in sorted(inputs.items())}
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest(), inputs
+
+    def is_current(self, task, fingerprint):
+        entry = self.ledger.entries.get(task.key)
+        if entry is None or entry['status'] not in ('done', 'rejected') or entry['fingerprint'] != fingerprint:
+            return False
+        if entry['status'] == 'rejected':
+            return True
+        for path, recorded in entry['outputs'].items():
+            state = self.hasher.state(path)
+            if state is None or state[2] != recorded[2]:
+                return False
+        return True
+
+    def run(self, stages=None, force=()):
+        """Run ``stages`` (default: all) in order; ``force`` names stages to re-run regardless
+
+        Returns {stage name: StageReport}.
+        """
+        reports = {}
+        failed_outputs = set()
+        for stage in self.stages:
+            if stages is not None and stage.name not in stages:
+                continue
+            started = time.perf_counter()
+            tasks = stage.plan()
+            report = reports[stage.name] = StageReport(len(tasks))
+
+            due = []
+            for task in tasks:
+                if failed_outputs.intersection(task.inputs):
+                    report.blocked += 1
+                    failed_outputs.update(task.outputs)
+                    continue
+                fingerprint, inputs = self.fingerprint(stage, task)
+                if not task.always_run and stage.name not in force and self.is_current(task, fingerprint):
+                    report.skipped += 1
+                else:
+                    due.append((task, fingerprint, inputs))
+
+            errors = stage.run([task for task, _, _ in due], self.workers) if due else {}
+            for task, fingerprint, inputs in due:
+                error = errors.get(task.key)
+                if isinstance(error, TaskRejected):
+                    report.rejections[task.key] = str(error)
+                    self.ledger.record(task, 'rejected', fingerprint=fingerprint, inputs=inputs, reason=str(error))
+                    continue
+                missing = [str(path) for path in task.outputs if not path.exists()]
+                if error is None and missing:
+                    error = FileNotFoundError(f"Task did not write {', '.join(missing)}")
+                if error is not None:
+                    report.failed += 1
+                    report.errors[task.key] = f"{type(error).__name__}: {error}"
+                    if not stage.best_effort:
+                        failed_outputs.update(task.outputs)
+                    # The three-argument form also works before Python 3.10
+                    trace = traceback.format_exception(type(error), error, error.__traceback__, limit=-3)
+                    self.ledger.record(task, 'failed', error=report.errors[task.key], trace=''.join(trace))
+                    continue
+                report.ran += 1
+                outputs = {str(path): self.hasher.state(path) for path in task.outputs}
+                self.ledger.record(task, 'done', fingerprint=fingerprint, inputs=inputs, outputs=outputs)
+            report.seconds = time.perf_counter() - started
+            print(f"⚙️ {report.summary(stage.name)}")
+        self.ledger.compact()
+        return reports
+
+
+def write_atomic(path, write):
+    """Call ``write(tmp_path)`` and publish the file at ``path`` with one rename"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return path
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Streaming Station Nowcast for VayuDrishti
+Tails new CPCB readings and updates per-station averages, AQI and model residuals incrementally
+
+Usage:
+    python src/station_nowcast.py [--once] [--interval 300] [--cpcb-dir data/cpcb] [--reset]
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Station averaging, the model and the shared store all live with the dashboard
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard"))
+
+from data_collection.cpcb_downloader import feed_to_station_frame
+from feature_builder import FEATURE_BUILDER
+from nowcast_store import DEFAULT_STORE_PATH, NowcastStore
+from station_aqi import WINDOW_HOURS, StationAverager, station_aqi
+
+DEFAULT_CPCB_DIR = PROJECT_ROOT / "data" / "cpcb"
+POLLUTANTS = list(WINDOW_HOURS)
+INFO_COLUMNS = ['state', 'city', 'station_latitude', 'station_longitude']
+# Bytes before a CSV cursor that must be unchanged for the file to count as appended rather than rewritten
+ANCHOR_BYTES = 64
+# Residual statistics are exponentially weighted over about a day of 3-hourly readings
+RESIDUAL_SPAN = 8
+
+
+class ReadingTail:
+    """New station readings from the CPCB directory since the last poll
+
+    Station CSVs are read from the byte offset where the previous poll
+    stopped, one complete line at a time; a file whose bytes before the
+    offset changed was rewritten and is read again from the start. Feed
+    snapshots (``raw/cpcb_feed_*.parquet``) are immutable and read once.
+    Files whose size and mtime are unchanged are never opened.
+    """
+
+    def __init__(self, cpcb_dir=DEFAULT_CPCB_DIR, cursors=None):
+        self.cpcb_dir = Path(cpcb_dir)
+        self.cursors = dict(cursors or {})
+        self.bytes_read = 0
+
+    def sources(self):
+        return sorted(self.cpcb_dir.glob("*.csv")) + sorted((self.cpcb_dir / "raw").glob("cpcb_feed_*.parquet"))
+
+    def poll(self):
+        """(new readings in the station file layout, {source: cursor} of the sources that moved)"""
+        frames, moved = [], {}
+        for path in self.sources():
+            source = path.relative_to(self.cpcb_dir).as_posix()
+            cursor = self.cursors.get(source)
+            stat = os.stat(path)
+            if cursor and (cursor['size'], cursor['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            if path.suffix == '.csv':
+                frame, cursor = self._read_csv(path, stat, cursor)
+            else:
+                frame, cursor = feed_to_station_frame(pq.read_table(path)), {}
+                self.bytes_read += stat.st_size
+            cursor.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            self.cursors[source] = moved[source] = cursor
+            if frame is not None and len(frame):
+                frames.append(frame)
+        readings = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return readings, moved
+
+    def _read_csv(self, path, stat, cursor):
+        with open(path, 'rb') as f:
+            offset = cursor['offset'] if cursor else 0
+            if offset:
+                start = max(0, offset - ANCHOR_BYTES)
+                f.seek(start)
+                if stat.st_size < offset or f.read(offset - start).hex() != cursor['anchor']:
+                    offset = 0
+            if offset:
+                header, before = bytes.fromhex(cursor['header']), bytes.fromhex(cursor['anchor'])
+            else:
+                f.seek(0)
+                header = before = f.readline()
+                if not header.endswith(b"\n"):
+                    return None, {'offset': 0, 'anchor': '', 'header': ''}
+                offset = len(header)
+            f.seek(offset)
+            data = f.read(stat.st_size - offset)
+        # A line still being written stays unread until it is complete
+        data = data[:data.rfind(b"\n") + 1]
+        self.bytes_read += len(data)
+        cursor = {
+            'offset': offset + len(data),
+            'anchor': (before + data)[-ANCHOR_BYTES:].hex(),
+            'header': header.hex()
+        }
+        if not data:
+            return None, cursor
+        return pd.read_csv(io.BytesIO(header + data), parse_dates=['datetime']), cursor
+
+
+class StationNowcaster:
+    """Per-station nowcast state advanced one reading at a time
+
+    Each station keeps its latest reading, CPCB rolling averages (via
+    ``StationAverager``) and the exponentially weighted mean and spread of
+    its model residual (observed minus predicted PM2.5). A reading costs
+    O(1) whatever the station's history; only stations that received
+    readings are rescored for AQI and published. Readings not newer than a
+    station's latest are ignored, since the averages only move forward.
+    """
+
+    def __init__(self, store=None, cpcb_dir=DEFAULT_CPCB_DIR, forecaster=None):
+        self.store = store or NowcastStore(DEFAULT_STORE_PATH)
+        self.cpcb_dir = Path(cpcb_dir)
+        self._forecaster = forecaster
+        self.alpha = 2 / (RESIDUAL_SPAN + 1)
+        self.load()
+
+    @property
+    def forecaster(self):
+        if self._forecaster is None:
+            from offline_forecast import offline_forecast
+            self._forecaster = offline_forecast
+        return self._forecaster
+
+    def load(self):
+        """Resume from the state committed by the last publish"""
+        states, cursors = self.store.load_state()
+        self.averager = StationAverager(POLLUTANTS)
+        self.stations = {}
+        for station, state in states.items():
+            self.averager.restore(station, state.pop('averages'))
+            self.stations[station] = state
+        self.tail = ReadingTail(self.cpcb_dir, cursors)
+
+    def predict(self, readings):
+        """Model PM2.5 at each reading's station and time, from the dashboard's baseline features"""
+        if not self.forecaster.model_loaded:
+            return np.full(len(readings), np.nan)
+        columns = self.forecaster.generate_baseline_batch(
+            readings['station_latitude'].to_numpy(dtype=np.float64),
+            readings['station_longitude'].to_numpy(dtype=np.float64),
+            list(readings['datetime'])
+        )
+        return self.forecaster.predict_matrix(FEATURE_BUILDER.build(columns)).astype(np.float64)
+
+    def new_readings(self, readings):
+        """Readings newer than their station's latest, one per (station, time), in time order"""
+        if readings.empty:
+            return readings
+        readings = readings.reindex(columns=['datetime', 'station_name'] + INFO_COLUMNS + POLLUTANTS)
+        readings = readings.dropna(subset=['datetime', 'station_name'])
+        readings = readings.drop_duplicates(['station_name', 'datetime'], keep='last')
+        latest = readings['station_name'].map(
+            lambda station: self.averager.updated.get(station, pd.Timestamp.min))
+        return readings[readings['datetime'] > latest].sort_values('datetime', kind='stable')
+
+    def update(self, readings):
+        """Advance the state of every station in ``readings``; returns the changed stations' nowcast rows"""
+        readings = self.new_readings(readings)
+        if readings.empty:
+            return []
+        readings = readings.assign(predicted_pm2_5=self.predict(readings))
+        model_version = self.forecaster.model_version
+
+        changed = set()
+        for row in readings.to_dict('records'):
+            station = row['station_name']
+            state = self.stations.get(station)
+            if state is None or state['model_version'] != model_version:
+                # Residuals of a replaced model say nothing about the new one
+                state = self.stations[station] = {
+                    **(state or {}), 'model_version': model_version,
+                    'residual_mean': np.nan, 'residual_var': 0.0, 'residual_count': 0, 'readings': 0
+                }
+            self.averager.update(station, row['datetime'], row)
+            residual = row['pm2_5'] - row['predicted_pm2_5']
+            if not np.isnan(residual):
+                if state['residual_count'] == 0:
+                    state['residual_mean'], state['residual_var'] = residual, 0.0
+                else:
+                    delta = residual - state['residual_mean']
+                    state['residual_mean'] += self.alpha * delta
+                    state['residual_var'] = (1 - self.alpha) * (state['residual_var'] + self.alpha * delta ** 2)
+                state['residual_count'] += 1
+            state['readings'] += 1
+            state.update({name: row[name] for name in INFO_COLUMNS if not pd.isna(row[name])})
+            state.update({
+                'datetime': row['datetime'].isoformat(),
+                'latest': {name: row[name] for name in POLLUTANTS if not np.isnan(row[name])},
+                'predicted_pm2_5': row['predicted_pm2_5'],
+                'residual': residual
+            })
+            changed.add(station)
+        return self.rows(sorted(changed))
+
+    def rows(self, stations):
+        """Published nowcast rows (latest values, averages, AQI, residual stats) of ``stations``"""
+        records = []
+        for station in stations:
+            state = self.stations[station]
+            records.append({
+                'station_name': station,
+                'datetime': pd.Timestamp(state['datetime']),
+                'state': state.get('state'),
+                'city': state.get('city'),
+                'latitude': state.get('station_latitude'),
+                'longitude': state.get('station_longitude'),
+                **{name: state['latest'].get(name, np.nan) for name in POLLUTANTS},
+                **self.averager.averages(station),
+                'predicted_pm2_5': state['predicted_pm2_5'],
+                'residual': state['residual'],
+                'residual_mean': state['residual_mean'],
+                'residual_std': np.sqrt(state['residual_var']) if state['residual_count'] > 1 else np.nan,
+                'residual_count': state['residual_count'],
+                'readings': state['readings'],
+                'model_version': state['model_version']
+            })
+        frame = station_aqi(pd.DataFrame(records))
+        frame['datetime'] = frame['datetime'].map(pd.Timestamp.isoformat)
+        return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+    def states(self, stations):
+        return {station: {**self.stations[station], 'averages': self.averager.export(station)}
+                for station in stations}
+
+    def poll(self):
+        """Read what arrived since the last poll and publish the stations it changed
+
+        Returns (new readings, changed rows, store revision).
+        """
+        readings, cursors = self.tail.poll()
+        try:
+            rows = self.update(readings)
+            revision = self.store.publish(rows, self.states(row['station_name'] for row in rows), cursors)
+        except BaseException:
+            # Nothing was committed: drop the in-memory advance so the next poll re-reads it
+            self.load()
+            raise
+        return len(readings), rows, revision
+
+    def run(self, interval=300.0):
+        """Poll forever, sleeping ``interval`` seconds between polls"""
+        while True:
+            started = time.perf_counter()
+            try:
+                readings, rows, revision = self.poll()
+                if rows:
+                    print(f"📡 {readings:,} readings -> {len(rows)} station(s) updated (revision {revision}) "
+                          f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"⚠️ Nowcast update failed: {e}")
+            time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally update the per-station nowcast store")
+    parser.add_argument("--cpcb-dir", default=str(DEFAULT_CPCB_DIR), help="Directory of CPCB station files")
+    parser.add_argument("--store", default=str(DEFAULT_STORE_PATH), help="Nowcast store (SQLite)")
+    parser.add_argument("--interval", type=float, default=300.0, help="Seconds between polls")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+    parser.add_argument("--reset", action="store_true", help="Clear the store and rebuild from the station files")
+    args = parser.parse_args()
+
+    store = NowcastStore(args.store)
+    if args.reset:
+        store.clear()
+    nowcaster = StationNowcaster(store, args.cpcb_dir)
+    print(f"🛰️ Nowcast for {len(nowcaster.stations)} station(s) from {args.cpcb_dir} -> {args.store}")
+
+    if args.once:
+        started = time.perf_counter()
+        readings, rows, revision = nowcaster.poll()
+        print(f"✅ {readings:,} readings ({nowcaster.tail.bytes_read / 1024:.1f} KB read) -> "
+              f"{len(rows)} station(s) updated (revision {revision}) "
+              f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return
+
+    # Residuals follow retrained models without a restart
+    nowcaster.forecaster.start_watching()
+    try:
+        nowcaster.run(args.interval)
+    except KeyboardInterrupt:
+        print("👋 Stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+AOD Interpolator Tests for VayuDrishti
+Old passes must not stand in for current observations
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard"))
+
+from aod_interpolator import AODInterpolator
+
+
+def test_stale_composite_falls_back_to_monthly_mean(tmp_path):
+    pd.DataFrame({
+        'datetime': ['2025-01-10 12:00', '2025-07-01 12:00', '2025-07-20 12:00', '2025-07-21 12:00'],
+        'latitude': [28.5, 20.0, 20.0, 28.5],
+        'longitude': [77.0, 78.0, 78.0, 77.0],
+        'aod_550': [1.2, 0.9, 0.3, 0.5]
+    }).to_csv(tmp_path / "demo_aod_data.csv", index=False)
+    aod = AODInterpolator(tmp_path / "no_cube", tmp_path, max_age_days=3)
+
+    # The 1 July pass is older than the window, so only the last two passes form the composite
+    assert aod.at(20.0, 78.0) == np.float32(0.3)
+    assert aod.at(28.5, 77.0, when=datetime(2025, 7, 23)) == np.float32(0.5)
+    assert aod.source_for(datetime(2025, 7, 23)) == 'satellite'
+
+    # Six months later: the January mean of the cell, then the domain mean for unobserved months
+    assert aod.age_days(datetime(2026, 1, 21, 12))[0] == 184.0
+    assert aod.at(28.5, 77.0, when=datetime(2026, 1, 21)) == np.float32(1.2)
+    assert aod.source_for(datetime(2026, 1, 21)) == 'climatology'
+    assert aod.at(28.5, 77.0, when=datetime(2026, 3, 1)) == np.float32(0.4)
+    assert aod.source_for(datetime(2026, 3, 1)) == 'domain mean'
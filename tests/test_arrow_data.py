@@ -0,0 +1,50 @@
+"""
+Arrow Data Tests for VayuDrishti
+Streamed CSV chunks keep one schema from the first row to the last, and scored output is published only when complete
+"""
+
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard"))
+
+from arrow_data import iter_tables, read_schema
+from bulk_score import ChunkWriter, output_schema
+
+
+def test_csv_types_hold_past_the_first_block(tmp_path):
+    """Whole numbers for longer than Arrow's inference block, then a decimal"""
+    path = tmp_path / "observations.csv"
+    with open(path, 'w') as f:
+        f.write("t2m_celsius,station\n")
+        f.writelines(f"25,{i}\n" for i in range(300_000))
+        f.write("25.5,300000\n")
+
+    schema = read_schema(path)
+    assert schema.field('t2m_celsius').type == pa.float64()
+    chunks = list(iter_tables(path, 100_000))
+    assert all(chunk.schema == schema for chunk in chunks)
+    assert chunks[-1].column('t2m_celsius')[-1].as_py() == 25.5
+
+
+def test_chunk_writer_publishes_only_on_success(tmp_path):
+    schema = output_schema(pa.schema([('station', pa.string())]))
+    chunk = pa.table({'station': ['a'], 'predicted_pm2_5': pa.array([42.0], pa.float32())})
+
+    failed = ChunkWriter(tmp_path / "failed.csv", schema)
+    failed.write(chunk)
+    failed.close(success=False)
+    assert list(tmp_path.iterdir()) == []
+
+    empty = ChunkWriter(tmp_path / "empty.parquet", schema)
+    empty.close()
+    assert read_schema(tmp_path / "empty.parquet") == schema
+
+    writer = ChunkWriter(tmp_path / "scored.csv", schema)
+    writer.write(chunk)
+    writer.close()
+    assert (tmp_path / "scored.csv").read_text().splitlines() == ['"station","predicted_pm2_5"', '"a",42']
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['empty.parquet', 'scored.csv']
@@ -0,0 +1,98 @@
+"""
+Train/Serve Feature Parity Tests for VayuDrishti
+The 12-column float32 matrix must be identical whichever path builds it
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard"))
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from arrow_data import SOURCE_COLUMNS, build_features, read_table
+from feature_builder import FEATURE_BUILDER, FEATURE_COLUMNS, FEATURE_INDEX
+
+
+@pytest.fixture
+def rows():
+    """Station-like rows covering every month, hour and a spread of Indian coordinates"""
+    rng = np.random.default_rng(7)
+    n = 240
+    times = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 366 * 24, n), unit='h')
+    return pd.DataFrame({
+        'datetime': times.sort_values(),
+        'latitude': rng.uniform(6.0, 37.0, n).round(2),
+        'longitude': rng.uniform(68.0, 97.0, n).round(2),
+        'aod_550': rng.uniform(0.05, 2.5, n),
+        't2m_celsius': rng.uniform(2.0, 45.0, n),
+        'wind_speed_10m': rng.uniform(0.0, 15.0, n),
+        'r2m': rng.uniform(10.0, 100.0, n),
+        'blh': rng.uniform(100.0, 3000.0, n),
+        'pm2_5': rng.uniform(5.0, 300.0, n)
+    }).assign(hour=lambda df: df['datetime'].dt.hour, month=lambda df: df['datetime'].dt.month)
+
+
+def training_matrix(rows, tmp_path):
+    """fix_model_compatibility.load_and_fix_model: dataset file -> Arrow -> build_features"""
+    path = tmp_path / "dataset.csv"
+    rows.drop(columns='datetime').to_csv(path, index=False)
+    table = read_table(path, columns=SOURCE_COLUMNS + ['pm2_5'])
+    return build_features(table)
+
+
+def serving_matrix(rows):
+    """Dashboard: one input dict per prediction, as predict_pm25_offline and the Live tab build them"""
+    inputs = rows[['aod_550', 't2m_celsius', 'wind_speed_10m', 'r2m', 'blh',
+                   'latitude', 'longitude', 'hour', 'month']].to_dict('records')
+    return np.vstack([FEATURE_BUILDER.build(features) for features in inputs])
+
+
+def test_training_file_matches_serving(rows, tmp_path):
+    train = training_matrix(rows, tmp_path)
+    serve = serving_matrix(rows)
+    assert train.dtype == serve.dtype == np.float32
+    assert train.shape == serve.shape == (len(rows), len(FEATURE_COLUMNS))
+    np.testing.assert_array_equal(train, serve)
+
+
+def test_notebook_frame_matches_serving(rows):
+    """The training notebook derives the encodings from a DataFrame in one build"""
+    np.testing.assert_array_equal(FEATURE_BUILDER.build(rows), serving_matrix(rows))
+
+
+def test_pipeline_partition_matches_serving(rows, tmp_path):
+    """data_orchestrator.features_day derives hour and month from the joined rows' timestamps"""
+    from data_orchestrator import features_day, write_parquet
+
+    joined = rows.drop(columns=['hour', 'month']).assign(
+        grid_id='cell', has_ground_truth=True, station_name='station')
+    write_parquet(joined, tmp_path / "joined.parquet")
+    features_day(tmp_path / "joined.parquet", tmp_path / "features.parquet", tmp_path / "labelled.parquet")
+    train = build_features(read_table(tmp_path / "features.parquet", columns=FEATURE_COLUMNS))
+    np.testing.assert_array_equal(train, serving_matrix(rows))
+
+
+def test_encodings_match_notebook_formulas(rows):
+    """Coordinates are encoded in radians, as the notebook's original feature cell did"""
+    matrix = FEATURE_BUILDER.build(rows)
+    for name, source, func in (('lat_cos', 'latitude', np.cos), ('lat_sin', 'latitude', np.sin),
+                               ('lon_cos', 'longitude', np.cos), ('lon_sin', 'longitude', np.sin)):
+        expected = func(np.radians(rows[source].to_numpy())).astype(np.float32)
+        np.testing.assert_array_equal(matrix[:, FEATURE_INDEX[name]], expected)
+
+
+def test_season_mapping():
+    """1=Winter (Dec-Feb), 2=Spring (Mar-May), 3=Monsoon (Jun-Sep), 4=Post-monsoon (Oct-Nov)
+
+    The training notebook's original cell put September in season 4; the
+    shared builder (and therefore the served model input) uses 3.
+    """
+    months = np.arange(1, 13)
+    season = FEATURE_BUILDER.build({'month': months})[:, FEATURE_INDEX['season']]
+    np.testing.assert_array_equal(season, [1, 1, 2, 2, 2, 3, 3, 3, 3, 4, 4, 1])
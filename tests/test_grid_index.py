@@ -0,0 +1,37 @@
+"""
+Grid Index Tests for VayuDrishti
+Aggregation over int8 category codes, including the Hazardous code and uncategorized rows
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard"))
+
+from grid_index import GridIndex
+from prediction_grid import HEALTH_CATEGORIES, PredictionGrid
+
+
+def test_aggregate_with_hazardous_cell():
+    grid = PredictionGrid([28.0, 28.5, 29.0], [77.0, 77.0, 77.0], [5.0, 100.0, 300.0])
+    index = GridIndex.from_grid(grid)
+    summary = index.aggregate(index.select())
+
+    assert summary['count'] == 3
+    assert summary['category_counts'].tolist() == [1, 0, 0, 1, 0, 1]
+    assert summary['bin_counts'][HEALTH_CATEGORIES.index("Hazardous"), -1] == 1
+    assert summary['max'] == 300.0
+
+
+def test_aggregate_skips_rows_without_category():
+    df = pd.DataFrame({'predicted_pm2_5': [10.0, 20.0, 30.0], 'health_category': ["Good", None, "Moderate"]})
+    index = GridIndex.from_frame(df)
+    summary = index.aggregate(index.select())
+
+    assert summary['count'] == 3
+    assert summary['category_counts'].sum() == 2
+    np.testing.assert_allclose(summary['mean'], 20.0)
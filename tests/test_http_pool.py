@@ -0,0 +1,130 @@
+"""
+HTTP Pool Tests for VayuDrishti
+The collectors' HTTP/1.1 client against a local server: encodings, bodiless responses, redirects and errors
+"""
+
+import asyncio
+import gzip
+import logging
+import sys
+import zlib
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from data_collection.http_pool import AsyncHTTPPool, HTTPError
+
+BODY = b'{"pm2_5": [41.5, 38.0, 52.25]}' * 50
+
+
+def reply(status, headers=(), body=b'', interim=b''):
+    head = [f"HTTP/1.1 {status}"] + [f"{name}: {value}" for name, value in headers]
+    return interim + ("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body
+
+
+def chunked(data, size=100):
+    pieces = [b"%x\r\n%s\r\n" % (len(data[i:i + size]), data[i:i + size]) for i in range(0, len(data), size)]
+    return b"".join(pieces) + b"0\r\n\r\n"
+
+
+def respond(method, path, request_headers):
+    if path == '/plain':
+        return reply("200 OK", [("Content-Length", len(BODY))], BODY)
+    if path == '/gzip':
+        body = gzip.compress(BODY)
+        return reply("200 OK", [("Content-Encoding", "gzip"), ("Content-Length", len(body))], body)
+    if path == '/deflate-chunked':
+        return reply("200 OK", [("Content-Encoding", "deflate"), ("Transfer-Encoding", "chunked")],
+                     chunked(zlib.compress(BODY)))
+    if path == '/brotli':
+        return reply("200 OK", [("Content-Encoding", "br"), ("Content-Length", 4)], b"\x0b\x02\x80\x00")
+    if path == '/head':
+        # A HEAD response announces the GET body's length but sends no body
+        return reply("200 OK", [("Content-Length", len(BODY))], b'' if method == 'HEAD' else BODY)
+    if path == '/early-hints':
+        hints = reply("103 Early Hints", [("Link", "</static/map.css>; rel=preload")])
+        return reply("200 OK", [("Content-Length", len(BODY))], BODY, interim=hints)
+    if path == '/redirect':
+        return reply("302 Found", [("Location", "/gzip"), ("Content-Length", 0)])
+    if path == '/echo-encoding':
+        body = request_headers.get('accept-encoding', '').encode()
+        return reply("200 OK", [("Content-Length", len(body))], body)
+    return reply("404 Not Found", [("Content-Length", 0)])
+
+
+async def handle(reader, writer):
+    while request_line := await reader.readline():
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        writer.write(respond(method, target, headers))
+        await writer.drain()
+    writer.close()
+
+
+def run(scenario):
+    async def main():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        base = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        try:
+            async with AsyncHTTPPool(retries=0, timeout=5.0) as pool:
+                return await scenario(pool, base)
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(main())
+
+
+async def read_body(response):
+    return await response.read()
+
+
+def test_compressed_bodies_are_decoded():
+    async def scenario(pool, base):
+        return [await pool.fetch(f"{base}{path}", read_body) for path in ('/plain', '/gzip', '/deflate-chunked')]
+    assert run(scenario) == [BODY, BODY, BODY]
+
+    async def accepted(pool, base):
+        return await pool.fetch(f"{base}/echo-encoding", read_body)
+    assert run(accepted) == b"gzip, deflate"
+
+
+def test_unsupported_encoding_raises():
+    async def scenario(pool, base):
+        return await pool.fetch(f"{base}/brotli", read_body)
+    with pytest.raises(ValueError, match="Content-Encoding 'br'"):
+        run(scenario)
+
+
+def test_bodiless_responses_do_not_block_the_connection():
+    async def scenario(pool, base):
+        head = await pool.fetch(f"{base}/head", read_body, method='HEAD')
+        body = await pool.fetch(f"{base}/head", read_body)
+        hinted = await pool.fetch(f"{base}/early-hints", read_body)
+        return head, body, hinted, pool.stats['connections'], pool.stats['reused']
+    # All three requests share one keep-alive connection
+    assert run(scenario) == (b'', BODY, BODY, 1, 2)
+
+
+def test_redirects_and_errors():
+    async def scenario(pool, base):
+        return await pool.fetch(f"{base}/redirect", read_body)
+    assert run(scenario) == BODY
+
+    async def missing(pool, base):
+        return await pool.fetch(f"{base}/missing", read_body)
+    with pytest.raises(HTTPError) as error:
+        run(missing)
+    assert error.value.status == 404
+
+
+def test_proxy_settings_are_reported(monkeypatch, caplog):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example:3128")
+    with caplog.at_level(logging.WARNING, logger="vayudrishti.http_pool"):
+        AsyncHTTPPool()
+    assert "Proxy settings are ignored" in caplog.text
@@ -0,0 +1,56 @@
+"""
+Land Mask Tests for VayuDrishti
+The mask must match the approximate outline without a boundary file, and follow the boundary file once it exists
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard"))
+
+from land_mask import LandMask, approximate_mask
+
+
+def test_approximate_mask_parity(tmp_path):
+    """Points on the outline's rectangle edges keep their membership"""
+    mask = LandMask(tmp_path / "mask", auto_build=False)
+    mask.build(tmp_path / "india_states.geojson")
+
+    latitude, longitude = np.meshgrid(np.arange(6.0, 37.01, 0.5), np.arange(68.0, 97.01, 0.5), indexing='ij')
+    np.testing.assert_array_equal(mask.contains(latitude, longitude), approximate_mask(latitude, longitude))
+
+    rng = np.random.default_rng(3)
+    latitude, longitude = rng.uniform(5.0, 39.0, 10_000), rng.uniform(67.0, 99.0, 10_000)
+    np.testing.assert_array_equal(mask.contains(latitude, longitude), approximate_mask(latitude, longitude))
+
+
+def test_rebuilds_when_boundary_file_appears(tmp_path):
+    boundary_file = tmp_path / "india_states.geojson"
+    LandMask(tmp_path / "mask", auto_build=False).build(boundary_file)
+    assert LandMask(tmp_path / "mask").meta == {}  # Nothing is read before first use
+    assert LandMask(tmp_path / "mask").contains(19.0, 73.0)
+
+    square = [[[76.0, 28.0], [78.0, 28.0], [78.0, 30.0], [76.0, 30.0], [76.0, 28.0]]]
+    boundary_file.write_text(json.dumps({'type': 'FeatureCollection', 'features': [{
+        'type': 'Feature', 'properties': {'st_nm': 'Delhi'}, 'geometry': {'type': 'Polygon', 'coordinates': square}
+    }]}))
+
+    mask = LandMask(tmp_path / "mask")
+    assert mask.is_stale()
+    assert mask.contains(28.6, 77.2) and not mask.contains(19.0, 73.0)
+    assert mask.meta['source'] == str(boundary_file.resolve())
+    assert mask.region_names(mask.lookup(28.6, 77.2)) == 'Delhi'
+    assert not LandMask(tmp_path / "mask").is_stale()
+
+
+def test_unreadable_store_falls_back_to_approximate_outline(tmp_path):
+    (tmp_path / "mask").mkdir()
+    (tmp_path / "mask" / "meta.json").write_text("{")
+    mask = LandMask(tmp_path / "mask", auto_build=False)
+    assert not mask.available
+    np.testing.assert_array_equal(mask.contains([19.0, 15.0], [73.0, 65.0]), [True, False])
+    assert mask.region_names(mask.lookup(19.0, 73.0)) == 'India'
@@ -0,0 +1,51 @@
+"""
+Meteorological Climatology Tests for VayuDrishti
+A running process must pick up a rebuilt cube and never build one on the lookup path
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "dashboard"))
+
+from met_climatology import MetClimatology
+
+
+def write_weather(path, temperature):
+    pd.DataFrame({
+        'latitude': [28.5], 'longitude': [77.0], 'datetime': ['2025-01-15 12:00:00'],
+        't2m_celsius': [temperature], 'r2m': [50.0], 'wind_speed_10m': [2.0], 'blh': [500.0]
+    }).to_csv(path, index=False)
+
+
+def t2m(climatology):
+    return float(climatology.gather(28.5, 77.0, 1, 12)['t2m_celsius'])
+
+
+def test_missing_store_is_not_built_on_lookup(tmp_path):
+    write_weather(tmp_path / "weather.csv", 11.0)
+    climatology = MetClimatology(tmp_path / "store", check_interval=0)
+    assert not climatology.available
+    assert not (tmp_path / "store").exists()
+
+    MetClimatology(tmp_path / "store").build([tmp_path / "weather.csv"])
+    assert climatology.available and t2m(climatology) == 11.0
+
+
+def test_rebuilt_store_is_reopened(tmp_path):
+    source = tmp_path / "weather.csv"
+    write_weather(source, 11.0)
+    MetClimatology(tmp_path / "store").build([source])
+
+    climatology = MetClimatology(tmp_path / "store", check_interval=0)
+    assert t2m(climatology) == 11.0 and not climatology.stale
+
+    # A changed source marks the open store stale, which keeps serving until a rebuild
+    write_weather(source, 13.0)
+    assert climatology.available and climatology.stale and t2m(climatology) == 11.0
+
+    MetClimatology(tmp_path / "store").build([source])
+    assert t2m(climatology) == 13.0 and not climatology.stale